@@ -0,0 +1,29 @@
+"""Add content hash to article vectors
+
+Revision ID: 5c2e8d41a9b3
+Revises: 38d9f1b6ccf0
+Create Date: 2026-10-14 09:12:05.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c2e8d41a9b3'
+down_revision: Union[str, Sequence[str], None] = '38d9f1b6ccf0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing rows stay NULL and are re-embedded (and hashed) once on next ingest
+    op.add_column('article_vectors', sa.Column('content_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('article_vectors', 'content_hash')
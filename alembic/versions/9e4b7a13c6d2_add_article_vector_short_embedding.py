@@ -0,0 +1,43 @@
+"""Add shortened search embedding to article vectors
+
+Revision ID: 9e4b7a13c6d2
+Revises: 5c2e8d41a9b3
+Create Date: 2026-10-14 13:40:27.504119
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from packages.config.embedding import config
+
+# revision identifiers, used by Alembic.
+revision: str = '9e4b7a13c6d2'
+down_revision: Union[str, Sequence[str], None] = '5c2e8d41a9b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The column's dimension comes from EMBED_SEARCH_DIM; with two-stage search
+    # off there is nothing to add (init_db adds it if the mode is enabled later)
+    if not config.two_stage:
+        return
+    dim = int(config.search_dimension)
+    op.execute(f"ALTER TABLE article_vectors ADD COLUMN IF NOT EXISTS embedding_short vector({dim})")
+    # Derived from the stored full vectors; no re-embedding (pgvector >= 0.7)
+    op.execute(f"""
+        UPDATE article_vectors
+        SET embedding_short = l2_normalize(subvector(embedding, 1, {dim}))::vector({dim})
+        WHERE embedding_short IS NULL
+    """)
+    op.execute(f"""
+        CREATE INDEX IF NOT EXISTS idx_article_vectors_embedding_short_ivfflat_{dim}
+        ON article_vectors USING ivfflat (embedding_short vector_cosine_ops) WITH (lists = 100)
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("ALTER TABLE article_vectors DROP COLUMN IF EXISTS embedding_short")
@@ -0,0 +1,50 @@
+"""Add embedding_jobs outbox
+
+Revision ID: b3f1c7d92e40
+Revises: 9e4b7a13c6d2
+Create Date: 2026-10-14 15:02:48.331957
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3f1c7d92e40'
+down_revision: Union[str, Sequence[str], None] = '9e4b7a13c6d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('embedding_jobs',
+    sa.Column('article_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('content_hash', sa.String(length=64), nullable=True),
+    sa.Column('status', sa.String(length=16), server_default='pending', nullable=False),
+    sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('enqueued_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('available_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('locked_by', sa.String(length=128), nullable=True),
+    sa.Column('locked_until', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['article_id'], ['articles.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('article_id')
+    )
+    op.create_index(op.f('ix_embedding_jobs_available_at'), 'embedding_jobs', ['available_at'], unique=False)
+    # Articles stored before the outbox without a vector get embedded by the workers
+    op.execute("""
+        INSERT INTO embedding_jobs (article_id)
+        SELECT a.id FROM articles a
+        LEFT JOIN article_vectors av ON av.article_id = a.id
+        WHERE av.article_id IS NULL
+        ON CONFLICT DO NOTHING
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_embedding_jobs_available_at'), table_name='embedding_jobs')
+    op.drop_table('embedding_jobs')
@@ -0,0 +1,29 @@
+"""Add articles.features
+
+Revision ID: d41a8e07b5c3
+Revises: b3f1c7d92e40
+Create Date: 2026-10-15 10:12:37.604218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41a8e07b5c3'
+down_revision: Union[str, Sequence[str], None] = 'b3f1c7d92e40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Filled at upsert; existing rows via scripts/backfill_article_features.py
+    op.add_column('articles', sa.Column('features', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('articles', 'features')
@@ -0,0 +1,31 @@
+"""Add articles.updated_at and refresh watermark indexes
+
+Revision ID: e7c25f90a4d1
+Revises: d41a8e07b5c3
+Create Date: 2026-10-15 14:41:09.118302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7c25f90a4d1'
+down_revision: Union[str, Sequence[str], None] = 'd41a8e07b5c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('articles', sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False))
+    op.create_index('ix_articles_updated_at', 'articles', ['updated_at', 'id'], unique=False)
+    op.create_index('ix_article_vectors_updated_at', 'article_vectors', ['updated_at', 'article_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_article_vectors_updated_at', table_name='article_vectors')
+    op.drop_index('ix_articles_updated_at', table_name='articles')
+    op.drop_column('articles', 'updated_at')
@@ -1,6 +1,7 @@
 from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
+from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel, Field
 from typing import List, Dict, Any, Optional, Literal
 from datetime import datetime, timezone
@@ -17,13 +18,22 @@ sys.path.append(str(Path(__file__).parent.parent.parent))
 from packages.router.intent import classify
 from packages.db import repo as db_repo
 from packages.db.repo import init_db, get_recent_articles, search_articles_by_keyword, log_query, search_vectors, reset_embedding_index
-from services.ingest.enhanced_scheduler import start_enhanced_scheduler, enhanced_ingest_cycle
+from services.ingest.worker import run_worker
+from services.ingest.embedding_worker import embedding_workers
+from packages.db.embedding_jobs import get_embedding_outbox_stats, retry_dead_embedding_jobs
+from packages.db.ingest_runs import (
+    init_ingest_runs_db, request_ingest_run, get_ingest_run, list_ingest_runs, get_leader_status
+)
 from packages.db.feed_health import get_feed_health_metrics, disable_unhealthy_feeds
+from packages.db.reembed_jobs import get_reembed_progress
 from packages.handlers import weather, markets, sports, lookup, news
 from packages.util import cache as cache_util
 from packages.config.embedding import config as embedding_config
 from packages.config.model_tracking import model_tracker, ensure_model_consistency
-from packages.util.cache import get_async, set_async, check_negative_cache, cache_negative_result
+from packages.util.cache import (
+    get_async, set_async, check_negative_cache, cache_negative_result,
+    get_pre_retrieval_async, get_story_async, set_two_level_async, set_pre_retrieval_async, get_level_stats,
+)
 from packages.util.memory import (
     derive_session_id,
     remember_preferred_lang,
@@ -33,8 +43,14 @@ from packages.util.memory import (
 from packages.nlp.retrieve import retrieve_evidence
 from packages.nlp.enhanced_retrieve import enhanced_retrieve_evidence
 from packages.nlp.story_retrieval import retrieve_story_context
-from packages.nlp.window_analyzer import should_filter_by_region
+from packages.nlp.window_analyzer import should_filter_by_region, analyze_query_window
 from packages.nlp.hybrid_retrieve import hybrid_retrieve_with_guardrails
+from packages.nlp.retrieval_plan import RetrievalPlan
+from packages.nlp.hot_index import hot_index
+from packages.nlp.text_index import text_index
+from packages.nlp.embed import embedding_http, query_batcher
+from packages.nlp.reranker import reranker, RERANKER_WARMUP
+from packages.nlp.embed_cache import embedding_cache
 from packages.handlers.insufficient_context import insufficient_context_handler
 from packages.router.tool_routing import volatile_router, ToolType
 from packages.llm.openai_client import summarize_en, summarize_bn_first, summarize_story_context, summarize_breaking_news, translate_bn
@@ -134,38 +150,143 @@ async def on_startup():
         else:
             print(f"[startup] ✅ Model consistency verified: {status_info['current_model']}")
         
+        # Open the pooled embedding HTTP client for the life of the process
+        await embedding_http.start()
+        
+        # Warm the in-process hot-window vector index
+        try:
+            loaded = await asyncio.to_thread(hot_index.refresh)
+            print(f"[startup] Hot index loaded: {loaded} vectors ({hot_index.window_hours}h window)")
+        except Exception as e:
+            print(f"[startup] Hot index warm-up failed, using Postgres search: {e}")
+        
+        # BM25 keyword index over the same window (articles with or without vectors)
+        try:
+            indexed = await asyncio.to_thread(text_index.refresh)
+            print(f"[startup] Text index loaded: {indexed} articles, {text_index.info()['terms']} terms")
+        except Exception as e:
+            print(f"[startup] Text index warm-up failed, using vector hits only: {e}")
+        
+        # Load cross-encoders before the first query needs them (RERANKER_WARMUP=base,large)
+        if RERANKER_WARMUP and reranker.available:
+            app.state.reranker_warmup = asyncio.get_running_loop().run_in_executor(
+                reranker.executor, reranker.warm_up, RERANKER_WARMUP
+            )
+            print(f"[startup] Warming rerankers in background: {', '.join(RERANKER_WARMUP)}")
+        
+        # Other processes write vectors; pick them up incrementally
+        app.state.hot_index_task = asyncio.create_task(_refresh_hot_index_periodically())
+        
+        try:
+            init_ingest_runs_db()
+        except Exception as e:
+            print(f"[startup] Could not initialize ingest run tables: {e}")
+        
+        # Ingestion runs in `python -m services.ingest.worker`. Dev can embed the
+        # same leader-elected worker here; with several uvicorn workers only
+        # the one holding the advisory lock ingests.
         env = os.getenv("ENV", "dev")
-        if env == "dev":
-            start_enhanced_scheduler()
-            print("[startup] Ingest scheduler started (dev)")
+        if os.getenv("INGEST_IN_PROCESS", "1" if env == "dev" else "0") == "1":
+            app.state.ingest_stop = asyncio.Event()
+            app.state.ingest_task = asyncio.create_task(run_worker(app.state.ingest_stop))
+            print("[startup] In-process ingest worker started (leader-elected)")
         else:
-            print("[startup] Production mode: ingest scheduler not started")
+            print("[startup] Ingestion delegated to services.ingest.worker")
     except SystemExit as e:
         # Propagate hard block from embedding validation
         raise
     except Exception as e:
         print(f"[startup] init error: {e}")
 
+
+HOT_INDEX_REFRESH_SECONDS = int(os.getenv("HOT_INDEX_REFRESH_S", "60"))
+
+
+async def _refresh_hot_index_periodically():
+    while True:
+        await asyncio.sleep(HOT_INDEX_REFRESH_SECONDS)
+        try:
+            added = await asyncio.to_thread(hot_index.refresh)
+            if added:
+                print(f"[hot_index] Refreshed: +{added} vectors ({hot_index.size} total)")
+        except Exception as e:
+            print(f"[hot_index] Refresh failed: {e}")
+        try:
+            indexed = await asyncio.to_thread(text_index.refresh)
+            if indexed:
+                print(f"[text_index] Refreshed: +{indexed} articles ({text_index.size} total)")
+        except Exception as e:
+            print(f"[text_index] Refresh failed: {e}")
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    """Stop the in-process ingest worker and index refresher, close HTTP pools."""
+    ingest_stop = getattr(app.state, "ingest_stop", None)
+    if ingest_stop is not None:
+        ingest_stop.set()
+        try:
+            await asyncio.wait_for(app.state.ingest_task, timeout=10)
+        except Exception as e:
+            print(f"[shutdown] Ingest worker did not stop cleanly: {e}")
+    hot_index_task = getattr(app.state, "hot_index_task", None)
+    if hot_index_task is not None:
+        hot_index_task.cancel()
+    await embedding_http.aclose()
+
 @app.get("/admin/ingest/run")
 async def admin_ingest_run():
-    """Force one ingest cycle (dev/admin). Returns counts."""
+    """Request a full ingest cycle from the ingest leader (dev/admin). Returns the queued run."""
+    try:
+        run = await asyncio.to_thread(request_ingest_run, "api")
+        return {
+            "status": "ok",
+            "run": jsonable_encoder(run),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        }
+    except Exception as e:
+        return {"status": "error", "error": str(e)}
+
+
+@app.get("/admin/ingest/runs")
+async def admin_ingest_runs(limit: int = 20):
+    """Recent ingest runs and the current ingest leader."""
     try:
-        feeds_ct, embedded_ct = await enhanced_ingest_cycle()
+        runs = await asyncio.to_thread(list_ingest_runs, limit)
+        leader = await asyncio.to_thread(get_leader_status)
         return {
             "status": "ok",
-            "feeds": feeds_ct,
-            "embedded": embedded_ct,
+            "leader": jsonable_encoder(leader),
+            "runs": jsonable_encoder(runs),
             "timestamp": datetime.now(timezone.utc).isoformat(),
         }
     except Exception as e:
         return {"status": "error", "error": str(e)}
 
 
+@app.get("/admin/ingest/runs/{run_id}")
+async def admin_ingest_run_status(run_id: str):
+    """Status of one requested ingest run."""
+    try:
+        run = await asyncio.to_thread(get_ingest_run, run_id)
+        if run is None:
+            return {"status": "error", "error": f"Unknown ingest run {run_id}"}
+        return {"status": "ok", "run": jsonable_encoder(run)}
+    except Exception as e:
+        return {"status": "error", "error": str(e)}
+
+
 @app.get("/admin/feeds/health")
 async def admin_feed_health():
     """Get feed health status for all feeds."""
     try:
-        metrics = get_feed_health_metrics()
+        # Schedule and fetch budget come from the DB: the ingest leader
+        # usually runs in another process (services.ingest.worker)
+        metrics = await asyncio.to_thread(get_feed_health_metrics)
+        try:
+            leader = await asyncio.to_thread(get_leader_status)
+        except Exception:
+            leader = None
         return {
             "status": "ok",
             "feeds": [
@@ -179,10 +300,12 @@ async def admin_feed_health():
                     "success_count": m.success_count,
                     "error_count": m.error_count,
                     "is_enabled": m.is_enabled,
-                    "error_details": m.error_details
+                    "error_details": m.error_details,
+                    "schedule": m.schedule
                 }
                 for m in metrics
             ],
+            "fetch_concurrency": leader.get("fetch_concurrency") if leader else None,
             "timestamp": datetime.now(timezone.utc).isoformat()
         }
     except Exception as e:
@@ -204,6 +327,31 @@ async def admin_feed_cleanup():
         return {"status": "error", "error": str(e)}
 
 
+@app.post("/admin/embedding/retry-dead")
+async def admin_embedding_retry_dead():
+    """Re-queue embedding jobs that exhausted their retries."""
+    try:
+        requeued = await asyncio.to_thread(retry_dead_embedding_jobs)
+        embedding_workers.notify()
+        return {
+            "status": "ok",
+            "requeued": requeued,
+            "timestamp": datetime.now(timezone.utc).isoformat()
+        }
+    except Exception as e:
+        return {"status": "error", "error": str(e)}
+
+
+@app.get("/admin/reranker/info")
+async def admin_reranker_info():
+    """Cross-encoder registry: loaded models, batching and score cache stats."""
+    return {
+        "status": "ok",
+        "reranker": reranker.info(),
+        "timestamp": datetime.now(timezone.utc).isoformat()
+    }
+
+
 @app.get("/admin/cache/stats")
 async def admin_cache_stats():
     """Get Redis cache statistics."""
@@ -214,6 +362,7 @@ async def admin_cache_stats():
         return {
             "status": "ok",
             "cache_stats": stats,
+            "cache_levels": get_level_stats(),
             "timestamp": datetime.now(timezone.utc).isoformat()
         }
     except Exception as e:
@@ -325,10 +474,29 @@ async def admin_embedding_info():
             total_articles = session.execute(
                 db_repo.text("SELECT COUNT(*) FROM articles")
             ).scalar() or 0
+        
+        try:
+            reembed_jobs = await asyncio.to_thread(get_reembed_progress)
+            for job in reembed_jobs:
+                job["percent"] = round(100.0 * (job["processed"] + job["skipped"]) / total_articles, 1) if total_articles else None
+        except Exception as e:
+            reembed_jobs = {"error": str(e)}
+        
+        try:
+            outbox = await asyncio.to_thread(get_embedding_outbox_stats)
+        except Exception as e:
+            outbox = {"error": str(e)}
             
         return {
             "status": "ok",
             "current_config": embedding_config.model_info(),
+            "hot_index": hot_index.info(),
+            "text_index": text_index.info(),
+            "http_client": embedding_http.info(),
+            "query_batcher": query_batcher.info(),
+            "embedding_cache": embedding_cache.info(),
+            "reembed_jobs": jsonable_encoder(reembed_jobs),
+            "embedding_outbox": {**outbox, "workers": embedding_workers.info()},
             "database_stats": {
                 "total_articles": total_articles,
                 "vector_distribution": [
@@ -526,13 +694,55 @@ async def ask(request: AskRequest, http_request: Request, response: Response):
             intent_to_category = {"sports": "sports", "markets": "finance"}
             category = intent_to_category.get(clf["intent"], None)
 
+            def _cached_answer(cached_data: Dict[str, Any], cache_tag: str) -> AskResponse:
+                # Add cache header and router info
+                response.headers["X-Cache"] = "HIT"
+                cached_data["router_info"] = f"Routed to: News ({clf['confidence']:.2f}) [cache:{cache_tag}]"
+                
+                # Log cached response metrics
+                cache_latency_ms = (datetime.now(timezone.utc) - start_time).total_seconds() * 1000
+                logger.log_per_answer_metrics(
+                    conversation_id=request.conversation_id,
+                    language=request.lang,
+                    retrieval_scores=[],  # No retrieval for cached responses
+                    k_hits=len(cached_data.get("sources", [])),
+                    tool_calls=[],
+                    token_usage={'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0},
+                    total_latency_ms=cache_latency_ms,
+                    answer_type="answer",
+                    refusal_reason=None,
+                    gate_triggered=None,
+                    intent=clf["intent"],
+                    confidence=clf["confidence"],
+                    has_cache_hit=True,
+                    region=region
+                )
+                return AskResponse(**cached_data)
+
+            # Level-1 cache: keyed on inputs known before retrieval (regex-only window analysis)
+            pre_window_analysis = analyze_query_window(request.query, request.window_hours)
+            cached_data, _ = await get_pre_retrieval_async(
+                mode="news",
+                query=request.query,
+                window_analysis=pre_window_analysis,
+                lang=request.lang,
+                region=region
+            )
+            if cached_data is not None:
+                return _cached_answer(cached_data, "pre")
+
+            # One retrieval plan per request: the query is embedded once and each window
+            # searched once, shared by story retrieval and the guardrail pass below
+            retrieval_plan = RetrievalPlan(request.query, db_repo)
+
             # Smart story retrieval with window analysis and guardrails
             story_context = await retrieve_story_context(
                 request.query,
                 category,
                 db_repo,
                 user_window_hours=request.window_hours,
-                session_id=sid
+                session_id=sid,
+                plan=retrieval_plan
             )
             
             # Extract context
@@ -542,49 +752,33 @@ async def ask(request: AskRequest, http_request: Request, response: Response):
             background_evidence = story_context['background_evidence']
             story_id = story_context['story_id']
             
-            # Check Redis cache with story context
-            cached_data, is_cache_hit = await get_async(
+            # Level-2 cache: story-aware key shared by paraphrases of the same story
+            cached_data, _ = await get_story_async(
                 mode="news",
+                story_id=story_id,
                 query=request.query,
                 lang=request.lang,
                 window_hours=window_analysis['window_hours'],
-                region=region,
-                story_id=story_id
+                region=region
             )
-            
             if cached_data is not None:
-                # Add cache header and router info
-                response.headers["X-Cache"] = "HIT"
-                router_info = f"Routed to: News ({clf['confidence']:.2f}) [cache:{retrieval_strategy}]"
-                cached_data["router_info"] = router_info
-                
-                # Log cached response metrics
-                end_time = datetime.now(timezone.utc)
-                cache_latency_ms = (end_time - start_time).total_seconds() * 1000
-                
-                logger.log_per_answer_metrics(
-                    conversation_id=request.conversation_id,
-                    language=request.lang,
-                    retrieval_scores=[],  # No retrieval for cached responses
-                    k_hits=len(cached_data.get("sources", [])),
-                    tool_calls=[],
-                    token_usage={'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0},
-                    total_latency_ms=cache_latency_ms,
-                    answer_type="answer",
-                    refusal_reason=None,
-                    gate_triggered=None,
-                    intent=clf["intent"],
-                    confidence=clf["confidence"],
-                    has_cache_hit=True,
-                    region=region
+                # Promote to level 1 so a repeat of this query skips retrieval
+                await set_pre_retrieval_async(
+                    mode="news",
+                    query=request.query,
+                    value=cached_data,
+                    window_analysis=pre_window_analysis,
+                    lang=request.lang,
+                    region=region,
+                    is_breaking=pre_window_analysis.get('is_immediate', False)
                 )
-                
-                return AskResponse(**cached_data)
+                return _cached_answer(cached_data, f"story:{retrieval_strategy}")
 
             # Guardrails and routing using hybrid retrieval
             guardrail_info = await hybrid_retrieve_with_guardrails(
                 request.query, category, db_repo, lang=request.lang, intent="news",
-                window_hours=window_analysis['window_hours']
+                window_hours=window_analysis['window_hours'],
+                plan=retrieval_plan
             )
 
             # Route to external tool for volatile facts (stocks, sports, etc.)
@@ -815,12 +1009,12 @@ async def ask(request: AskRequest, http_request: Request, response: Response):
             # Cache the payload with Redis
             response.headers["X-Cache"] = "MISS"
             is_breaking = window_analysis.get('is_immediate', False)
-            await set_async(
+            await set_two_level_async(
                 mode="news",
                 query=request.query,
                 value=payload,
+                window_analysis=window_analysis,
                 lang=request.lang,
-                window_hours=window_analysis['window_hours'],
                 region=region,
                 story_id=story_id,
                 is_breaking=is_breaking
@@ -1534,9 +1728,13 @@ async def root():
             "GET /api/articles": "Get recent articles from database",
             "GET /api/articles/search": "Search articles by keyword",
             "GET /api/articles/similar": "Find similar articles using vector search",
-            "GET /admin/ingest/run": "Force RSS ingestion cycle (dev/admin)",
+            "GET /admin/ingest/run": "Request a full RSS ingestion cycle from the ingest worker (dev/admin)",
+            "GET /admin/ingest/runs": "Recent ingest runs and current ingest leader",
+            "GET /admin/ingest/runs/{id}": "Status of one requested ingest run",
             "GET /admin/embedding/info": "Get embedding model configuration and statistics",
             "POST /admin/embedding/reset": "Reset embedding index with current model",
+            "POST /admin/embedding/retry-dead": "Re-queue embedding jobs that exhausted their retries",
+            "GET /admin/reranker/info": "Cross-encoder reranker models, batching and score cache stats",
             "POST /admin/conversations/cleanup": "Clean up old conversations",
             "GET /healthz": "Health check endpoint with embedding info",
             "GET /": "This information endpoint"
@@ -17,6 +17,10 @@ MODEL_DIMENSIONS = {
     "text-embedding-ada-002": 1536,
 }
 
+# Models whose embeddings can be shortened (Matryoshka-trained): the first N
+# dimensions, re-normalized, are a valid N-dim embedding of the same text
+SHORTENABLE_MODELS = {"text-embedding-3-large", "text-embedding-3-small"}
+
 # Environment configuration
 # Support separate env vars for store/query while enforcing unification
 EMBED_STORE_ENV = os.getenv("OPENAI_EMBED_MODEL_STORE")
@@ -28,6 +32,16 @@ DEFAULT_MODEL = "text-embedding-3-large"
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 
+# Embeddings endpoint; point at the offline stand-in
+# (services/embedding_standin) for load tests and CI
+DEFAULT_EMBED_BASE_URL = "https://api.openai.com/v1/embeddings"
+EMBED_BASE_URL_ENV = os.getenv("OPENAI_EMBED_BASE_URL", DEFAULT_EMBED_BASE_URL)
+
+# Two-stage search: ANN over a shortened copy of each vector (0 = off), then
+# rescoring EMBED_SEARCH_OVERFETCH x limit candidates with the full vector
+EMBED_SEARCH_DIM_ENV = os.getenv("EMBED_SEARCH_DIM", "0")
+EMBED_SEARCH_OVERFETCH_ENV = os.getenv("EMBED_SEARCH_OVERFETCH", "4")
+
 class EmbeddingConfig:
     """Centralized embedding configuration with validation."""
     
@@ -46,6 +60,8 @@ class EmbeddingConfig:
 
         self._model = chosen_store
         self._api_key = OPENAI_API_KEY
+        self._search_dim = int(EMBED_SEARCH_DIM_ENV or 0) or None
+        self._search_overfetch = max(1, int(EMBED_SEARCH_OVERFETCH_ENV or 1))
         self._validate_config()
     
     def _validate_config(self) -> None:
@@ -62,6 +78,18 @@ class EmbeddingConfig:
                 f"Unsupported embedding model: {self._model}. "
                 f"Available models: {available_models}"
             )
+
+        if self._search_dim is not None:
+            if self._model not in SHORTENABLE_MODELS:
+                raise ValueError(
+                    f"EMBED_SEARCH_DIM={self._search_dim} requires a model that supports shortened "
+                    f"embeddings ({', '.join(sorted(SHORTENABLE_MODELS))}); got {self._model}"
+                )
+            if not 0 < self._search_dim < self.dimension:
+                raise ValueError(
+                    f"EMBED_SEARCH_DIM must be between 1 and {self.dimension - 1} for {self._model}; "
+                    f"got {self._search_dim}"
+                )
     
     @property
     def model_name(self) -> str:
@@ -73,6 +101,21 @@ class EmbeddingConfig:
         """Get the embedding dimension for the configured model."""
         return MODEL_DIMENSIONS[self._model]
     
+    @property
+    def search_dimension(self) -> Optional[int]:
+        """Dimension of the shortened search vector, or None for single-stage search."""
+        return self._search_dim
+    
+    @property
+    def two_stage(self) -> bool:
+        """Whether ANN search runs on shortened vectors with full-vector rescoring."""
+        return self._search_dim is not None
+    
+    @property
+    def search_overfetch(self) -> int:
+        """Candidates fetched per requested result in two-stage search."""
+        return self._search_overfetch
+    
     @property
     def api_key(self) -> str:
         """Get the OpenAI API key."""
@@ -81,15 +124,25 @@ class EmbeddingConfig:
     @property
     def base_url(self) -> str:
         """Get the OpenAI embeddings API base URL."""
-        return "https://api.openai.com/v1/embeddings"
+        return EMBED_BASE_URL_ENV
+
+    @property
+    def endpoint_id(self) -> str:
+        """Identity of a non-default embeddings endpoint ("" for OpenAI).
+
+        Part of embedding cache keys and content hashes, so vectors from the
+        stand-in server are never reused for (or mistaken for) real ones.
+        """
+        return "" if EMBED_BASE_URL_ENV == DEFAULT_EMBED_BASE_URL else EMBED_BASE_URL_ENV
     
     @property
     def headers(self) -> Dict[str, str]:
         """Get the HTTP headers for API requests."""
-        return {
-            "Authorization": f"Bearer {self._api_key}",
-            "Content-Type": "application/json",
-        }
+        headers = {"Content-Type": "application/json"}
+        # No key (e.g. the offline stand-in): an empty bearer token is an illegal header
+        if self._api_key:
+            headers["Authorization"] = f"Bearer {self._api_key}"
+        return headers
     
     def validate_dimension(self, vector_dim: int) -> bool:
         """Validate that a vector dimension matches the configured model."""
@@ -104,6 +157,8 @@ class EmbeddingConfig:
             "supported_models": list(MODEL_DIMENSIONS.keys()),
             "store_model": self.model_name,
             "query_model": self.model_name,
+            "search_dimension": self.search_dimension,
+            "search_overfetch": self.search_overfetch if self.two_stage else None,
         }
 
 # Global configuration instance
@@ -112,6 +167,7 @@ config = EmbeddingConfig()
 # Export key values for easy access
 MODEL_NAME = config.model_name
 EMBEDDING_DIM = config.dimension
+SEARCH_DIM = config.search_dimension
 API_KEY = config.api_key
 BASE_URL = config.base_url
 HEADERS = config.headers
@@ -0,0 +1,166 @@
+"""
+Embedding outbox (embedding_jobs) consumed by the async embedding workers.
+
+Ingest inserts a job in the same transaction as the article upsert
+(repo.upsert_articles_bulk(..., enqueue_embeddings=True)). Workers claim
+batches with FOR UPDATE SKIP LOCKED under a lease, so any number of worker
+processes can drain the table; a crashed worker's lease simply expires.
+Failed jobs are retried with exponential backoff and parked as 'dead' after
+EMBED_JOB_MAX_ATTEMPTS.
+"""
+import os
+import uuid
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from packages.db.repo import (
+    session_scope, text, config, article_embedding_text, embedding_content_hash,
+    _upsert_embedding_rows,
+)
+
+EMBED_JOB_MAX_ATTEMPTS = int(os.getenv("EMBED_JOB_MAX_ATTEMPTS", "8"))
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 3600
+
+
+def claim_embedding_jobs(worker_id: str, limit: int = 128, lease_seconds: int = 120) -> List[Dict[str, Any]]:
+    """Lease up to `limit` due jobs, oldest first.
+
+    Each job comes back with the article's current embedding text and its
+    hash (`content_hash`) plus the hash it was queued with (`job_hash`).
+    """
+    with session_scope() as session:
+        rows = session.execute(
+            text(
+                """
+                UPDATE embedding_jobs j
+                SET locked_by = :worker_id,
+                    locked_until = now() + make_interval(secs => :lease),
+                    attempts = j.attempts + 1
+                FROM articles a
+                WHERE a.id = j.article_id
+                  AND j.article_id IN (
+                    SELECT article_id FROM embedding_jobs
+                    WHERE status = 'pending'
+                      AND available_at <= now()
+                      AND (locked_until IS NULL OR locked_until < now())
+                    ORDER BY enqueued_at
+                    LIMIT :limit
+                    FOR UPDATE SKIP LOCKED
+                  )
+                RETURNING j.article_id, j.content_hash, j.attempts, a.title, a.summary
+                """
+            ),
+            {"worker_id": worker_id, "lease": int(lease_seconds), "limit": int(limit)},
+        ).fetchall()
+
+    jobs = []
+    for article_id, job_hash, attempts, title, summary in rows:
+        text_for_store = article_embedding_text(title, summary)
+        jobs.append({
+            "article_id": article_id,
+            "text": text_for_store,
+            "content_hash": embedding_content_hash(text_for_store) if text_for_store else None,
+            "job_hash": job_hash,
+            "attempts": attempts,
+        })
+    return jobs
+
+
+def complete_embedding_jobs(results: Sequence[Tuple[uuid.UUID, Sequence[float], Optional[str], Optional[str]]]) -> int:
+    """Write (article_id, vector, content_hash, job_hash) and drop the finished jobs.
+
+    Vectors and job deletion commit together. A job re-queued with a newer
+    hash while it was being embedded is left for the next pass.
+    """
+    if not results:
+        return 0
+    expected_dim = config.dimension
+    pairs = [(aid, vec) for aid, vec, _, _ in results if vec is not None and len(vec) == expected_dim]
+    with session_scope() as session:
+        if pairs:
+            _upsert_embedding_rows(session, pairs, {aid: content_hash for aid, _, content_hash, _ in results})
+        written = {aid for aid, _ in pairs}
+        for aid, _, _, job_hash in results:
+            if aid not in written:
+                continue
+            session.execute(
+                text(
+                    """
+                    DELETE FROM embedding_jobs
+                    WHERE article_id = :article_id
+                      AND content_hash IS NOT DISTINCT FROM :job_hash
+                    """
+                ),
+                {"article_id": aid, "job_hash": job_hash},
+            )
+    return len(pairs)
+
+
+def fail_embedding_jobs(article_ids: Sequence[uuid.UUID], error: str) -> None:
+    """Release failed jobs with exponential backoff; park them after max attempts."""
+    if not article_ids:
+        return
+    with session_scope() as session:
+        session.execute(
+            text(
+                """
+                UPDATE embedding_jobs
+                SET locked_by = NULL,
+                    locked_until = NULL,
+                    last_error = :error,
+                    status = CASE WHEN attempts >= :max_attempts THEN 'dead' ELSE 'pending' END,
+                    available_at = now() + make_interval(
+                        secs => LEAST(:max_delay, :base_delay * power(2, GREATEST(attempts - 1, 0)))
+                    )
+                WHERE article_id = ANY(CAST(:ids AS uuid[]))
+                """
+            ),
+            {
+                "error": error[:2000],
+                "max_attempts": EMBED_JOB_MAX_ATTEMPTS,
+                "max_delay": RETRY_MAX_SECONDS,
+                "base_delay": RETRY_BASE_SECONDS,
+                "ids": list(article_ids),
+            },
+        )
+
+
+def retry_dead_embedding_jobs() -> int:
+    """Put parked jobs back in the queue (e.g. after fixing an API key)."""
+    with session_scope() as session:
+        result = session.execute(text(
+            """
+            UPDATE embedding_jobs
+            SET status = 'pending', attempts = 0, available_at = now(), last_error = NULL
+            WHERE status = 'dead'
+            """
+        ))
+        return result.rowcount or 0
+
+
+def get_embedding_outbox_stats() -> Dict[str, Any]:
+    """Queue depth, dead jobs and age of the oldest pending job."""
+    with session_scope() as session:
+        row = session.execute(text(
+            """
+            SELECT
+                COUNT(*) FILTER (WHERE status = 'pending') AS pending,
+                COUNT(*) FILTER (WHERE status = 'pending' AND locked_until > now()) AS in_progress,
+                COUNT(*) FILTER (WHERE status = 'pending' AND attempts > 0) AS retrying,
+                COUNT(*) FILTER (WHERE status = 'dead') AS dead,
+                EXTRACT(EPOCH FROM (now() - MIN(enqueued_at) FILTER (WHERE status = 'pending'))) AS oldest_pending_s
+            FROM embedding_jobs
+            """
+        )).mappings().one()
+        stats = dict(row)
+        last_error = session.execute(text(
+            """
+            SELECT last_error FROM embedding_jobs
+            WHERE last_error IS NOT NULL
+            ORDER BY available_at DESC
+            LIMIT 1
+            """
+        )).scalar()
+    stats["oldest_pending_s"] = float(stats["oldest_pending_s"]) if stats["oldest_pending_s"] is not None else None
+    stats["last_error"] = last_error
+    return stats
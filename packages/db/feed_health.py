@@ -7,7 +7,7 @@ from dataclasses import dataclass
 import uuid
 
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import Json, RealDictCursor
 
 from packages.db.repo import get_db_config
 
@@ -24,6 +24,8 @@ class FeedHealthMetrics:
     health_score: float
     is_enabled: bool
     error_details: Optional[str]
+    # Adaptive poll schedule written by the ingest leader (FeedSchedule.state_for)
+    schedule: Optional[Dict[str, Any]] = None
     
     @property
     def uptime_percentage(self) -> float:
@@ -99,6 +101,14 @@ def init_feed_health_db():
                 );
             """)
             
+            # HTTP validators for conditional GETs (added after initial schema)
+            cur.execute("""
+                ALTER TABLE feed_health ADD COLUMN IF NOT EXISTS etag TEXT;
+                ALTER TABLE feed_health ADD COLUMN IF NOT EXISTS last_modified TEXT;
+                ALTER TABLE feed_health ADD COLUMN IF NOT EXISTS schedule JSONB;
+                ALTER TABLE feed_health ADD COLUMN IF NOT EXISTS seen_entries JSONB;
+            """)
+            
             # Create index for fast lookups
             cur.execute("""
                 CREATE INDEX IF NOT EXISTS idx_feed_health_url ON feed_health(feed_url);
@@ -130,8 +140,21 @@ def init_feed_health_db():
 
 def record_feed_attempt(feed_url: str, feed_name: str, success: bool, 
                        latency_ms: int, error_message: Optional[str] = None, 
-                       articles_fetched: int = 0):
-    """Record a feed fetch attempt and update health metrics"""
+                       articles_fetched: int = 0, etag: Optional[str] = None,
+                       last_modified: Optional[str] = None,
+                       schedule: Optional[Dict[str, Any]] = None,
+                       seen_entries: Optional[List[str]] = None):
+    """Record a feed fetch attempt and update health metrics
+    
+    On success, the response's ETag / Last-Modified (if any) are stored for
+    the next conditional request; missing values keep the previous ones.
+    `schedule` (the feed's adaptive poll state) is stored so API processes,
+    which do not run the scheduler, can report it. `seen_entries` (the
+    feed's current entry keys) lets a restarted or new leader skip entries
+    already stored (see get_feed_seen_entries).
+    """
+    schedule_json = Json(schedule) if schedule is not None else None
+    seen_json = Json(list(seen_entries)) if seen_entries is not None else None
     db_config = get_db_config()
     
     with psycopg2.connect(**db_config) as conn:
@@ -147,28 +170,34 @@ def record_feed_attempt(feed_url: str, feed_name: str, success: bool,
             if success:
                 cur.execute("""
                     INSERT INTO feed_health 
-                    (feed_url, feed_name, last_success, last_attempt, success_count, total_latency_ms)
-                    VALUES (%s, %s, NOW(), NOW(), 1, %s)
+                    (feed_url, feed_name, last_success, last_attempt, success_count, total_latency_ms,
+                     etag, last_modified, schedule, seen_entries)
+                    VALUES (%s, %s, NOW(), NOW(), 1, %s, %s, %s, %s, %s)
                     ON CONFLICT (feed_url) DO UPDATE SET
                         feed_name = EXCLUDED.feed_name,
                         last_success = NOW(),
                         last_attempt = NOW(),
                         success_count = feed_health.success_count + 1,
                         total_latency_ms = feed_health.total_latency_ms + %s,
+                        etag = COALESCE(EXCLUDED.etag, feed_health.etag),
+                        last_modified = COALESCE(EXCLUDED.last_modified, feed_health.last_modified),
+                        schedule = COALESCE(EXCLUDED.schedule, feed_health.schedule),
+                        seen_entries = COALESCE(EXCLUDED.seen_entries, feed_health.seen_entries),
                         updated_at = NOW()
-                """, (feed_url, feed_name, latency_ms, latency_ms))
+                """, (feed_url, feed_name, latency_ms, etag, last_modified, schedule_json, seen_json, latency_ms))
             else:
                 cur.execute("""
                     INSERT INTO feed_health 
-                    (feed_url, feed_name, last_attempt, error_count, error_details)
-                    VALUES (%s, %s, NOW(), 1, %s)
+                    (feed_url, feed_name, last_attempt, error_count, error_details, schedule)
+                    VALUES (%s, %s, NOW(), 1, %s, %s)
                     ON CONFLICT (feed_url) DO UPDATE SET
                         feed_name = EXCLUDED.feed_name,
                         last_attempt = NOW(),
                         error_count = feed_health.error_count + 1,
                         error_details = %s,
+                        schedule = COALESCE(EXCLUDED.schedule, feed_health.schedule),
                         updated_at = NOW()
-                """, (feed_url, feed_name, error_message, error_message))
+                """, (feed_url, feed_name, error_message, schedule_json, error_message))
             
             # Calculate and update health metrics
             _update_health_metrics(cur, feed_url)
@@ -245,7 +274,7 @@ def get_feed_health_metrics() -> List[FeedHealthMetrics]:
             cur.execute("""
                 SELECT feed_url, feed_name, last_success, last_attempt,
                        success_count, error_count, avg_latency_ms, health_score,
-                       is_enabled, error_details
+                       is_enabled, error_details, schedule
                 FROM feed_health
                 ORDER BY health_score DESC
             """)
@@ -262,7 +291,8 @@ def get_feed_health_metrics() -> List[FeedHealthMetrics]:
                     avg_latency_ms=row['avg_latency_ms'],
                     health_score=row['health_score'],
                     is_enabled=row['is_enabled'],
-                    error_details=row['error_details']
+                    error_details=row['error_details'],
+                    schedule=row['schedule']
                 ))
             
             return results
@@ -317,6 +347,80 @@ def disable_unhealthy_feeds():
     return disabled_feeds
 
 
+def get_feed_validators(feed_url: str) -> Tuple[Optional[str], Optional[str]]:
+    """Get the stored (etag, last_modified) for conditional fetches of a feed"""
+    db_config = get_db_config()
+    
+    try:
+        with psycopg2.connect(**db_config) as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT etag, last_modified
+                    FROM feed_health 
+                    WHERE feed_url = %s
+                """, (feed_url,))
+                
+                result = cur.fetchone()
+                if not result:
+                    return None, None
+                return result[0], result[1]
+                
+    except Exception as e:
+        print(f"[HEALTH] Error getting validators for {feed_url}: {e}")
+        return None, None
+
+
+def get_feed_seen_entries(feed_url: str) -> List[str]:
+    """Entry keys stored by the last successful fetch of a feed (empty if none)"""
+    db_config = get_db_config()
+    
+    try:
+        with psycopg2.connect(**db_config) as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT seen_entries
+                    FROM feed_health 
+                    WHERE feed_url = %s
+                """, (feed_url,))
+                
+                result = cur.fetchone()
+                if not result or not result[0]:
+                    return []
+                return list(result[0])
+                
+    except Exception as e:
+        print(f"[HEALTH] Error getting seen entries for {feed_url}: {e}")
+        return []
+
+
+def get_feed_publish_rates(hours: int = 24) -> Dict[str, float]:
+    """Estimate each feed's new items per hour from recent successful fetches"""
+    db_config = get_db_config()
+    
+    try:
+        with psycopg2.connect(**db_config) as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    SELECT feed_url,
+                           SUM(articles_fetched) AS items,
+                           EXTRACT(EPOCH FROM (MAX(attempt_time) - MIN(attempt_time))) / 3600.0 AS span_hours
+                    FROM feed_health_history
+                    WHERE success = TRUE AND attempt_time > NOW() - make_interval(hours => %s)
+                    GROUP BY feed_url
+                    HAVING COUNT(*) >= 2
+                """, (int(hours),))
+                
+                rates = {}
+                for feed_url, items, span_hours in cur.fetchall():
+                    if span_hours and span_hours > 0:
+                        rates[feed_url] = float(items or 0) / float(span_hours)
+                return rates
+                
+    except Exception as e:
+        print(f"[HEALTH] Error estimating publish rates: {e}")
+        return {}
+
+
 def get_feed_timeout(feed_url: str) -> int:
     """Get adaptive timeout for a feed based on its historical performance"""
     db_config = get_db_config()
@@ -0,0 +1,192 @@
+"""
+Ingest run requests and leader status shared between API and ingest worker.
+
+API processes never ingest themselves: they insert a 'requested' row that the
+elected ingest worker claims, runs and completes. The leader also keeps a
+heartbeat row so the API can show who is ingesting.
+"""
+from typing import Any, Dict, List, Optional
+
+import psycopg2
+from psycopg2.extras import RealDictCursor
+
+from packages.db.repo import get_db_config
+
+# Key for pg_try_advisory_lock; any constant shared by all ingest instances
+INGEST_LEADER_LOCK_KEY = 0x4B48_4F42  # "KHOB"
+
+
+def init_ingest_runs_db():
+    """Initialize ingest run and leader tables"""
+    db_config = get_db_config()
+
+    with psycopg2.connect(**db_config) as conn:
+        with conn.cursor() as cur:
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS ingest_runs (
+                    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+                    status TEXT NOT NULL DEFAULT 'requested',
+                    requested_by TEXT,
+                    requested_at TIMESTAMPTZ DEFAULT NOW(),
+                    started_at TIMESTAMPTZ,
+                    finished_at TIMESTAMPTZ,
+                    worker_id TEXT,
+                    feeds INTEGER,
+                    embedded INTEGER,
+                    error TEXT
+                );
+            """)
+            cur.execute("""
+                CREATE INDEX IF NOT EXISTS idx_ingest_runs_status_time
+                ON ingest_runs(status, requested_at);
+            """)
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS ingest_leader (
+                    id INTEGER PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+                    worker_id TEXT NOT NULL,
+                    acquired_at TIMESTAMPTZ NOT NULL,
+                    heartbeat_at TIMESTAMPTZ NOT NULL
+                );
+            """)
+            cur.execute("""
+                ALTER TABLE ingest_leader ADD COLUMN IF NOT EXISTS fetch_concurrency INTEGER;
+            """)
+        conn.commit()
+
+
+def request_ingest_run(requested_by: str = "api") -> Dict[str, Any]:
+    """Queue a full ingest cycle for the leader, reusing one already pending"""
+    db_config = get_db_config()
+
+    with psycopg2.connect(**db_config) as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute("""
+                SELECT * FROM ingest_runs
+                WHERE status IN ('requested', 'running')
+                ORDER BY requested_at
+                LIMIT 1
+            """)
+            pending = cur.fetchone()
+            if pending:
+                return dict(pending)
+
+            cur.execute("""
+                INSERT INTO ingest_runs (requested_by) VALUES (%s)
+                RETURNING *
+            """, (requested_by,))
+            run = dict(cur.fetchone())
+        conn.commit()
+    return run
+
+
+def claim_next_run(worker_id: str) -> Optional[Dict[str, Any]]:
+    """Mark the oldest requested run as running by this worker"""
+    db_config = get_db_config()
+
+    with psycopg2.connect(**db_config) as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute("""
+                UPDATE ingest_runs
+                SET status = 'running', started_at = NOW(), worker_id = %s
+                WHERE id = (
+                    SELECT id FROM ingest_runs
+                    WHERE status = 'requested'
+                    ORDER BY requested_at
+                    LIMIT 1
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING *
+            """, (worker_id,))
+            row = cur.fetchone()
+        conn.commit()
+    return dict(row) if row else None
+
+
+def finish_run(run_id, feeds: int = 0, embedded: int = 0, error: Optional[str] = None):
+    """Record the outcome of a claimed run"""
+    db_config = get_db_config()
+
+    with psycopg2.connect(**db_config) as conn:
+        with conn.cursor() as cur:
+            cur.execute("""
+                UPDATE ingest_runs
+                SET status = %s, finished_at = NOW(), feeds = %s, embedded = %s, error = %s
+                WHERE id = %s
+            """, ('failed' if error else 'done', feeds, embedded, error, str(run_id)))
+        conn.commit()
+
+
+def fail_orphaned_runs(worker_id: str):
+    """Fail runs left 'running' by a previous leader that died mid-cycle"""
+    db_config = get_db_config()
+
+    with psycopg2.connect(**db_config) as conn:
+        with conn.cursor() as cur:
+            cur.execute("""
+                UPDATE ingest_runs
+                SET status = 'failed', finished_at = NOW(), error = 'leader lost before completion'
+                WHERE status = 'running' AND worker_id IS DISTINCT FROM %s
+            """, (worker_id,))
+        conn.commit()
+
+
+def get_ingest_run(run_id) -> Optional[Dict[str, Any]]:
+    """Get one ingest run by id"""
+    db_config = get_db_config()
+
+    with psycopg2.connect(**db_config) as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute("SELECT * FROM ingest_runs WHERE id = %s", (str(run_id),))
+            row = cur.fetchone()
+    return dict(row) if row else None
+
+
+def list_ingest_runs(limit: int = 20) -> List[Dict[str, Any]]:
+    """Most recent ingest runs, newest first"""
+    db_config = get_db_config()
+
+    with psycopg2.connect(**db_config) as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute("""
+                SELECT * FROM ingest_runs
+                ORDER BY requested_at DESC
+                LIMIT %s
+            """, (int(limit),))
+            return [dict(row) for row in cur.fetchall()]
+
+
+def record_leader_heartbeat(worker_id: str, acquired: bool = False, fetch_concurrency: Optional[int] = None):
+    """Upsert the leader row; `acquired` resets acquired_at for a new leader
+
+    `fetch_concurrency` is the leader's feed fetch budget, shown by the API.
+    """
+    db_config = get_db_config()
+
+    with psycopg2.connect(**db_config) as conn:
+        with conn.cursor() as cur:
+            cur.execute("""
+                INSERT INTO ingest_leader (id, worker_id, acquired_at, heartbeat_at, fetch_concurrency)
+                VALUES (1, %s, NOW(), NOW(), %s)
+                ON CONFLICT (id) DO UPDATE SET
+                    worker_id = EXCLUDED.worker_id,
+                    acquired_at = CASE WHEN %s OR ingest_leader.worker_id <> EXCLUDED.worker_id
+                                       THEN NOW() ELSE ingest_leader.acquired_at END,
+                    heartbeat_at = NOW(),
+                    fetch_concurrency = EXCLUDED.fetch_concurrency
+            """, (worker_id, fetch_concurrency, acquired))
+        conn.commit()
+
+
+def get_leader_status() -> Optional[Dict[str, Any]]:
+    """Current leader and seconds since its last heartbeat"""
+    db_config = get_db_config()
+
+    with psycopg2.connect(**db_config) as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute("""
+                SELECT worker_id, acquired_at, heartbeat_at, fetch_concurrency,
+                       EXTRACT(EPOCH FROM (NOW() - heartbeat_at)) AS heartbeat_age_s
+                FROM ingest_leader WHERE id = 1
+            """)
+            row = cur.fetchone()
+    return dict(row) if row else None
@@ -15,7 +15,7 @@ from sqlalchemy import (
     Boolean,
     Integer,
 )
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import declarative_base, relationship
 from sqlalchemy.types import UserDefinedType
 
@@ -30,9 +30,11 @@ Base = declarative_base()
 class Vector(UserDefinedType):
     """Postgres pgvector type.
 
-    Generates VECTOR(dim) in DDL. Values should be bound as strings in the
-    pgvector input format, e.g. "[0.1, 0.2, 0.3]". This avoids requiring the
-    python pgvector adapter while keeping DDL correct.
+    Generates VECTOR(dim) in DDL. Values are bound as float32 NumPy arrays,
+    which the pgvector psycopg adapter (registered per connection in
+    packages.db.repo) sends in pgvector's binary format. Connections without
+    the adapter fall back to strings in the pgvector input format, e.g.
+    "[0.1, 0.2, 0.3]".
     """
 
     def __init__(self, dim: int):
@@ -42,14 +44,16 @@ class Vector(UserDefinedType):
         return f"vector({int(self.dim)})"
 
     def bind_processor(self, dialect):  # type: ignore[override]
-        # We pass strings already formatted as pgvector literals.
+        # Repo passes either a float32 ndarray (binary) or a pgvector literal.
         def process(value):
             return value
         return process
 
     def result_processor(self, dialect, coltype):  # type: ignore[override]
-        # Return the raw database value (driver returns list or string depending on adapter)
+        # The pgvector adapter loads pgvector.Vector; hand callers NumPy directly
         def process(value):
+            if hasattr(value, "to_numpy"):
+                return value.to_numpy()
             return value
         return process
 
@@ -65,6 +69,10 @@ class Article(Base):
     summary = Column(Text, nullable=True)
     published_at = Column(DateTime(timezone=True), nullable=True)
     inserted_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    # Last change to title/summary/published_at; watermark for text index refreshes
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    # Query-independent text features computed at upsert (packages.nlp.article_features)
+    features = Column(JSONB, nullable=True)
 
     vector = relationship(
         "ArticleVector",
@@ -82,11 +90,33 @@ class ArticleVector(Base):
     embedding = Column(Vector(config.dimension), nullable=False)
     model_name = Column(String(64), nullable=False, default=config.model_name)
     model_dimension = Column(Integer, nullable=False, default=config.dimension)
+    # sha256 of normalized embedded text + model name + dimension
+    content_hash = Column(String(64), nullable=True)
+    if config.two_stage:
+        # Shortened, re-normalized prefix of `embedding` for ANN candidates;
+        # `embedding` is only read to rescore them
+        embedding_short = Column(Vector(config.search_dimension), nullable=True)
     updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
 
     article = relationship("Article", back_populates="vector")
 
 
+class EmbeddingJob(Base):
+    """Outbox row: article needs (re-)embedding. Written in the article upsert's transaction."""
+    __tablename__ = "embedding_jobs"
+
+    article_id = Column(UUID(as_uuid=True), ForeignKey("articles.id", ondelete="CASCADE"), primary_key=True)
+    # Hash of the text the vector should be built from (embedding_content_hash)
+    content_hash = Column(String(64), nullable=True)
+    status = Column(String(16), nullable=False, server_default="pending")  # pending | dead
+    attempts = Column(Integer, nullable=False, server_default="0")
+    last_error = Column(Text, nullable=True)
+    enqueued_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    available_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), index=True)
+    locked_by = Column(String(128), nullable=True)
+    locked_until = Column(DateTime(timezone=True), nullable=True)
+
+
 class Source(Base):
     __tablename__ = "sources"
 
@@ -0,0 +1,199 @@
+"""
+Checkpoints for resumable re-embedding jobs (scripts/reembed_articles.py).
+
+A job splits the article UUID space into `partitions` contiguous ranges. Each
+partition keeps its own row: the last article id it finished (keyset
+cursor), counters, and which worker holds it. A restarted job resumes every
+unfinished partition after its cursor; several worker processes can share a
+job because a partition is only claimed when it is free or its holder has
+stopped heartbeating. Once every partition is done, the next run of the same
+job starts a new pass from the beginning (see restart_finished_job).
+"""
+from typing import Any, Dict, List, Optional
+
+import psycopg2
+from psycopg2.extras import RealDictCursor
+
+from packages.db.repo import get_db_config
+
+# A partition whose holder has not checkpointed for this long can be taken over
+STALE_CLAIM_SECONDS = 300
+
+
+def init_reembed_db():
+    """Initialize the re-embed checkpoint table"""
+    db_config = get_db_config()
+
+    with psycopg2.connect(**db_config) as conn:
+        with conn.cursor() as cur:
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS reembed_checkpoints (
+                    job_id TEXT NOT NULL,
+                    partition INTEGER NOT NULL,
+                    partitions INTEGER NOT NULL,
+                    model_name TEXT NOT NULL,
+                    model_dimension INTEGER NOT NULL,
+                    last_article_id UUID,
+                    processed INTEGER NOT NULL DEFAULT 0,
+                    skipped INTEGER NOT NULL DEFAULT 0,
+                    errors INTEGER NOT NULL DEFAULT 0,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    worker_id TEXT,
+                    started_at TIMESTAMPTZ DEFAULT NOW(),
+                    updated_at TIMESTAMPTZ DEFAULT NOW(),
+                    finished_at TIMESTAMPTZ,
+                    PRIMARY KEY (job_id, partition)
+                );
+            """)
+        conn.commit()
+
+
+def create_job(job_id: str, partitions: int, model_name: str, model_dimension: int) -> int:
+    """Create partition rows for a job if missing; returns the job's partition count.
+
+    An existing job keeps its original partitioning so checkpoints stay valid.
+    """
+    db_config = get_db_config()
+
+    with psycopg2.connect(**db_config) as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT MAX(partitions) FROM reembed_checkpoints WHERE job_id = %s", (job_id,))
+            existing = cur.fetchone()[0]
+            if existing:
+                return int(existing)
+            for partition in range(partitions):
+                cur.execute("""
+                    INSERT INTO reembed_checkpoints (job_id, partition, partitions, model_name, model_dimension)
+                    VALUES (%s, %s, %s, %s, %s)
+                    ON CONFLICT (job_id, partition) DO NOTHING
+                """, (job_id, partition, partitions, model_name, model_dimension))
+        conn.commit()
+    return partitions
+
+
+def restart_finished_job(job_id: str) -> bool:
+    """Reset a job whose partitions are all done so it runs a new pass
+
+    Cursors and counters are cleared; articles whose stored content hash is
+    current are skipped again by the pass itself. A job with any unfinished
+    partition is left alone so resuming workers keep their checkpoints.
+    Returns True if the job was reset.
+    """
+    db_config = get_db_config()
+
+    with psycopg2.connect(**db_config) as conn:
+        with conn.cursor() as cur:
+            # Row locks serialize workers starting at the same time: only one resets
+            cur.execute("SELECT status FROM reembed_checkpoints WHERE job_id = %s FOR UPDATE", (job_id,))
+            statuses = [row[0] for row in cur.fetchall()]
+            if not statuses or any(status != 'done' for status in statuses):
+                return False
+            cur.execute("""
+                UPDATE reembed_checkpoints
+                SET status = 'pending', worker_id = NULL, last_article_id = NULL,
+                    processed = 0, skipped = 0, errors = 0,
+                    started_at = NOW(), updated_at = NOW(), finished_at = NULL
+                WHERE job_id = %s
+            """, (job_id,))
+        conn.commit()
+    return True
+
+
+def claim_partition(job_id: str, partition: int, worker_id: str) -> Optional[Dict[str, Any]]:
+    """Take an unfinished partition that is free, stale, or already ours"""
+    db_config = get_db_config()
+
+    with psycopg2.connect(**db_config) as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute("""
+                UPDATE reembed_checkpoints
+                SET status = 'running', worker_id = %s, updated_at = NOW()
+                WHERE job_id = %s AND partition = %s
+                  AND status <> 'done'
+                  AND (status <> 'running'
+                       OR worker_id = %s
+                       OR updated_at < NOW() - make_interval(secs => %s))
+                RETURNING *
+            """, (worker_id, job_id, partition, worker_id, STALE_CLAIM_SECONDS))
+            row = cur.fetchone()
+        conn.commit()
+    return dict(row) if row else None
+
+
+def save_checkpoint(job_id: str, partition: int, worker_id: str, last_article_id, processed: int = 0,
+                    skipped: int = 0, errors: int = 0) -> bool:
+    """Advance a partition's cursor after its page is stored; counters are deltas
+
+    Only the worker holding the claim can move the cursor. Returns False if
+    another worker has taken the partition over, so the caller must stop.
+    """
+    db_config = get_db_config()
+
+    with psycopg2.connect(**db_config) as conn:
+        with conn.cursor() as cur:
+            cur.execute("""
+                UPDATE reembed_checkpoints
+                SET last_article_id = %s,
+                    processed = processed + %s,
+                    skipped = skipped + %s,
+                    errors = errors + %s,
+                    updated_at = NOW()
+                WHERE job_id = %s AND partition = %s AND worker_id = %s
+            """, (str(last_article_id), processed, skipped, errors, job_id, partition, worker_id))
+            saved = cur.rowcount == 1
+        conn.commit()
+    return saved
+
+
+def finish_partition(job_id: str, partition: int, worker_id: str, status: str = 'done'):
+    """Mark our partition done (or 'failed'/'pending' to let another worker retry)"""
+    db_config = get_db_config()
+
+    with psycopg2.connect(**db_config) as conn:
+        with conn.cursor() as cur:
+            cur.execute("""
+                UPDATE reembed_checkpoints
+                SET status = %s, updated_at = NOW(),
+                    finished_at = CASE WHEN %s = 'done' THEN NOW() ELSE finished_at END
+                WHERE job_id = %s AND partition = %s AND worker_id = %s
+            """, (status, status, job_id, partition, worker_id))
+        conn.commit()
+
+
+def get_reembed_progress(limit: int = 5) -> List[Dict[str, Any]]:
+    """Per-job totals for the most recently active re-embed jobs"""
+    db_config = get_db_config()
+
+    with psycopg2.connect(**db_config) as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute("""
+                SELECT
+                    job_id,
+                    MAX(model_name) AS model_name,
+                    MAX(model_dimension) AS model_dimension,
+                    MAX(partitions) AS partitions,
+                    COUNT(*) FILTER (WHERE status = 'done') AS partitions_done,
+                    COUNT(*) FILTER (WHERE status = 'running') AS partitions_running,
+                    COUNT(*) FILTER (WHERE status = 'failed') AS partitions_failed,
+                    SUM(processed) AS processed,
+                    SUM(skipped) AS skipped,
+                    SUM(errors) AS errors,
+                    COUNT(DISTINCT worker_id) FILTER (WHERE status = 'running') AS workers,
+                    MIN(started_at) AS started_at,
+                    MAX(updated_at) AS updated_at,
+                    EXTRACT(EPOCH FROM (MAX(updated_at) - MIN(started_at))) AS elapsed_s
+                FROM reembed_checkpoints
+                GROUP BY job_id
+                ORDER BY MAX(updated_at) DESC
+                LIMIT %s
+            """, (int(limit),))
+            jobs = [dict(row) for row in cur.fetchall()]
+
+    for job in jobs:
+        job["status"] = (
+            "done" if job["partitions_done"] == job["partitions"]
+            else "running" if job["partitions_running"] else "paused"
+        )
+        elapsed = float(job.get("elapsed_s") or 0)
+        job["articles_per_s"] = (job["processed"] or 0) / elapsed if elapsed > 0 else 0.0
+    return jobs
@@ -0,0 +1,197 @@
+"""
+Per-article text features computed once at ingest.
+
+Retrieval used to recompute static properties of every candidate on every
+request: language detection, text richness, content angle, the title
+fingerprint, token sets and published_at parsing. They are now computed
+when an article is upserted and stored as a compact JSONB blob in
+articles.features (returned by search_vectors and the in-process index
+loaders). article_features() reads the blob and only computes, and memoizes
+on the object, for rows written before the column existed or under an older
+FEATURES_VERSION.
+"""
+import math
+import re
+from types import SimpleNamespace
+from typing import Any, Dict, Optional, Union
+
+from packages.nlp.hot_index import _epoch_hours
+from packages.nlp.tokenizer import tokenize
+from packages.util.normalize import fingerprint
+
+# Bump when a feature definition changes; stale blobs are recomputed on read
+FEATURES_VERSION = 2
+
+
+def detect_language(text: str) -> Dict[str, Union[str, float]]:
+    """
+    Simple language detection for Bangla vs English.
+    Returns dict with 'language' and 'confidence'.
+    """
+    if not text:
+        return {"language": "unknown", "confidence": 0.0}
+    
+    # Count Bangla Unicode characters
+    bangla_chars = len(re.findall(r'[\u0980-\u09FF]', text))
+    total_chars = len(re.findall(r'\S', text))  # Non-whitespace chars
+    
+    if total_chars == 0:
+        return {"language": "unknown", "confidence": 0.0}
+    
+    bangla_ratio = bangla_chars / total_chars
+    
+    if bangla_ratio > 0.3:  # Significant Bangla content
+        return {"language": "bn", "confidence": min(bangla_ratio * 2, 1.0)}
+    elif bangla_ratio < 0.05:  # Minimal Bangla content
+        return {"language": "en", "confidence": 1.0 - bangla_ratio}
+    else:
+        return {"language": "mixed", "confidence": 0.5}
+
+
+def calculate_text_richness(text: str) -> float:
+    """
+    Calculate text richness score based on content quality indicators.
+    Higher scores indicate richer, more informative content.
+    """
+    if not text:
+        return 0.0
+    
+    # Length-based factors (with diminishing returns)
+    length = len(text)
+    length_score = min(length / 1000.0, 1.0)  # Cap at 1.0 for 1000+ chars
+    
+    # Sentence structure
+    sentences = len(re.split(r'[.!?।]+', text))
+    sentence_score = min(sentences / 10.0, 1.0)  # Cap at 10 sentences
+    
+    # Vocabulary richness
+    words = re.findall(r'\b\w+\b', text.lower())
+    unique_words = len(set(words))
+    vocab_score = min(unique_words / 100.0, 1.0) if words else 0.0
+    
+    # Information density indicators
+    info_indicators = [
+        len(re.findall(r'\d+', text)) / 50.0,      # Numbers (dates, stats, etc.)
+        len(re.findall(r'[A-Z][a-z]+', text)) / 20.0,  # Proper nouns
+        text.count('"') / 10.0,                     # Quotes
+        text.count(':') / 5.0,                      # Colons (often introduce details)
+    ]
+    info_score = min(sum(info_indicators), 1.0)
+    
+    # Content type bonuses
+    content_bonuses = 0.0
+    if any(word in text.lower() for word in ['analysis', 'report', 'investigation', 'বিশ্লেষণ', 'প্রতিবেদন']):
+        content_bonuses += 0.2
+    if any(word in text.lower() for word in ['exclusive', 'interview', 'statement', 'একচেটিয়া', 'সাক্ষাৎকার']):
+        content_bonuses += 0.2
+    
+    # Combine scores with weights
+    richness = (
+        0.25 * length_score +
+        0.25 * sentence_score + 
+        0.25 * vocab_score +
+        0.15 * info_score +
+        0.10 * content_bonuses
+    )
+    
+    return min(richness, 1.0)
+
+
+def detect_content_angle(article: Any) -> str:
+    """
+    Detect the editorial angle/type of content to help with domain diversity.
+    Returns: 'opinion', 'analysis', 'wire', 'local', 'interview', 'breaking', 'generic'
+    """
+    title = getattr(article, 'title', '').lower()
+    summary = getattr(article, 'summary', '').lower()
+    source = getattr(article, 'source', '').lower()
+    
+    content = f"{title} {summary}"
+    
+    # Opinion indicators
+    opinion_markers = ['opinion', 'editorial', 'op-ed', 'comment', 'analysis', 'perspective', 
+                      'মতামত', 'সম্পাদকীয়', 'বিশ্লেষণ']
+    if any(marker in content or marker in source for marker in opinion_markers):
+        return 'opinion'
+    
+    # Interview indicators  
+    interview_markers = ['interview', 'exclusive', 'speaks', 'says', 'tells', 
+                        'সাক্ষাৎকার', 'একচেটিয়া', 'বলেন', 'জানান']
+    if any(marker in content for marker in interview_markers):
+        return 'interview'
+    
+    # Breaking news indicators
+    breaking_markers = ['breaking', 'urgent', 'just in', 'developing', 'সদ্য', 'জরুরি', 'ব্রেকিং']
+    if any(marker in content for marker in breaking_markers):
+        return 'breaking'
+    
+    # Wire service indicators
+    wire_markers = ['reuters', 'ap', 'afp', 'bloomberg', 'xinhua', 'ians']
+    if any(marker in source for marker in wire_markers):
+        return 'wire'
+    
+    # Local reporting indicators
+    local_markers = ['local', 'correspondent', 'staff reporter', 'স্থানীয়', 'প্রতিনিধি']
+    if any(marker in content or marker in source for marker in local_markers):
+        return 'local'
+    
+    # Analysis indicators
+    analysis_markers = ['report', 'investigation', 'study', 'finds', 'reveals', 
+                       'প্রতিবেদন', 'তদন্ত', 'গবেষণা', 'প্রকাশ']
+    if any(marker in content for marker in analysis_markers):
+        return 'analysis'
+    
+    return 'generic'
+
+
+def _published_hours(published_at: Optional[Any]) -> Optional[float]:
+    hours = _epoch_hours(published_at)
+    return None if math.isnan(hours) else round(hours, 4)
+
+
+def compute_article_features(
+    title: Optional[str],
+    summary: Optional[str],
+    source: Optional[str] = None,
+    published_at: Optional[Any] = None,
+) -> Dict[str, Any]:
+    """Feature blob stored in articles.features."""
+    title = title or ""
+    summary = summary or ""
+    content = f"{title} {summary}"
+    language = detect_language(content)
+    article = SimpleNamespace(title=title, summary=summary, source=source or "")
+    return {
+        "v": FEATURES_VERSION,
+        "lang": language["language"],
+        "lang_conf": float(language["confidence"]),
+        "richness": calculate_text_richness(content),
+        "angle": detect_content_angle(article),
+        "fp": fingerprint(title),
+        "pub_h": _published_hours(published_at),
+        "tokens": sorted(set(tokenize(content))),
+    }
+
+
+def article_features(article: Any) -> Dict[str, Any]:
+    """Stored features of an article, computed (and memoized) when missing or stale."""
+    features = getattr(article, "features", None)
+    if isinstance(features, dict) and features.get("v") == FEATURES_VERSION:
+        return features
+    features = compute_article_features(
+        getattr(article, "title", ""),
+        getattr(article, "summary", ""),
+        getattr(article, "source", ""),
+        getattr(article, "published_at", None),
+    )
+    try:
+        article.features = features
+    except Exception:
+        pass  # read-only objects just recompute next time
+    return features
+
+
+def article_language(article: Any) -> Dict[str, Union[str, float]]:
+    """detect_language() result for an article's title + summary, from its stored features."""
+    features = article_features(article)
+    return {"language": features["lang"], "confidence": features["lang_conf"]}
@@ -1,5 +1,8 @@
 import asyncio
-from typing import List, Sequence
+import os
+import random
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
 import sys
 from pathlib import Path
 
@@ -14,6 +17,28 @@ from packages.config.embedding import (
     BASE_URL, 
     HEADERS
 )
+from packages.util.http_client import SharedAsyncClient
+from packages.observability.metrics import get_metrics
+from packages.nlp.embed_cache import embedding_cache, EMBED_CACHE_ENABLED
+
+# One pooled client for every embedding call in the process; opened at API
+# startup (apps/api/main.py) or lazily on first use elsewhere
+embedding_http = SharedAsyncClient(
+    "embedding",
+    timeout=15.0,
+    max_connections=int(os.getenv("EMBED_HTTP_MAX_CONNECTIONS", "20")),
+    max_keepalive_connections=int(os.getenv("EMBED_HTTP_MAX_KEEPALIVE", "10")),
+    keepalive_expiry=float(os.getenv("EMBED_HTTP_KEEPALIVE_EXPIRY_S", "60")),
+    http2=os.getenv("EMBED_HTTP2", "1") == "1",
+)
+
+# Batch dispatch for embed_store: batches are packed by estimated tokens, at
+# most EMBED_MAX_CONCURRENCY requests are in flight, 429/5xx are retried
+EMBED_MAX_CONCURRENCY = int(os.getenv("EMBED_MAX_CONCURRENCY", "4"))
+EMBED_BATCH_MAX_TOKENS = int(os.getenv("EMBED_BATCH_MAX_TOKENS", "20000"))
+EMBED_MAX_RETRIES = int(os.getenv("EMBED_MAX_RETRIES", "5"))
+RETRY_BASE_DELAY_S = 0.5
+RETRY_MAX_DELAY_S = 20.0
 
 
 def _pad_or_truncate(vecs: List[List[float]], dim: int) -> List[List[float]]:
@@ -32,33 +57,241 @@ async def _embed_batch(texts: List[str], model: str, timeout: float = 15.0) -> L
     # Always use unified model from config to prevent divergence
     model = MODEL_NAME
     payload = {"model": model, "input": texts}
-    async with httpx.AsyncClient(timeout=timeout) as client:
-        resp = await client.post(BASE_URL, json=payload, headers=HEADERS)
-        resp.raise_for_status()
-        data = resp.json()
-        vectors = [item["embedding"] for item in data.get("data", [])]
-        return _pad_or_truncate(vectors, EMBEDDING_DIM)
+    resp = await embedding_http.post(BASE_URL, json=payload, headers=HEADERS, timeout=timeout)
+    resp.raise_for_status()
+    data = resp.json()
+    vectors = [item["embedding"] for item in data.get("data", [])]
+    return _pad_or_truncate(vectors, EMBEDDING_DIM)
+
+
+def _estimate_tokens(text: str) -> int:
+    """Rough token count without a tokenizer.
+
+    ASCII runs average ~4 chars per token; Bangla and other non-ASCII script
+    is far denser (closer to one token per character or two), so it is
+    weighted much more heavily to stay under request limits.
+    """
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    return 1 + (len(text) - non_ascii) // 4 + int(non_ascii * 0.75)
+
+
+def _pack_batches(texts: List[str], max_items: int, max_tokens: int) -> List[List[int]]:
+    """Group text indices into batches bounded by item count and estimated tokens."""
+    batches: List[List[int]] = []
+    current: List[int] = []
+    current_tokens = 0
+    for i, text in enumerate(texts):
+        tokens = _estimate_tokens(text)
+        if current and (len(current) >= max_items or current_tokens + tokens > max_tokens):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(i)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        return status == 429 or status >= 500
+    return isinstance(error, (httpx.TransportError, httpx.TimeoutException))
 
 
-async def embed_store(texts: List[str], batch_size: int = 64) -> List[List[float]]:
-    """Embed texts for storage using the configured model."""
+def _retry_delay(error: Exception, attempt: int) -> float:
+    """Honor Retry-After when the API sends it, else exponential backoff with jitter."""
+    if isinstance(error, httpx.HTTPStatusError):
+        retry_after = error.response.headers.get("retry-after")
+        if retry_after:
+            try:
+                return min(RETRY_MAX_DELAY_S, float(retry_after))
+            except ValueError:
+                pass
+    base = min(RETRY_MAX_DELAY_S, RETRY_BASE_DELAY_S * (2 ** attempt))
+    return base + random.uniform(0, base * 0.25)
+
+
+async def _embed_batch_with_retry(texts: List[str]) -> List[List[float]]:
+    for attempt in range(EMBED_MAX_RETRIES + 1):
+        try:
+            return await _embed_batch(texts, MODEL_NAME)
+        except Exception as e:
+            if attempt >= EMBED_MAX_RETRIES or not _is_retryable(e):
+                raise
+            delay = _retry_delay(e, attempt)
+            print(f"[EMBED] Batch of {len(texts)} failed ({e}); retry {attempt + 1} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+    return []
+
+
+async def embed_store(texts: List[str], batch_size: int = 128) -> List[List[float]]:
+    """Embed texts for storage using the configured model.
+
+    Texts found in the embedding cache are not sent. The rest go in batches
+    (at most `batch_size` texts and EMBED_BATCH_MAX_TOKENS estimated tokens
+    each) sent concurrently, up to EMBED_MAX_CONCURRENCY at a time. Output
+    order matches `texts`.
+    """
     if not texts:
         return []
-    # Chunk into batches
-    batches = [texts[i : i + batch_size] for i in range(0, len(texts), batch_size)]
-    results: List[List[float]] = []
-    for batch in batches:
-        vecs = await _embed_batch(batch, MODEL_NAME)
-        results.extend(vecs)
+    if EMBED_CACHE_ENABLED:
+        cached = await embedding_cache.get_many(texts, kind="store")
+        todo = [i for i, vec in enumerate(cached) if vec is None]
+        if todo:
+            fresh = await _embed_store_uncached([texts[i] for i in todo], batch_size)
+            await embedding_cache.put_many([texts[i] for i in todo], fresh)
+            for i, vec in zip(todo, fresh):
+                cached[i] = vec
+        return cached
+    return await _embed_store_uncached(texts, batch_size)
+
+
+async def _embed_store_uncached(texts: List[str], batch_size: int) -> List[List[float]]:
+    start = time.perf_counter()
+    batches = _pack_batches(texts, batch_size, EMBED_BATCH_MAX_TOKENS)
+    semaphore = asyncio.Semaphore(EMBED_MAX_CONCURRENCY)
+
+    async def run_batch(indices: List[int]) -> List[List[float]]:
+        async with semaphore:
+            vecs = await _embed_batch_with_retry([texts[i] for i in indices])
+        if len(vecs) != len(indices):
+            raise ValueError(f"Embedding API returned {len(vecs)} vectors for {len(indices)} texts")
+        return vecs
+
+    batch_results = await asyncio.gather(*(run_batch(indices) for indices in batches))
+
+    results: List[List[float]] = [None] * len(texts)  # type: ignore[list-item]
+    for indices, vecs in zip(batches, batch_results):
+        for i, vec in zip(indices, vecs):
+            results[i] = vec
+
+    elapsed = time.perf_counter() - start
+    print(f"[EMBED] {len(texts)} texts in {len(batches)} batches "
+          f"(concurrency {EMBED_MAX_CONCURRENCY}): {elapsed:.1f}s, {len(texts) / max(elapsed, 1e-6):.1f} texts/s")
     return results
 
 
+# Query-embedding micro-batching: concurrent embed_query calls arriving within
+# the window share one API request
+EMBED_QUERY_BATCHING = os.getenv("EMBED_QUERY_BATCHING", "1") == "1"
+EMBED_QUERY_BATCH_WINDOW_MS = float(os.getenv("EMBED_QUERY_BATCH_WINDOW_MS", "5"))
+EMBED_QUERY_MAX_BATCH = int(os.getenv("EMBED_QUERY_MAX_BATCH", "32"))
+
+
+class QueryEmbedBatcher:
+    """Coalesce concurrent query embeddings into one API call.
+
+    The first text opens a window of `window_ms`; everything submitted before
+    it closes (or until `max_batch` distinct texts) is embedded together and
+    the results are fanned back out. Identical texts already pending or in
+    flight share one future. Bound to the event loop that first uses it;
+    calls from other loops embed directly.
+    """
+
+    def __init__(self, window_ms: float = EMBED_QUERY_BATCH_WINDOW_MS, max_batch: int = EMBED_QUERY_MAX_BATCH):
+        self.window_s = window_ms / 1000.0
+        self.max_batch = max(1, int(max_batch))
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: Dict[str, Tuple[asyncio.Future, float]] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.stats = {"requests": 0, "deduplicated": 0, "batches": 0, "texts": 0}
+
+    async def embed(self, text: str) -> List[float]:
+        loop = asyncio.get_running_loop()
+        if self._loop is None or self._loop.is_closed():
+            self._loop = loop
+        if self._loop is not loop:
+            vecs = await _embed_batch_with_retry([text])
+            return vecs[0] if vecs else []
+
+        self.stats["requests"] += 1
+        future = self._inflight.get(text)
+        if future is None and text in self._pending:
+            future = self._pending[text][0]
+        if future is not None:
+            self.stats["deduplicated"] += 1
+        else:
+            future = loop.create_future()
+            self._pending[text] = (future, time.perf_counter())
+            if len(self._pending) >= self.max_batch:
+                self._flush()
+            elif self._timer is None:
+                self._timer = loop.call_later(self.window_s, self._flush)
+        # Shield: one caller being cancelled must not fail the others
+        return await asyncio.shield(future)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, {}
+        for text, (future, _) in batch.items():
+            self._inflight[text] = future
+        asyncio.get_running_loop().create_task(self._dispatch(batch))
+
+    async def _dispatch(self, batch: Dict[str, Tuple[asyncio.Future, float]]) -> None:
+        texts = list(batch.keys())
+        dispatched_at = time.perf_counter()
+        self.stats["batches"] += 1
+        self.stats["texts"] += len(texts)
+        try:
+            get_metrics().record_query_embed_batch(
+                len(texts), self.max_batch, [dispatched_at - enqueued for _, enqueued in batch.values()]
+            )
+        except Exception:
+            pass
+
+        try:
+            vecs = await _embed_batch_with_retry(texts)
+            if len(vecs) != len(texts):
+                raise ValueError(f"Embedding API returned {len(vecs)} vectors for {len(texts)} texts")
+            for text, vec in zip(texts, vecs):
+                future = batch[text][0]
+                if not future.done():
+                    future.set_result(vec)
+        except Exception as e:
+            for future, _ in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            for text in texts:
+                self._inflight.pop(text, None)
+
+    def info(self) -> Dict[str, float]:
+        batches = self.stats["batches"]
+        return {
+            "enabled": EMBED_QUERY_BATCHING,
+            "window_ms": self.window_s * 1000.0,
+            "max_batch": self.max_batch,
+            "avg_batch_size": self.stats["texts"] / batches if batches else 0.0,
+            "avg_fill_ratio": self.stats["texts"] / (batches * self.max_batch) if batches else 0.0,
+            **self.stats,
+        }
+
+
+query_batcher = QueryEmbedBatcher()
+
+
 async def embed_query(text: str) -> List[float]:
     """Embed query text using the configured model."""
     if not text:
         return []
-    vecs = await _embed_batch([text], MODEL_NAME)
-    return vecs[0] if vecs else []
+    if EMBED_CACHE_ENABLED:
+        cached = (await embedding_cache.get_many([text], kind="query"))[0]
+        if cached is not None:
+            return cached
+    if EMBED_QUERY_BATCHING:
+        vec = await query_batcher.embed(text)
+    else:
+        vecs = await _embed_batch_with_retry([text])
+        vec = vecs[0] if vecs else []
+    if EMBED_CACHE_ENABLED and vec:
+        await embedding_cache.put_many([text], [vec])
+    return vec
 
 
 def embed_text(text: str) -> List[float]:
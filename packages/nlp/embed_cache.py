@@ -0,0 +1,212 @@
+"""
+Two-tier embedding cache.
+
+Vectors are keyed by sha256(model_name|dimension|normalized_text), so a model
+or dimension change misses every old entry without an explicit flush. A
+non-default embeddings endpoint (OPENAI_EMBED_BASE_URL, e.g. the offline
+stand-in) is part of the key too, so its vectors never answer for OpenAI's. Tier 1
+is an in-process LRU of float32 arrays; tier 2 is Redis, storing raw float32
+(or float16, EMBED_CACHE_DTYPE) bytes rather than JSON. Redis is optional:
+if it is unreachable the cache keeps working from memory and retries Redis
+after a cooldown.
+"""
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from packages.config.embedding import config
+from packages.util.normalize import normalize_text
+from packages.util.redis_cache import CACHE_PREFIX, REDIS_URL, REDIS_DB
+from packages.observability.metrics import get_metrics
+
+EMBED_CACHE_ENABLED = os.getenv("EMBED_CACHE", "1") == "1"
+EMBED_CACHE_REDIS = os.getenv("EMBED_CACHE_REDIS", "1") == "1"
+EMBED_CACHE_MEMORY_SIZE = int(os.getenv("EMBED_CACHE_MEMORY_SIZE", "5000"))
+EMBED_CACHE_TTL_S = int(os.getenv("EMBED_CACHE_TTL_S", str(30 * 24 * 3600)))
+EMBED_CACHE_DTYPE = os.getenv("EMBED_CACHE_DTYPE", "float32")
+REDIS_RETRY_COOLDOWN_S = 60.0
+
+EMBEDDING_CACHE_PREFIX = f"{CACHE_PREFIX}:emb"
+
+
+def embedding_cache_key(text: str, model_name: Optional[str] = None, dimension: Optional[int] = None,
+                        endpoint: Optional[str] = None) -> str:
+    """sha256 of model identity plus normalized text."""
+    model_name = model_name or config.model_name
+    dimension = dimension or config.dimension
+    endpoint = config.endpoint_id if endpoint is None else endpoint
+    payload = f"{model_name}\x1f{dimension}\x1f{normalize_text(text)}"
+    if endpoint:
+        # Default endpoint adds nothing, so existing keys and hashes stay valid
+        payload = f"{endpoint}\x1f{payload}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def encode_vector(vec: Sequence[float], dtype: str = EMBED_CACHE_DTYPE) -> bytes:
+    return np.asarray(vec, dtype=dtype).tobytes()
+
+
+def decode_vector(data: bytes, dimension: int, dtype: str = EMBED_CACHE_DTYPE) -> Optional[np.ndarray]:
+    """Vector from stored bytes, or None if they don't hold `dimension` values of `dtype`."""
+    if not data or len(data) != dimension * np.dtype(dtype).itemsize:
+        return None
+    return np.frombuffer(data, dtype=dtype).astype(np.float32)
+
+
+class EmbeddingCache:
+    """In-process LRU in front of Redis, for query and stored-text embeddings."""
+
+    def __init__(self, memory_size: int = EMBED_CACHE_MEMORY_SIZE, use_redis: bool = EMBED_CACHE_REDIS,
+                 ttl_seconds: int = EMBED_CACHE_TTL_S, dtype: str = EMBED_CACHE_DTYPE):
+        self.memory_size = memory_size
+        self.use_redis = use_redis
+        self.ttl_seconds = ttl_seconds
+        self.dtype = dtype
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._model_id = (config.model_name, config.dimension, config.endpoint_id)
+        self._redis = None
+        self._redis_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._redis_down_until = 0.0
+        self.stats: Dict[str, Dict[str, int]] = {
+            kind: {"memory_hits": 0, "redis_hits": 0, "misses": 0} for kind in ("query", "store")
+        }
+
+    def _check_model_locked(self) -> None:
+        # Keys already carry the model identity; this just frees stale entries
+        model_id = (config.model_name, config.dimension, config.endpoint_id)
+        if model_id != self._model_id:
+            print(f"[EMBED_CACHE] Model changed {self._model_id} -> {model_id}; clearing memory tier")
+            self._memory.clear()
+            self._model_id = model_id
+
+    def _memory_get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            self._check_model_locked()
+            vec = self._memory.get(key)
+            if vec is not None:
+                self._memory.move_to_end(key)
+            return vec
+
+    def _memory_put(self, key: str, vec: np.ndarray) -> None:
+        with self._lock:
+            self._check_model_locked()
+            self._memory[key] = vec
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+
+    async def _get_redis(self):
+        """Redis client for the running loop, or None if Redis is off or cooling down."""
+        if not self.use_redis or time.time() < self._redis_down_until:
+            return None
+        loop = asyncio.get_running_loop()
+        if self._redis is not None and self._redis_loop is not loop:
+            if self._redis_loop is not None and not self._redis_loop.is_closed():
+                return None  # Owned by another live loop (e.g. embed_text's helper thread)
+            self._redis = None
+        if self._redis is None:
+            import redis.asyncio as redis
+            # Raw bytes values, so a separate client from the JSON response cache
+            self._redis = redis.from_url(REDIS_URL, db=REDIS_DB, decode_responses=False,
+                                         socket_connect_timeout=1.0, socket_timeout=1.0)
+            self._redis_loop = loop
+        return self._redis
+
+    def _redis_failed(self, e: Exception) -> None:
+        print(f"[EMBED_CACHE] Redis unavailable ({e}); using memory tier for {REDIS_RETRY_COOLDOWN_S:.0f}s")
+        self._redis_down_until = time.time() + REDIS_RETRY_COOLDOWN_S
+
+    async def get_many(self, texts: Sequence[str], kind: str = "store") -> List[Optional[List[float]]]:
+        """Cached vectors aligned with `texts`; None where neither tier has one."""
+        keys = [embedding_cache_key(t) for t in texts]
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        missing: List[int] = []
+        for i, key in enumerate(keys):
+            vec = self._memory_get(key)
+            if vec is not None:
+                results[i] = vec.tolist()
+            else:
+                missing.append(i)
+        memory_hits = len(texts) - len(missing)
+
+        redis_hits = 0
+        client = await self._get_redis() if missing else None
+        if client is not None:
+            try:
+                values = await client.mget([f"{EMBEDDING_CACHE_PREFIX}:{keys[i]}" for i in missing])
+                still_missing = []
+                for i, data in zip(missing, values):
+                    vec = decode_vector(data, config.dimension, self.dtype)
+                    if vec is None:
+                        still_missing.append(i)
+                        continue
+                    self._memory_put(keys[i], vec)
+                    results[i] = vec.tolist()
+                    redis_hits += 1
+                missing = still_missing
+            except Exception as e:
+                self._redis_failed(e)
+
+        stats = self.stats.setdefault(kind, {"memory_hits": 0, "redis_hits": 0, "misses": 0})
+        stats["memory_hits"] += memory_hits
+        stats["redis_hits"] += redis_hits
+        stats["misses"] += len(missing)
+        try:
+            get_metrics().record_embedding_cache(kind, memory_hits, redis_hits, len(missing))
+        except Exception:
+            pass
+        return results
+
+    async def put_many(self, texts: Sequence[str], vectors: Sequence[Sequence[float]]) -> None:
+        """Store vectors in both tiers; Redis failures are logged, not raised."""
+        entries = []
+        for text, vec in zip(texts, vectors):
+            if vec is None or len(vec) != config.dimension:
+                continue
+            key = embedding_cache_key(text)
+            arr = np.asarray(vec, dtype=np.float32)
+            self._memory_put(key, arr)
+            entries.append((key, arr))
+
+        client = await self._get_redis() if entries else None
+        if client is None:
+            return
+        try:
+            async with client.pipeline(transaction=False) as pipe:
+                for key, arr in entries:
+                    pipe.set(f"{EMBEDDING_CACHE_PREFIX}:{key}", encode_vector(arr, self.dtype), ex=self.ttl_seconds)
+                await pipe.execute()
+        except Exception as e:
+            self._redis_failed(e)
+
+    def info(self) -> Dict[str, object]:
+        by_kind = {}
+        for kind, counts in self.stats.items():
+            total = sum(counts.values())
+            by_kind[kind] = {
+                **counts,
+                "hit_ratio": (counts["memory_hits"] + counts["redis_hits"]) / total if total else 0.0,
+            }
+        return {
+            "enabled": EMBED_CACHE_ENABLED,
+            "redis": self.use_redis,
+            "redis_available": time.time() >= self._redis_down_until,
+            "dtype": self.dtype,
+            "memory_entries": len(self._memory),
+            "memory_size": self.memory_size,
+            **by_kind,
+        }
+
+
+embedding_cache = EmbeddingCache()
@@ -2,10 +2,15 @@ import asyncio
 import re
 from datetime import datetime, timezone, timedelta
 from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
 from rapidfuzz import fuzz
 
 from packages.util.normalize import truncate_text, extract_domain
-from packages.nlp.embed import embed_query
+from packages.nlp.retrieval_plan import RetrievalPlan
+from packages.nlp.article_features import article_features, calculate_text_richness, detect_content_angle
+from packages.nlp.hybrid_scoring import (
+    CandidateArrays, batch_bm25ish, hybrid_scores, richness_scores, top_k_indices,
+)
 
 
 def analyze_query_complexity(query: str) -> Dict[str, Any]:
@@ -83,55 +88,6 @@ def analyze_query_complexity(query: str) -> Dict[str, Any]:
     }
 
 
-def calculate_text_richness(text: str) -> float:
-    """
-    Calculate text richness score based on content quality indicators.
-    Higher scores indicate richer, more informative content.
-    """
-    if not text:
-        return 0.0
-    
-    # Length-based factors (with diminishing returns)
-    length = len(text)
-    length_score = min(length / 1000.0, 1.0)  # Cap at 1.0 for 1000+ chars
-    
-    # Sentence structure
-    sentences = len(re.split(r'[.!?।]+', text))
-    sentence_score = min(sentences / 10.0, 1.0)  # Cap at 10 sentences
-    
-    # Vocabulary richness
-    words = re.findall(r'\b\w+\b', text.lower())
-    unique_words = len(set(words))
-    vocab_score = min(unique_words / 100.0, 1.0) if words else 0.0
-    
-    # Information density indicators
-    info_indicators = [
-        len(re.findall(r'\d+', text)) / 50.0,      # Numbers (dates, stats, etc.)
-        len(re.findall(r'[A-Z][a-z]+', text)) / 20.0,  # Proper nouns
-        text.count('"') / 10.0,                     # Quotes
-        text.count(':') / 5.0,                      # Colons (often introduce details)
-    ]
-    info_score = min(sum(info_indicators), 1.0)
-    
-    # Content type bonuses
-    content_bonuses = 0.0
-    if any(word in text.lower() for word in ['analysis', 'report', 'investigation', 'বিশ্লেষণ', 'প্রতিবেদন']):
-        content_bonuses += 0.2
-    if any(word in text.lower() for word in ['exclusive', 'interview', 'statement', 'একচেটিয়া', 'সাক্ষাৎকার']):
-        content_bonuses += 0.2
-    
-    # Combine scores with weights
-    richness = (
-        0.25 * length_score +
-        0.25 * sentence_score + 
-        0.25 * vocab_score +
-        0.15 * info_score +
-        0.10 * content_bonuses
-    )
-    
-    return min(richness, 1.0)
-
-
 def calculate_freshness_boost(published_at: Optional[Any]) -> float:
     """
     Calculate freshness boost for content published within 24h.
@@ -165,53 +121,6 @@ def calculate_freshness_boost(published_at: Optional[Any]) -> float:
         return 1.0
 
 
-def detect_content_angle(article: Any) -> str:
-    """
-    Detect the editorial angle/type of content to help with domain diversity.
-    Returns: 'opinion', 'analysis', 'wire', 'local', 'interview', 'breaking', 'generic'
-    """
-    title = getattr(article, 'title', '').lower()
-    summary = getattr(article, 'summary', '').lower()
-    source = getattr(article, 'source', '').lower()
-    
-    content = f"{title} {summary}"
-    
-    # Opinion indicators
-    opinion_markers = ['opinion', 'editorial', 'op-ed', 'comment', 'analysis', 'perspective', 
-                      'মতামত', 'সম্পাদকীয়', 'বিশ্লেষণ']
-    if any(marker in content or marker in source for marker in opinion_markers):
-        return 'opinion'
-    
-    # Interview indicators  
-    interview_markers = ['interview', 'exclusive', 'speaks', 'says', 'tells', 
-                        'সাক্ষাৎকার', 'একচেটিয়া', 'বলেন', 'জানান']
-    if any(marker in content for marker in interview_markers):
-        return 'interview'
-    
-    # Breaking news indicators
-    breaking_markers = ['breaking', 'urgent', 'just in', 'developing', 'সদ্য', 'জরুরি', 'ব্রেকিং']
-    if any(marker in content for marker in breaking_markers):
-        return 'breaking'
-    
-    # Wire service indicators
-    wire_markers = ['reuters', 'ap', 'afp', 'bloomberg', 'xinhua', 'ians']
-    if any(marker in source for marker in wire_markers):
-        return 'wire'
-    
-    # Local reporting indicators
-    local_markers = ['local', 'correspondent', 'staff reporter', 'স্থানীয়', 'প্রতিনিধি']
-    if any(marker in content or marker in source for marker in local_markers):
-        return 'local'
-    
-    # Analysis indicators
-    analysis_markers = ['report', 'investigation', 'study', 'finds', 'reveals', 
-                       'প্রতিবেদন', 'তদন্ত', 'গবেষণা', 'প্রকাশ']
-    if any(marker in content for marker in analysis_markers):
-        return 'analysis'
-    
-    return 'generic'
-
-
 def enhanced_domain_diversity(
     articles: List[Tuple[Any, float]], 
     target_count: int = 6,
@@ -232,7 +141,7 @@ def enhanced_domain_diversity(
     
     for article, score in sorted_articles:
         domain = extract_domain(getattr(article, "url", ""))
-        angle = detect_content_angle(article)
+        angle = article_features(article)["angle"]
         
         if domain not in domain_info:
             domain_info[domain] = []
@@ -271,11 +180,16 @@ async def enhanced_retrieve_evidence(
     category: Optional[str],
     repo,
     window_hours: int = 72,
-    latency_budget_ms: int = 3000  # 3 second latency budget
+    latency_budget_ms: int = 3000,  # 3 second latency budget
+    plan: Optional[RetrievalPlan] = None
 ) -> List[Dict[str, Any]]:
     """
     Enhanced retrieval with dynamic K, improved scoring, and domain diversity.
     
+    When a RetrievalPlan is given, the query embedding and per-article scores
+    are shared with other retrievals in the same request, as is the vector
+    search for this window; other windows run their own searches.
+    
     Returns evidence pack optimized for relevance, freshness, and diversity.
     """
     start_time = datetime.now()
@@ -288,56 +202,33 @@ async def enhanced_retrieve_evidence(
     max_k_for_budget = min(latency_budget_ms, 800)  
     vector_limit = min(dynamic_k, max_k_for_budget)
     
-    # 2) Query embedding
-    qvec = await embed_query(query)
-    
-    # 3) Vector search with dynamic limit
-    vector_hits: List[Tuple[Any, float]] = repo.search_vectors(
-        qvec, 
-        window_hours=window_hours, 
-        limit=vector_limit
-    )
+    # 2-3) Query embedding (once per plan) + vector search for this window
+    if plan is None:
+        plan = RetrievalPlan(query, repo, search_limit=vector_limit)
+    # Keyword-only BM25 matches join the vector hits
+    vector_hits: List[Tuple[Any, float]] = await plan.hybrid_hits(window_hours, limit=vector_limit)
     
     # 4) Optional category filter
-    articles = [a for (a, cos) in vector_hits]
-    cos_sims = {a.id: cos for (a, cos) in vector_hits}
     if category:
-        articles = [a for a in articles if getattr(a, "source_category", None) == category]
-    
-    # 5) Enhanced hybrid scoring
-    scored: List[Tuple[Any, float]] = []
-    for a in articles:
-        # Text content for BM25
-        title = getattr(a, 'title', '')
-        summary = getattr(a, 'summary', '')
-        text = f"{title} {summary}"
-        
-        # Core scores
-        from packages.nlp.retrieve import bm25ish, time_decay
-        bm25_score = bm25ish(query, text)
-        cos_sim = float(cos_sims.get(a.id, 0.0) or 0.0)
-        time_decay_score = time_decay(getattr(a, 'published_at', None))
-        
-        # New quality factors
-        text_richness = calculate_text_richness(text)
-        freshness_boost = calculate_freshness_boost(getattr(a, 'published_at', None))
-        
-        # Enhanced scoring formula
-        # Base: semantic similarity + text matching + time
-        base_score = 0.45 * cos_sim + 0.35 * bm25_score + 0.20 * time_decay_score
-        
-        # Apply richness preference (boost for richer content)
-        richness_multiplier = 1.0 + (0.3 * text_richness)
-        
-        # Apply freshness boost for <24h content
-        final_score = base_score * richness_multiplier * freshness_boost
-        
-        scored.append((a, final_score))
+        vector_hits = [(a, cos) for (a, cos) in vector_hits if getattr(a, "source_category", None) == category]
+    
+    # 5) Enhanced hybrid scoring over candidate columns
+    candidates = CandidateArrays.from_hits(vector_hits)
+    lexical = plan.lexical_scores(candidates.articles)
+    if lexical is not None:
+        candidates.lexical = np.asarray(lexical, dtype=np.float64)
+    else:
+        candidates.lexical = batch_bm25ish(query, candidates.texts())
+    candidates.richness = richness_scores(candidates.articles)
+    
+    # Base: semantic similarity + text matching + time, then x (1 + 0.3 richness)
+    # for richer content and x freshness boost for <24h content
+    scores = hybrid_scores(candidates, cos_weight=0.45, lexical_weight=0.35, time_weight=0.20,
+                           richness_weight=0.3, freshness=True)
     
     # 6) Take top candidates based on complexity
-    top_count = min(50 if complexity['is_simple'] else 80, len(scored))
-    scored.sort(key=lambda x: x[1], reverse=True)
-    top_candidates = scored[:top_count]
+    top_count = 50 if complexity['is_simple'] else 80
+    top_candidates = [(candidates.articles[i], float(scores[i])) for i in top_k_indices(scores, top_count)]
     
     # 7) Semantic reranking with cross-encoder
     from packages.nlp.semantic_reranker import lightweight_cross_encoder_rerank
@@ -407,8 +298,8 @@ async def enhanced_retrieve_evidence(
             "published_at": published_iso,
             "excerpt": truncate_text(getattr(a, "summary", "") or "", 800),
             "url": getattr(a, "url", ""),
-            "content_angle": detect_content_angle(a),
-            "text_richness": calculate_text_richness(f"{getattr(a, 'title', '')} {getattr(a, 'summary', '')}"),
+            "content_angle": article_features(a)["angle"],
+            "text_richness": article_features(a)["richness"],
             "hours_old": (datetime.now(timezone.utc) - 
                          (getattr(a, "published_at", datetime.now(timezone.utc)) if isinstance(getattr(a, "published_at", None), datetime) 
                           else datetime.now(timezone.utc))).total_seconds() / 3600.0
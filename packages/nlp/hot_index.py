@@ -0,0 +1,288 @@
+"""
+In-process vector index over the hot article window.
+
+Most traffic only needs the last 24-72h, which is a few thousand vectors.
+Those are held in a contiguous, L2-normalized float32 matrix so a query is a
+single matrix-vector product plus an argpartition, with no Postgres round
+trip and no 3072-float text literal. Windows wider than the index (e.g. the
+720h background pass) return None and callers fall back to Postgres.
+"""
+import os
+import threading
+import time
+from datetime import datetime, timezone, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+HOT_INDEX_WINDOW_HOURS = int(os.getenv("HOT_INDEX_WINDOW_HOURS", "72"))
+HOT_INDEX_MAX_ROWS = int(os.getenv("HOT_INDEX_MAX_ROWS", "20000"))
+HOT_INDEX_ENABLED = os.getenv("HOT_INDEX_ENABLED", "1") not in ("0", "false", "False")
+# Incremental refreshes re-read rows updated this long before the watermark:
+# updated_at is the writer's transaction start, so a slow writer can commit
+# rows older than ones already seen
+INDEX_REFRESH_OVERLAP_S = int(os.getenv("INDEX_REFRESH_OVERLAP_S", "120"))
+INDEX_REFRESH_PAGE_SIZE = int(os.getenv("INDEX_REFRESH_PAGE_SIZE", "5000"))
+
+
+def _epoch_hours(published_at: Optional[Any]) -> float:
+    """Published time as hours since epoch, NaN for undated articles."""
+    if not published_at:
+        return np.nan
+    try:
+        if isinstance(published_at, str):
+            dt = datetime.fromisoformat(published_at.replace("Z", "+00:00"))
+        else:
+            dt = published_at
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return dt.timestamp() / 3600.0
+    except Exception:
+        return np.nan
+
+
+class HotVectorIndex:
+    """Brute-force cosine top-k over recent article vectors."""
+
+    def __init__(self, window_hours: int = HOT_INDEX_WINDOW_HOURS, max_rows: int = HOT_INDEX_MAX_ROWS):
+        self.window_hours = int(window_hours)
+        self.max_rows = int(max_rows)
+        self._lock = threading.RLock()
+
+        self._matrix: Optional[np.ndarray] = None      # (n, dim) float32, unit rows
+        self._published_h: np.ndarray = np.empty(0, dtype=np.float64)
+        self._articles: List[Any] = []
+        self._row_by_id: Dict[Any, int] = {}
+
+        self._last_vector_update: Optional[datetime] = None
+        self._last_refresh_at: Optional[float] = None
+        self.stats = {"queries": 0, "fallbacks": 0, "refreshes": 0, "rows_added": 0, "rows_evicted": 0}
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    @property
+    def size(self) -> int:
+        return len(self._articles)
+
+    @property
+    def ready(self) -> bool:
+        return self._last_refresh_at is not None
+
+    def add(self, items: List[Tuple[Any, List[float]]]) -> int:
+        """Insert or replace (article, vector) rows. Returns rows written."""
+        if not items:
+            return 0
+
+        vecs = np.asarray([v for _, v in items], dtype=np.float32)
+        norms = np.linalg.norm(vecs, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        vecs /= norms
+
+        with self._lock:
+            new_rows: List[int] = []
+            new_articles: List[Any] = []
+            for i, (article, _) in enumerate(items):
+                row = self._row_by_id.get(article.id)
+                if row is not None and self._matrix is not None:
+                    # Re-embedded or edited article: overwrite in place
+                    self._matrix[row] = vecs[i]
+                    self._articles[row] = article
+                    self._published_h[row] = _epoch_hours(getattr(article, "published_at", None))
+                else:
+                    new_rows.append(i)
+                    new_articles.append(article)
+
+            if new_rows:
+                block = vecs[new_rows]
+                published = np.asarray(
+                    [_epoch_hours(getattr(a, "published_at", None)) for a in new_articles],
+                    dtype=np.float64,
+                )
+                if self._matrix is None or self._matrix.shape[1] != block.shape[1]:
+                    self._matrix = np.ascontiguousarray(block)
+                    self._published_h = published
+                    self._articles = []
+                    self._row_by_id = {}
+                else:
+                    self._matrix = np.ascontiguousarray(np.vstack([self._matrix, block]))
+                    self._published_h = np.concatenate([self._published_h, published])
+                for article in new_articles:
+                    self._row_by_id[article.id] = len(self._articles)
+                    self._articles.append(article)
+                self.stats["rows_added"] += len(new_rows)
+
+            self._evict_locked()
+            return len(items)
+
+    def _evict_locked(self) -> None:
+        """Drop rows that aged out of the window, and the oldest rows over max_rows."""
+        if self._matrix is None or not self._articles:
+            return
+        now_h = time.time() / 3600.0
+        keep = np.isnan(self._published_h) | (self._published_h >= now_h - self.window_hours)
+
+        overflow = int(keep.sum()) - self.max_rows
+        if overflow > 0:
+            # Oldest dated rows go first; undated rows sort last (kept)
+            order = np.argsort(np.where(np.isnan(self._published_h), np.inf, self._published_h))
+            dropped = 0
+            for idx in order:
+                if dropped >= overflow:
+                    break
+                if keep[idx]:
+                    keep[idx] = False
+                    dropped += 1
+
+        if keep.all():
+            return
+
+        kept_idx = np.flatnonzero(keep)
+        self.stats["rows_evicted"] += len(self._articles) - len(kept_idx)
+        self._matrix = np.ascontiguousarray(self._matrix[kept_idx])
+        self._published_h = self._published_h[kept_idx]
+        self._articles = [self._articles[i] for i in kept_idx]
+        self._row_by_id = {a.id: i for i, a in enumerate(self._articles)}
+
+    def refresh(self, repo=None) -> int:
+        """
+        Pull vectors written since the last refresh (full load on first call).
+
+        Rows within INDEX_REFRESH_OVERLAP_S of the watermark are read again;
+        re-adding them is idempotent.
+
+        Called at API startup and after every ingest cycle.
+        """
+        if repo is None:
+            from packages.db import repo as db_repo
+            repo = db_repo
+
+        since = self._last_vector_update
+        if since is not None:
+            since -= timedelta(seconds=INDEX_REFRESH_OVERLAP_S)
+
+        # Page forward by (updated_at, article_id) so a burst larger than a
+        # page is read in full
+        written, seen, after = 0, 0, None
+        while True:
+            rows = repo.fetch_recent_vectors(
+                window_hours=self.window_hours,
+                updated_since=since,
+                limit=INDEX_REFRESH_PAGE_SIZE,
+                after=after,
+            )
+            written += self.add([(article, vec) for article, vec, _ in rows if vec is not None and len(vec)])
+            seen += len(rows)
+            with self._lock:
+                for _, _, updated_at in rows:
+                    if updated_at and (self._last_vector_update is None or updated_at > self._last_vector_update):
+                        self._last_vector_update = updated_at
+            if len(rows) < INDEX_REFRESH_PAGE_SIZE:
+                break
+            after = (rows[-1][2], rows[-1][0].id)
+
+        with self._lock:
+            if not seen:
+                self._evict_locked()
+            self._last_refresh_at = time.time()
+            self.stats["refreshes"] += 1
+        return written
+
+    # ------------------------------------------------------------------
+    # Query
+    # ------------------------------------------------------------------
+
+    def search(self, qvec: List[float], window_hours: int = 72, limit: int = 300) -> Optional[List[Tuple[Any, float]]]:
+        """
+        Cosine top-k within `window_hours`.
+
+        Returns None when the index cannot answer (disabled, not loaded, or
+        the window is wider than what the index holds) so the caller can use
+        Postgres instead.
+        """
+        if not HOT_INDEX_ENABLED or not self.ready or int(window_hours) > self.window_hours or qvec is None or not len(qvec):
+            self.stats["fallbacks"] += 1
+            return None
+
+        with self._lock:
+            matrix = self._matrix
+            published_h = self._published_h
+            articles = self._articles
+
+        if matrix is None or not articles:
+            return []
+
+        q = np.asarray(qvec, dtype=np.float32)
+        if q.shape[0] != matrix.shape[1]:
+            self.stats["fallbacks"] += 1
+            return None
+        qn = float(np.linalg.norm(q))
+        if qn == 0.0:
+            return []
+        sims = matrix @ (q / qn)
+
+        cutoff_h = time.time() / 3600.0 - int(window_hours)
+        in_window = np.isnan(published_h) | (published_h >= cutoff_h)
+        sims = np.where(in_window, sims, -np.inf)
+
+        n_valid = int(in_window.sum())
+        k = min(int(limit), n_valid)
+        if k <= 0:
+            return []
+        top = np.argpartition(-sims, k - 1)[:k] if k < len(sims) else np.arange(len(sims))
+        top = top[np.argsort(-sims[top])]
+
+        self.stats["queries"] += 1
+        return [(articles[i], float(sims[i])) for i in top if np.isfinite(sims[i])]
+
+    def cosine_for(self, qvec: List[float], article_ids: List[Any]) -> Dict[Any, float]:
+        """Cosine similarity of the query to specific indexed articles (missing ids are omitted)."""
+        with self._lock:
+            matrix = self._matrix
+            rows = [(aid, self._row_by_id[aid]) for aid in article_ids if aid in self._row_by_id]
+        if matrix is None or not rows or qvec is None or not len(qvec):
+            return {}
+        q = np.asarray(qvec, dtype=np.float32)
+        qn = float(np.linalg.norm(q))
+        if q.shape[0] != matrix.shape[1] or qn == 0.0:
+            return {}
+        sims = matrix[[row for _, row in rows]] @ (q / qn)
+        return {aid: float(sim) for (aid, _), sim in zip(rows, sims)}
+
+    def vectors_for(self, article_ids: List[Any]) -> Optional[np.ndarray]:
+        """Unit vectors of specific articles as an (n, dim) matrix; NaN rows for ids not indexed."""
+        with self._lock:
+            matrix = self._matrix
+            rows = [self._row_by_id.get(aid, -1) for aid in article_ids]
+        if matrix is None:
+            return None
+        rows = np.asarray(rows, dtype=np.int64)
+        out = np.full((len(rows), matrix.shape[1]), np.nan, dtype=np.float32)
+        found = rows >= 0
+        out[found] = matrix[rows[found]]
+        return out
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "enabled": HOT_INDEX_ENABLED,
+            "ready": self.ready,
+            "rows": self.size,
+            "dimension": int(self._matrix.shape[1]) if self._matrix is not None else None,
+            "window_hours": self.window_hours,
+            "memory_mb": round(self._matrix.nbytes / 1e6, 2) if self._matrix is not None else 0.0,
+            "last_vector_update": self._last_vector_update.isoformat() if self._last_vector_update else None,
+            **self.stats,
+        }
+
+
+# Process-wide instance
+hot_index = HotVectorIndex()
+
+
+def search_hot_first(repo, qvec: List[float], window_hours: int = 72, limit: int = 300) -> List[Tuple[Any, float]]:
+    """Answer from the hot index when it covers the window, else from Postgres."""
+    hits = hot_index.search(qvec, window_hours=window_hours, limit=limit)
+    if hits is None:
+        return repo.search_vectors(qvec, window_hours=window_hours, limit=limit)
+    return hits
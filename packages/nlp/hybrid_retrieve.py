@@ -8,10 +8,14 @@ import asyncio
 import re
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional, Tuple, Union
+import numpy as np
 from rapidfuzz import fuzz
 
 from packages.util.normalize import truncate_text, extract_domain
-from packages.nlp.embed import embed_query
+from packages.nlp.retrieval_plan import RetrievalPlan
+from packages.nlp.article_features import article_language, detect_language
+from packages.nlp.tokenizer import tokenize
+from packages.nlp.hybrid_scoring import CandidateArrays, batch_enhanced_bm25, hybrid_scores, top_k_indices
 
 
 class RetrievalConfig:
@@ -54,31 +58,6 @@ class RetrievalConfig:
     ]
 
 
-def detect_language(text: str) -> Dict[str, Union[str, float]]:
-    """
-    Simple language detection for Bangla vs English.
-    Returns dict with 'language' and 'confidence'.
-    """
-    if not text:
-        return {"language": "unknown", "confidence": 0.0}
-    
-    # Count Bangla Unicode characters
-    bangla_chars = len(re.findall(r'[\u0980-\u09FF]', text))
-    total_chars = len(re.findall(r'\S', text))  # Non-whitespace chars
-    
-    if total_chars == 0:
-        return {"language": "unknown", "confidence": 0.0}
-    
-    bangla_ratio = bangla_chars / total_chars
-    
-    if bangla_ratio > 0.3:  # Significant Bangla content
-        return {"language": "bn", "confidence": min(bangla_ratio * 2, 1.0)}
-    elif bangla_ratio < 0.05:  # Minimal Bangla content
-        return {"language": "en", "confidence": 1.0 - bangla_ratio}
-    else:
-        return {"language": "mixed", "confidence": 0.5}
-
-
 def should_route_to_tool(query: str) -> Dict[str, Any]:
     """
     Determine if query should be routed to external tools for volatile facts.
@@ -143,8 +122,8 @@ def enhanced_bm25(query: str, text: str, boost_factors: Dict[str, float] = None)
     token_set_ratio = fuzz.token_set_ratio(query_lower, text_lower) / 100.0
     
     # Token overlap (Jaccard)
-    q_tokens = set(re.findall(r'\b\w+\b', query_lower))
-    t_tokens = set(re.findall(r'\b\w+\b', text_lower))
+    q_tokens = set(tokenize(query_lower))
+    t_tokens = set(tokenize(text_lower))
     
     if q_tokens and t_tokens:
         intersection = len(q_tokens & t_tokens)
@@ -202,11 +181,7 @@ def assess_context_quality(
     # Count language-appropriate candidates
     language_matches = 0
     for article, _ in candidates:
-        title = getattr(article, 'title', '') 
-        summary = getattr(article, 'summary', '')
-        content = f"{title} {summary}"
-        
-        lang_detection = detect_language(content)
+        lang_detection = article_language(article)
         if lang == "bn" and lang_detection["language"] in ["bn", "mixed"]:
             language_matches += 1
         elif lang == "en" and lang_detection["language"] in ["en", "mixed"]:
@@ -265,11 +240,7 @@ def filter_by_language(
     filtered = []
     
     for article, score in candidates:
-        title = getattr(article, 'title', '')
-        summary = getattr(article, 'summary', '')
-        content = f"{title} {summary}"
-        
-        lang_detection = detect_language(content)
+        lang_detection = article_language(article)
         
         # Language matching logic
         include = False
@@ -297,10 +268,14 @@ async def hybrid_retrieve_with_guardrails(
     lang: str = "bn",
     intent: str = "news",
     window_hours: int = 72,
+    plan: Optional[RetrievalPlan] = None,
 ) -> Dict[str, Any]:
     """
     Hybrid retrieval with BM25 + Vector search and comprehensive guardrails.
     
+    Pass the request's RetrievalPlan to reuse its query embedding, and its
+    vector search when the plan has already searched this window.
+    
     Returns:
     {
         'evidence': List[Dict] - Evidence items for answer generation
@@ -316,8 +291,10 @@ async def hybrid_retrieve_with_guardrails(
     routing = should_route_to_tool(query)
     
     # 2) Query embedding for vector search
+    if plan is None:
+        plan = RetrievalPlan(query, repo, search_limit=RetrievalConfig.VECTOR_TOP_M)
     try:
-        qvec = await embed_query(query)
+        await plan.query_vector()
     except Exception as e:
         return {
             'evidence': [],
@@ -328,56 +305,29 @@ async def hybrid_retrieve_with_guardrails(
         }
     
     # 3) Vector search (Top M candidates)
-    vector_hits = repo.search_vectors(
-        qvec, 
-        window_hours=window_hours, 
-        limit=RetrievalConfig.VECTOR_TOP_M
-    )
-    
-    # 4) BM25 search on vector results (Top N candidates)  
-    articles = [a for (a, _) in vector_hits]
-    cos_sims = {a.id: cos for (a, cos) in vector_hits}
+    vector_hits = await plan.hybrid_hits(window_hours, limit=RetrievalConfig.VECTOR_TOP_M)
     
-    # Apply category filter if specified
+    # 4) BM25 over vector hits plus keyword-only index matches (Top N candidates)
     if category:
-        articles = [a for a in articles if getattr(a, "source_category", None) == category]
+        vector_hits = [(a, cos) for (a, cos) in vector_hits if getattr(a, "source_category", None) == category]
+    candidates = CandidateArrays.from_hits(vector_hits)
     
-    # BM25 scoring on the articles
-    bm25_scored = []
-    for article in articles:
-        title = getattr(article, 'title', '')
-        summary = getattr(article, 'summary', '')
-        
-        # BM25 score with title boost
-        title_score = enhanced_bm25(query, title, {"title_boost": 1.5})
-        summary_score = enhanced_bm25(query, summary, {"title_boost": 1.0})
-        bm25_final = max(title_score, summary_score * 0.8)  # Prefer title matches
-        
-        bm25_scored.append((article, bm25_final))
+    # Index scores weight titles already; the fuzzy fallback prefers title matches
+    lexical = plan.lexical_scores(candidates.articles)
+    if lexical is not None:
+        candidates.lexical = np.asarray(lexical, dtype=np.float64)
+    else:
+        title_scores = batch_enhanced_bm25(query, [getattr(a, 'title', '') or '' for a in candidates.articles], 1.5)
+        summary_scores = batch_enhanced_bm25(query, [getattr(a, 'summary', '') or '' for a in candidates.articles])
+        candidates.lexical = np.maximum(title_scores, summary_scores * 0.8)
     
     # Take top N from BM25
-    bm25_scored.sort(key=lambda x: x[1], reverse=True)
-    bm25_top = bm25_scored[:RetrievalConfig.BM25_TOP_N]
-    
-    # 5) Hybrid scoring: Combine BM25 + Vector + Time decay
-    from packages.nlp.retrieve import time_decay
-    
-    hybrid_scored = []
-    for article, bm25_score in bm25_top:
-        cos_sim = cos_sims.get(article.id, 0.0)
-        time_score = time_decay(getattr(article, 'published_at', None))
-        
-        # Hybrid combination (tuned weights)
-        hybrid_score = (
-            0.40 * float(cos_sim) +      # Vector similarity 
-            0.45 * bm25_score +          # BM25 text relevance
-            0.15 * time_score            # Temporal relevance  
-        )
-        
-        hybrid_scored.append((article, hybrid_score))
+    bm25_top = top_k_indices(candidates.lexical, RetrievalConfig.BM25_TOP_N)
     
-    # Sort by hybrid score
-    hybrid_scored.sort(key=lambda x: x[1], reverse=True)
+    # 5) Hybrid scoring: 0.40 vector similarity + 0.45 BM25 + 0.15 time decay
+    scores = hybrid_scores(candidates, cos_weight=0.40, lexical_weight=0.45, time_weight=0.15)
+    ranked = bm25_top[top_k_indices(scores[bm25_top], len(bm25_top))]
+    hybrid_scored = [(candidates.articles[i], float(scores[i])) for i in ranked]
     
     # 6) Language filtering
     lang_filtered = filter_by_language(hybrid_scored, lang)
@@ -390,8 +340,9 @@ async def hybrid_retrieve_with_guardrails(
     final_candidates = lang_filtered[:RetrievalConfig.FINAL_INTERLEAVE_K]
     
     # 9) MMR diversification (import from existing)
-    from packages.nlp.retrieve import mmr_diversify
-    final_articles = mmr_diversify(final_candidates, k=8, lambda_=0.7)
+    from packages.nlp.retrieve import candidate_vectors, mmr_diversify
+    final_articles = mmr_diversify(final_candidates, k=8, lambda_=0.7,
+                                   vectors=candidate_vectors([a for a, _ in final_candidates]))
     
     # 10) Build evidence pack with enhanced metadata
     evidence = []
@@ -415,7 +366,7 @@ async def hybrid_retrieve_with_guardrails(
             "published_display": pub_display,  # Formatted for citations
             "excerpt": truncate_text(getattr(article, "summary", "") or "", 800),
             "url": getattr(article, "url", ""),
-            "language_detected": detect_language(f"{title} {getattr(article, 'summary', '')}"),
+            "language_detected": article_language(article),
         }
         
         # Add citation info for news mode
@@ -450,6 +401,7 @@ async def hybrid_retrieve_with_guardrails(
             'vector_hits': len(vector_hits),
             'bm25_candidates': len(bm25_top),
             'lang_filtered': len(lang_filtered),
-            'final_evidence': len(evidence)
+            'final_evidence': len(evidence),
+            'plan': dict(plan.stats)
         }
     }
\ No newline at end of file
@@ -0,0 +1,168 @@
+"""
+Columnar hybrid scoring for retrieval candidates.
+
+Retrievers used to score hundreds of candidates one at a time in Python
+(string building, date parsing, fuzzy matching and regex passes per
+article). Here candidates are loaded once into NumPy columns (cosine, age in
+hours, lexical score, richness) and the weighted hybrid score, time decay,
+freshness multiplier and top-k selection are a handful of array operations.
+Published time and richness come from the per-article features computed at
+ingest (packages.nlp.article_features), so nothing is re-parsed per request.
+
+Lexical fallbacks (when the BM25 text index is not loaded) are batched with
+rapidfuzz.process.cdist, which scores the query against every candidate in
+one call (and across cores).
+"""
+import time
+from dataclasses import dataclass, field
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+from rapidfuzz import fuzz, process
+
+from packages.nlp.article_features import article_features
+from packages.nlp.tokenizer import tokenize
+
+# Age used for undated articles in time decay (matches retrieve.hours_old)
+UNDATED_AGE_HOURS = 9999.0
+
+
+def _published_hours(article: Any) -> float:
+    hours = article_features(article)["pub_h"]
+    return np.nan if hours is None else hours
+
+
+def article_text(article: Any) -> str:
+    return f"{getattr(article, 'title', '')} {getattr(article, 'summary', '')}"
+
+
+@dataclass
+class CandidateArrays:
+    """Candidates as parallel columns; index i of every array is articles[i]."""
+
+    articles: List[Any]
+    cos: np.ndarray
+    age_hours: np.ndarray  # NaN for undated
+    lexical: np.ndarray = field(default=None)
+    richness: np.ndarray = field(default=None)
+
+    def __len__(self) -> int:
+        return len(self.articles)
+
+    @classmethod
+    def from_hits(cls, hits: Sequence[Tuple[Any, float]], now_h: Optional[float] = None) -> "CandidateArrays":
+        """Build from (article, cosine) pairs."""
+        now_h = time.time() / 3600.0 if now_h is None else now_h
+        n = len(hits)
+        articles = [a for a, _ in hits]
+        cos = np.fromiter((float(c or 0.0) for _, c in hits), dtype=np.float64, count=n)
+        published = np.fromiter(
+            (_published_hours(a) for a in articles), dtype=np.float64, count=n
+        )
+        return cls(articles=articles, cos=cos, age_hours=now_h - published,
+                   lexical=np.zeros(n), richness=np.zeros(n))
+
+    def texts(self) -> List[str]:
+        return [article_text(a) for a in self.articles]
+
+    def time_decay(self) -> np.ndarray:
+        """exp(-age/24); undated articles decay fully, future dates count as new."""
+        age = np.where(np.isnan(self.age_hours), UNDATED_AGE_HOURS, np.maximum(self.age_hours, 0.0))
+        return np.exp(-age / 24.0)
+
+    def freshness_boost(self) -> np.ndarray:
+        """1.5 / 1.3 / 1.2 for content under 1h / 6h / 24h old, else 1.0 (undated: 1.0)."""
+        age = self.age_hours
+        with np.errstate(invalid="ignore"):
+            return np.select([age < 1, age < 6, age < 24], [1.5, 1.3, 1.2], default=1.0)
+
+
+def hybrid_scores(
+    candidates: CandidateArrays,
+    cos_weight: float,
+    lexical_weight: float,
+    time_weight: float,
+    richness_weight: float = 0.0,
+    freshness: bool = False,
+) -> np.ndarray:
+    """Weighted cos/lexical/time blend, optionally x (1 + w*richness) x freshness boost."""
+    scores = (cos_weight * candidates.cos
+              + lexical_weight * candidates.lexical
+              + time_weight * candidates.time_decay())
+    if richness_weight:
+        scores = scores * (1.0 + richness_weight * candidates.richness)
+    if freshness:
+        scores = scores * candidates.freshness_boost()
+    return scores
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first (stable for ties)."""
+    k = min(int(k), len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < len(scores):
+        top = np.argpartition(-scores, k - 1)[:k]
+        top.sort()
+    else:
+        top = np.arange(len(scores))
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+# --------------------------
+# Batched lexical fallbacks
+# --------------------------
+
+def _fuzzy(query: str, texts: List[str], scorer) -> np.ndarray:
+    if not texts:
+        return np.zeros(0)
+    return process.cdist([query], texts, scorer=scorer, workers=-1, dtype=np.float32)[0].astype(np.float64) / 100.0
+
+
+def _jaccard(query: str, texts: List[str]) -> np.ndarray:
+    q_tokens = set(tokenize(query))
+    out = np.zeros(len(texts))
+    if not q_tokens:
+        return out
+    for i, text in enumerate(texts):
+        t_tokens = set(tokenize(text))
+        if t_tokens:
+            out[i] = len(q_tokens & t_tokens) / len(q_tokens | t_tokens)
+    return out
+
+
+def _phrase(query: str, texts: List[str]) -> np.ndarray:
+    if len(query) <= 3:
+        return np.zeros(len(texts))
+    return np.fromiter((query in t for t in texts), dtype=np.float64, count=len(texts))
+
+
+def batch_bm25ish(query: str, texts: List[str]) -> np.ndarray:
+    """retrieve.bm25ish for many texts at once."""
+    if not query:
+        return np.zeros(len(texts))
+    q = query.lower()
+    lowered = [t.lower() if t else "" for t in texts]
+    return 0.5 * _fuzzy(q, lowered, fuzz.partial_ratio) + 0.3 * _jaccard(q, lowered) + 0.2 * 0.3 * _phrase(q, lowered)
+
+
+def batch_enhanced_bm25(query: str, texts: List[str], title_boost: float = 1.0) -> np.ndarray:
+    """hybrid_retrieve.enhanced_bm25 for many texts at once."""
+    if not query:
+        return np.zeros(len(texts))
+    q = query.lower()
+    lowered = [t.lower() if t else "" for t in texts]
+    scores = (0.35 * _fuzzy(q, lowered, fuzz.partial_ratio)
+              + 0.25 * _fuzzy(q, lowered, fuzz.token_set_ratio)
+              + 0.25 * _jaccard(q, lowered)
+              + 0.15 * 0.4 * _phrase(q, lowered))
+    return scores * title_boost
+
+
+# --------------------------
+# Query-independent features
+# --------------------------
+
+def richness_scores(articles: Sequence[Any]) -> np.ndarray:
+    """Text richness per article, from the features stored at ingest."""
+    return np.fromiter((article_features(a)["richness"] for a in articles), dtype=np.float64, count=len(articles))
@@ -1,17 +1,13 @@
-import re
 import math
 from datetime import datetime, timezone
 from typing import List, Dict, Set, Optional
 from collections import defaultdict, Counter
 
+from packages.nlp.tokenizer import tokenize as shared_tokenize
+
 def tokenize(text: str) -> Set[str]:
-    """Tokenize text into lowercase words (split on non-letters)"""
-    if not text:
-        return set()
-    
-    # Split on non-letter characters and convert to lowercase
-    tokens = re.findall(r'[a-zA-Z]+', text.lower())
-    return set(tokens)
+    """Tokenize text into normalized Bangla/English words"""
+    return set(shared_tokenize(text))
 
 def keyword_score(query: str, text: str) -> float:
     """Calculate keyword match score between query and text"""
@@ -0,0 +1,357 @@
+"""
+Process-wide cross-encoder reranker.
+
+Models are loaded once per process (optionally at startup via
+RERANKER_WARMUP=base,large) instead of on every request. Inference runs on
+a dedicated thread executor; pairs from concurrent requests that arrive
+within RERANKER_BATCH_WINDOW_MS are scored in one predict() call. Scores are
+cached per (model, query, article, text hash) so repeated queries skip the
+model and an edited article is scored again.
+
+Backends: an int8 ONNX Runtime model exported by
+scripts/export_onnx_reranker.py (models/rerankers/<key>/model.int8.onnx) is
+picked automatically when present; otherwise sentence-transformers on
+PyTorch if installed. RERANKER_BACKEND=onnx|torch pins one. The choice is
+made once per model and process. With no usable
+backend rerank_scores() returns None and callers keep their fallback ranking;
+the same happens for RERANKER_LOAD_RETRY_S after a model fails to load.
+"""
+import asyncio
+import hashlib
+import importlib.util
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from packages.util.normalize import normalize_text
+
+# Short name -> (Hugging Face model, max_length)
+RERANKER_MODELS: Dict[str, Tuple[str, int]] = {
+    "base": ("BAAI/bge-reranker-base", 256),
+    "large": ("BAAI/bge-reranker-large", 512),
+}
+
+RERANKER_THREADS = int(os.getenv("RERANKER_THREADS", "1"))
+RERANKER_BATCH_SIZE = int(os.getenv("RERANKER_BATCH_SIZE", "32"))
+RERANKER_BATCH_WINDOW_MS = float(os.getenv("RERANKER_BATCH_WINDOW_MS", "3"))
+RERANKER_MAX_BATCH_PAIRS = int(os.getenv("RERANKER_MAX_BATCH_PAIRS", "256"))
+RERANKER_CACHE_SIZE = int(os.getenv("RERANKER_CACHE_SIZE", "20000"))
+RERANKER_WARMUP = [m.strip() for m in os.getenv("RERANKER_WARMUP", "").split(",") if m.strip()]
+RERANKER_BACKEND = os.getenv("RERANKER_BACKEND", "auto").lower()  # auto | onnx | torch
+RERANKER_ONNX_DIR = Path(os.getenv("RERANKER_ONNX_DIR", str(Path(__file__).parents[2] / "models" / "rerankers")))
+RERANKER_ONNX_THREADS = int(os.getenv("RERANKER_ONNX_THREADS", "0"))  # 0 = onnxruntime default
+# After a failed model load, requests skip reranking this long before the next attempt
+RERANKER_LOAD_RETRY_S = float(os.getenv("RERANKER_LOAD_RETRY_S", "300"))
+
+SENTENCE_TRANSFORMERS_AVAILABLE = importlib.util.find_spec("sentence_transformers") is not None
+ONNX_RUNTIME_AVAILABLE = (importlib.util.find_spec("onnxruntime") is not None
+                          and importlib.util.find_spec("tokenizers") is not None)
+
+
+def onnx_model_path(model_key: str) -> Optional[Path]:
+    """Exported ONNX file for a model, preferring the int8 one; None if not exported."""
+    model_dir = RERANKER_ONNX_DIR / model_key
+    for name in ("model.int8.onnx", "model.onnx"):
+        if (model_dir / name).is_file():
+            return model_dir / name
+    return None
+
+
+class OnnxCrossEncoder:
+    """Cross-encoder on ONNX Runtime with the same predict() as CrossEncoder.
+
+    The whole request is tokenized in one encode_batch() call; pairs are then
+    sorted by length so each inference chunk is padded only to its own longest
+    pair. Scores go through a sigmoid like CrossEncoder's single-label output.
+    """
+
+    def __init__(self, model_path: Path, max_length: int = 512, threads: int = RERANKER_ONNX_THREADS):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_dir = Path(model_path).parent
+        self.tokenizer = Tokenizer.from_file(str(model_dir / "tokenizer.json"))
+        self.tokenizer.no_padding()
+        self.tokenizer.enable_truncation(max_length=max_length)
+
+        self.pad_id = 0
+        config_path = model_dir / "config.json"
+        if config_path.is_file():
+            self.pad_id = json.loads(config_path.read_text()).get("pad_token_id", 0) or 0
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads > 0:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(str(model_path), options, providers=["CPUExecutionProvider"])
+        self.input_names = {inp.name for inp in self.session.get_inputs()}
+        self.model_path = str(model_path)
+
+    def predict(self, pairs: Sequence[Tuple[str, str]], batch_size: int = 32,
+                show_progress_bar: bool = False) -> np.ndarray:
+        if not pairs:
+            return np.zeros(0, dtype=np.float32)
+        encodings = self.tokenizer.encode_batch([tuple(pair) for pair in pairs])
+        order = np.argsort([len(enc.ids) for enc in encodings], kind="stable")
+        logits = np.zeros(len(pairs), dtype=np.float32)
+
+        for start in range(0, len(order), batch_size):
+            chunk = order[start:start + batch_size]
+            width = max(len(encodings[i].ids) for i in chunk)
+            input_ids = np.full((len(chunk), width), self.pad_id, dtype=np.int64)
+            attention = np.zeros((len(chunk), width), dtype=np.int64)
+            for row, i in enumerate(chunk):
+                ids = encodings[i].ids
+                input_ids[row, :len(ids)] = ids
+                attention[row, :len(ids)] = 1
+            feed = {"input_ids": input_ids, "attention_mask": attention}
+            if "token_type_ids" in self.input_names:
+                type_ids = np.zeros((len(chunk), width), dtype=np.int64)
+                for row, i in enumerate(chunk):
+                    type_ids[row, :len(encodings[i].type_ids)] = encodings[i].type_ids
+                feed["token_type_ids"] = type_ids
+            output = self.session.run(None, feed)[0]
+            logits[chunk] = np.asarray(output, dtype=np.float32).reshape(len(chunk), -1)[:, 0]
+
+        return 1.0 / (1.0 + np.exp(-logits))
+
+
+class _ScoreBatcher:
+    """Coalesces concurrent score requests for one model into one predict()."""
+
+    def __init__(self, registry: "RerankerRegistry", model_key: str):
+        self.registry = registry
+        self.model_key = model_key
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: List[Tuple[List[Tuple[str, str]], asyncio.Future]] = []
+        self._pending_pairs = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    async def score(self, pairs: List[Tuple[str, str]]) -> List[float]:
+        loop = asyncio.get_running_loop()
+        if self._loop is None or self._loop.is_closed():
+            self._loop = loop
+        if self._loop is not loop:
+            return await loop.run_in_executor(self.registry.executor, self.registry.predict, self.model_key, pairs)
+
+        future = loop.create_future()
+        self._pending.append((pairs, future))
+        self._pending_pairs += len(pairs)
+        if self._pending_pairs >= RERANKER_MAX_BATCH_PAIRS:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(RERANKER_BATCH_WINDOW_MS / 1000.0, self._flush)
+        return await asyncio.shield(future)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending, self._pending_pairs = self._pending, [], 0
+        asyncio.get_running_loop().create_task(self._run(batch))
+
+    async def _run(self, batch: List[Tuple[List[Tuple[str, str]], asyncio.Future]]) -> None:
+        all_pairs = [pair for pairs, _ in batch for pair in pairs]
+        try:
+            scores = await asyncio.get_running_loop().run_in_executor(
+                self.registry.executor, self.registry.predict, self.model_key, all_pairs
+            )
+            self.registry.stats["batches"] += 1
+            self.registry.stats["requests_batched"] += len(batch)
+            offset = 0
+            for pairs, future in batch:
+                if not future.done():
+                    future.set_result(scores[offset:offset + len(pairs)])
+                offset += len(pairs)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+
+class RerankerRegistry:
+    """Loads each cross-encoder once and serves batched, cached scores."""
+
+    def __init__(self, cache_size: int = RERANKER_CACHE_SIZE):
+        self.executor = ThreadPoolExecutor(max_workers=RERANKER_THREADS, thread_name_prefix="reranker")
+        self.models: Dict[str, Any] = {}
+        self.load_seconds: Dict[str, float] = {}
+        self.backends: Dict[str, str] = {}
+        self._resolved_backends: Dict[str, Optional[str]] = {}
+        self._load_lock = threading.Lock()
+        # model_key -> time.time() before which a failed load is not retried
+        self._load_failed_until: Dict[str, float] = {}
+        self._batchers: Dict[str, _ScoreBatcher] = {}
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple[str, str, Hashable, str], float]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.stats = {"pairs_scored": 0, "cache_hits": 0, "cache_misses": 0, "batches": 0,
+                      "requests_batched": 0, "predict_ms_total": 0.0}
+
+    def backend_for(self, model_key: str) -> Optional[str]:
+        """'onnx', 'torch' or None (no usable backend) for a model; resolved once."""
+        if model_key in self.models:
+            return self.backends.get(model_key, "custom")
+        if model_key not in self._resolved_backends:
+            backend = None
+            if RERANKER_BACKEND in ("auto", "onnx") and ONNX_RUNTIME_AVAILABLE and onnx_model_path(model_key):
+                backend = "onnx"
+            elif RERANKER_BACKEND in ("auto", "torch") and SENTENCE_TRANSFORMERS_AVAILABLE:
+                backend = "torch"
+            self._resolved_backends[model_key] = backend
+        return self._resolved_backends[model_key]
+
+    def load_backing_off(self, model_key: str) -> bool:
+        """True while a recent failed load of `model_key` is not being retried."""
+        return time.time() < self._load_failed_until.get(model_key, 0.0)
+
+    @property
+    def available(self) -> bool:
+        return bool(self.models) or any(self.backend_for(key) for key in RERANKER_MODELS)
+
+    def get(self, model_key: str):
+        """Loaded model for `model_key` ('base'/'large' or a model name)."""
+        model = self.models.get(model_key)
+        if model is not None:
+            return model
+        with self._load_lock:
+            model = self.models.get(model_key)
+            if model is None:
+                if self.load_backing_off(model_key):
+                    raise RuntimeError(f"Reranker {model_key} failed to load recently; not retrying yet")
+                backend = self.backend_for(model_key)
+                model_name, max_length = RERANKER_MODELS.get(model_key, (model_key, 512))
+                start = time.perf_counter()
+                try:
+                    if backend == "onnx":
+                        model = OnnxCrossEncoder(onnx_model_path(model_key), max_length=max_length)
+                        model_name = model.model_path
+                    elif backend == "torch":
+                        from sentence_transformers import CrossEncoder
+                        model = CrossEncoder(model_name, max_length=max_length)
+                    else:
+                        raise RuntimeError(f"No reranker backend available for {model_key}")
+                except Exception as e:
+                    self._load_failed_until[model_key] = time.time() + RERANKER_LOAD_RETRY_S
+                    print(f"[RERANKER] Loading {model_name} ({backend}) failed: {e}; "
+                          f"retrying in {RERANKER_LOAD_RETRY_S:.0f}s")
+                    raise
+                self._load_failed_until.pop(model_key, None)
+                self.load_seconds[model_key] = time.perf_counter() - start
+                print(f"[RERANKER] Loaded {model_name} ({backend}) in {self.load_seconds[model_key]:.1f}s")
+                self.backends[model_key] = backend
+                self.models[model_key] = model
+        return model
+
+    def warm_up(self, model_keys: Sequence[str] = tuple(RERANKER_WARMUP)) -> None:
+        """Load models ahead of the first request (runs a one-pair predict)."""
+        for key in model_keys:
+            if not self.backend_for(key):
+                continue
+            try:
+                self.predict(key, [("warm up", "warm up")])
+            except Exception as e:
+                print(f"[RERANKER] Warm-up of {key} failed: {e}")
+
+    def predict(self, model_key: str, pairs: List[Tuple[str, str]]) -> List[float]:
+        """Blocking inference; called on the reranker executor."""
+        model = self.get(model_key)
+        start = time.perf_counter()
+        scores = model.predict(pairs, batch_size=RERANKER_BATCH_SIZE, show_progress_bar=False)
+        self.stats["predict_ms_total"] += (time.perf_counter() - start) * 1000.0
+        self.stats["pairs_scored"] += len(pairs)
+        return [float(s) for s in scores]
+
+    def _cache_get(self, key) -> Optional[float]:
+        with self._cache_lock:
+            score = self._cache.get(key)
+            if score is not None:
+                self._cache.move_to_end(key)
+            return score
+
+    def _cache_put(self, key, score: float) -> None:
+        with self._cache_lock:
+            self._cache[key] = score
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    async def rerank_scores(
+        self,
+        query: str,
+        items: Sequence[Tuple[Optional[Hashable], str]],
+        model_key: str = "base",
+    ) -> Optional[List[float]]:
+        """Cross-encoder scores for (article_key, text) items, or None if unavailable.
+
+        Items with a key are cached per (model, normalized query, key, text
+        hash); pass None as the key to always score.
+        """
+        if not self.backend_for(model_key) or (model_key not in self.models and self.load_backing_off(model_key)):
+            return None
+        if not items:
+            return []
+
+        query_key = normalize_text(query).lower()
+        cache_keys = [
+            (model_key, query_key, item_key, _text_hash(text)) if item_key is not None else None
+            for item_key, text in items
+        ]
+        scores: List[Optional[float]] = [None] * len(items)
+        missing: List[int] = []
+        for i, cache_key in enumerate(cache_keys):
+            cached = self._cache_get(cache_key) if cache_key is not None else None
+            if cached is None:
+                missing.append(i)
+            else:
+                scores[i] = cached
+        self.stats["cache_hits"] += len(items) - len(missing)
+        self.stats["cache_misses"] += len(missing)
+
+        if missing:
+            batcher = self._batchers.get(model_key)
+            if batcher is None:
+                batcher = self._batchers[model_key] = _ScoreBatcher(self, model_key)
+            fresh = await batcher.score([(query, items[i][1]) for i in missing])
+            for i, score in zip(missing, fresh):
+                scores[i] = score
+                if cache_keys[i] is not None:
+                    self._cache_put(cache_keys[i], score)
+        return scores  # type: ignore[return-value]
+
+    def info(self) -> Dict[str, Any]:
+        lookups = self.stats["cache_hits"] + self.stats["cache_misses"]
+        batches = self.stats["batches"]
+        return {
+            "available": self.available,
+            "backend_setting": RERANKER_BACKEND,
+            "backends": {key: self.backend_for(key) for key in RERANKER_MODELS},
+            "loaded_models": {key: round(self.load_seconds.get(key, 0.0), 2) for key in self.models},
+            "load_backing_off": [key for key in self._load_failed_until if self.load_backing_off(key)],
+            "cache_entries": len(self._cache),
+            "cache_hit_ratio": self.stats["cache_hits"] / lookups if lookups else 0.0,
+            "avg_requests_per_batch": self.stats["requests_batched"] / batches if batches else 0.0,
+            **self.stats,
+        }
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def article_key(article: Any) -> Optional[Hashable]:
+    """Stable cache key for an article: its id, else its URL."""
+    key = getattr(article, "id", None) or getattr(article, "url", None)
+    return str(key) if key else None
+
+
+reranker = RerankerRegistry()
@@ -0,0 +1,146 @@
+"""
+Request-scoped retrieval plan.
+
+A single /ask request used to embed the same query and hit the vector index
+several times (primary window, 24h updates, 720h background, guardrails).
+RetrievalPlan embeds the query once and runs at most one vector search per
+window. A narrower window is sliced in memory only from a wider search that
+came back short of its limit (i.e. held every match), so a long background
+window never crowds recent articles out of the primary window and the hot
+index still answers the windows it covers. BM25 scores are memoized so every
+consumer of the plan shares them.
+"""
+import asyncio
+from datetime import datetime, timezone, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from packages.nlp.embed import embed_query
+from packages.nlp.hot_index import search_hot_first
+from packages.nlp.text_index import text_index, merge_keyword_hits
+
+# Candidate pool fetched per window. Large enough to cover the biggest dynamic
+# K used by enhanced retrieval (800).
+PLAN_SEARCH_LIMIT = 800
+# Keyword-only candidates (BM25 index) added next to the vector hits
+PLAN_KEYWORD_LIMIT = 100
+
+
+def _as_utc(published_at: Optional[Any]) -> Optional[datetime]:
+    if not published_at:
+        return None
+    try:
+        if isinstance(published_at, str):
+            dt = datetime.fromisoformat(published_at.replace("Z", "+00:00"))
+        else:
+            dt = published_at
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return dt
+    except Exception:
+        return None
+
+
+class RetrievalPlan:
+    """Embed-once candidate source shared across a request, one search per window.
+
+    `stats` counts query embeddings, vector searches (one per window not
+    answered from a wider one) and BM25 score cache hits/misses.
+    """
+
+    def __init__(
+        self,
+        query: str,
+        repo,
+        search_limit: int = PLAN_SEARCH_LIMIT,
+    ):
+        self.query = query
+        self.repo = repo
+        self.search_limit = int(search_limit)
+
+        self._qvec: Optional[List[float]] = None
+        # window_hours -> (hits, limit the search ran with)
+        self._hits: Dict[int, Tuple[List[Tuple[Any, float]], int]] = {}
+        self._lock = asyncio.Lock()
+        self._scores: Dict[Tuple[str, Any], float] = {}
+        self._keyword_hits: Dict[int, Optional[List[Tuple[Any, float]]]] = {}
+
+        self.stats = {
+            "embed_calls": 0,
+            "vector_searches": 0,
+            "score_hits": 0,
+            "score_misses": 0,
+            "keyword_only_hits": 0,
+        }
+
+    async def query_vector(self) -> List[float]:
+        """Return the query embedding, computing it at most once."""
+        if self._qvec is None:
+            async with self._lock:
+                if self._qvec is None:
+                    self.stats["embed_calls"] += 1
+                    self._qvec = await embed_query(self.query)
+        return self._qvec
+
+    def _cached_hits(self, window_hours: int, limit: int) -> Optional[List[Tuple[Any, float]]]:
+        """Hits for `window_hours` from an earlier search, or None if none can answer it."""
+        cached = self._hits.get(window_hours)
+        if cached is not None and (cached[1] >= limit or len(cached[0]) < cached[1]):
+            return cached[0]
+
+        # A wider search that returned fewer rows than its limit holds every
+        # match, so the narrower window is an exact slice of it.
+        for wider, (hits, searched_limit) in self._hits.items():
+            if wider > window_hours and len(hits) < searched_limit:
+                cutoff = datetime.now(timezone.utc) - timedelta(hours=window_hours)
+                sliced = []
+                for article, cos in hits:
+                    published = _as_utc(getattr(article, "published_at", None))
+                    # Match search_vectors: undated articles are always in-window
+                    if published is None or published >= cutoff:
+                        sliced.append((article, cos))
+                return sliced
+        return None
+
+    async def vector_hits(self, window_hours: int, limit: Optional[int] = None) -> List[Tuple[Any, float]]:
+        """(article, cos_sim) pairs within `window_hours`, ordered by similarity."""
+        window_hours = int(window_hours)
+        wanted = max(self.search_limit, limit or 0)
+
+        hits = self._cached_hits(window_hours, wanted)
+        if hits is None:
+            qvec = await self.query_vector()
+            async with self._lock:
+                hits = self._cached_hits(window_hours, wanted)
+                if hits is None:
+                    self.stats["vector_searches"] += 1
+                    hits = search_hot_first(self.repo, qvec, window_hours=window_hours, limit=wanted)
+                    self._hits[window_hours] = (hits, wanted)
+
+        return hits[:limit] if limit else list(hits)
+
+    def keyword_hits(self, window_hours: int, limit: int = PLAN_KEYWORD_LIMIT) -> Optional[List[Tuple[Any, float]]]:
+        """BM25 index matches within `window_hours`; None when the index cannot answer."""
+        window_hours = int(window_hours)
+        if window_hours not in self._keyword_hits:
+            self._keyword_hits[window_hours] = text_index.search(self.query, window_hours=window_hours, limit=limit)
+        return self._keyword_hits[window_hours]
+
+    async def hybrid_hits(self, window_hours: int, limit: Optional[int] = None) -> List[Tuple[Any, float]]:
+        """vector_hits() plus keyword-only matches, so lexical recall does not depend on the embedding."""
+        hits = await self.vector_hits(window_hours, limit=limit)
+        merged = merge_keyword_hits(hits, self.keyword_hits(window_hours), self._qvec)
+        self.stats["keyword_only_hits"] += len(merged) - len(hits)
+        return merged
+
+    def lexical_scores(self, articles: List[Any]) -> Optional[List[float]]:
+        """Normalized BM25 per article (memoized as "bm25"); None without a text index."""
+        missing = [a for a in articles if ("bm25", getattr(a, "id", None) or id(a)) not in self._scores]
+        if missing:
+            scores = text_index.lexical_scores(self.query, missing)
+            if scores is None:
+                return None
+            for article, value in zip(missing, scores):
+                self._scores[("bm25", getattr(article, "id", None) or id(article))] = value
+        self.stats["score_misses"] += len(missing)
+        self.stats["score_hits"] += len(articles) - len(missing)
+        return [self._scores[("bm25", getattr(a, "id", None) or id(a))] for a in articles]
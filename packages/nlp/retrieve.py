@@ -2,10 +2,17 @@ import asyncio
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional, Sequence, Tuple
 
+import numpy as np
 from rapidfuzz import fuzz
 
 from packages.util.normalize import truncate_text, extract_domain
 from packages.nlp.embed import embed_query
+from packages.nlp.reranker import reranker, article_key
+from packages.nlp.text_index import text_index, merge_keyword_hits
+from packages.nlp.hot_index import hot_index
+from packages.nlp.article_features import article_features
+from packages.nlp.tokenizer import tokenize as shared_tokenize
+from packages.nlp.hybrid_scoring import CandidateArrays, batch_bm25ish, hybrid_scores, top_k_indices
 
 
 # --------------------------
@@ -13,11 +20,8 @@ from packages.nlp.embed import embed_query
 # --------------------------
 
 def tokenize(text: str) -> List[str]:
-    if not text:
-        return []
-    import re
-
-    return re.findall(r"[a-zA-Z0-9]+", text.lower())
+    # Shared Bangla/English tokenizer (the old [a-zA-Z0-9]+ dropped Bangla)
+    return shared_tokenize(text)
 
 
 def hours_old(published_at: Optional[Any]) -> float:
@@ -92,81 +96,114 @@ def filter_by_category(items: List[Any], category: Optional[str]) -> List[Any]:
     return [it for it in items if getattr(it, "source_category", None) == category]
 
 
-def _pairwise_text_sim(a_text: str, b_text: str) -> float:
-    # Symmetric similarity for MMR diversification (token Jaccard)
-    a_tokens = set(tokenize(a_text))
-    b_tokens = set(tokenize(b_text))
-    if not a_tokens or not b_tokens:
-        return 0.0
-    inter = len(a_tokens & b_tokens)
-    union = len(a_tokens | b_tokens)
-    return (inter / union) if union else 0.0
+def candidate_vectors(articles: Sequence[Any]) -> Optional[np.ndarray]:
+    """Unit embeddings of candidates as an (n, dim) matrix, NaN rows where none is known.
+
+    Hot-index articles come from the index; articles from search_vectors
+    carry the embedding their search read (`article.embedding`).
+    """
+    vectors = hot_index.vectors_for([getattr(a, "id", None) for a in articles])
+    carried = [getattr(a, "embedding", None) for a in articles]
+    dims = {len(vec) for vec in carried if vec is not None}
+    if vectors is None:
+        if len(dims) != 1:
+            return None
+        vectors = np.full((len(articles), dims.pop()), np.nan, dtype=np.float32)
+    for i, vec in enumerate(carried):
+        if vec is not None and len(vec) == vectors.shape[1] and np.isnan(vectors[i]).any():
+            vectors[i] = vec
+    return vectors
+
+
+def _jaccard_matrix(token_sets: List[set]) -> np.ndarray:
+    """Pairwise token Jaccard from a binary article x token incidence matrix."""
+    n = len(token_sets)
+    vocab: Dict[str, int] = {}
+    rows, cols = [], []
+    for i, tokens in enumerate(token_sets):
+        for token in tokens:
+            rows.append(i)
+            cols.append(vocab.setdefault(token, len(vocab)))
+    incidence = np.zeros((n, len(vocab)), dtype=np.float32)
+    incidence[rows, cols] = 1.0
+
+    inter = incidence @ incidence.T
+    sizes = incidence.sum(axis=1)
+    union = sizes[:, None] + sizes[None, :] - inter
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sim = np.where(union > 0, inter / union, 0.0).astype(np.float64)
+    np.fill_diagonal(sim, 0.0)
+    return sim
+
+
+def pairwise_similarity(articles: Sequence[Any], vectors: Optional[np.ndarray] = None) -> np.ndarray:
+    """Symmetric (n, n) similarity for MMR.
+
+    Cosine of the embeddings when every article has a vector, otherwise token
+    Jaccard (stored token sets) for every pair. The two are not on the same
+    scale, so mixing them would let vector-less articles look more novel.
+    """
+    n = len(articles)
+    if vectors is not None and len(vectors) == n and not np.isnan(vectors).any():
+        unit = np.asarray(vectors, dtype=np.float32)
+        return (unit @ unit.T).astype(np.float64)
+
+    return _jaccard_matrix([set(article_features(a)["tokens"]) for a in articles])
 
 
-def mmr_diversify(candidates: List[Tuple[Any, float]], k: int = 8, lambda_: float = 0.7) -> List[Any]:
-    """MMR diversify based on candidate score and pairwise text similarity.
+def mmr_diversify(
+    candidates: List[Tuple[Any, float]],
+    k: int = 8,
+    lambda_: float = 0.7,
+    vectors: Optional[np.ndarray] = None,
+) -> List[Any]:
+    """MMR diversify based on candidate score and pairwise similarity.
 
     candidates: list of (article, score)
+    vectors: optional (n, dim) unit embeddings aligned with candidates, NaN
+        rows where missing (see candidate_vectors); if any row is missing,
+        token Jaccard is used for all pairs
     returns: list of selected articles (length <= k)
     """
     if not candidates:
         return []
 
-    # Precompute article text for pairwise sim
-    texts = [f"{getattr(a, 'title', '')} {getattr(a, 'summary', '')}" for a, _ in candidates]
-
-    selected: List[int] = []
-    remaining = list(range(len(candidates)))
-
-    # Seed with best-scoring item
-    remaining.sort(key=lambda i: candidates[i][1], reverse=True)
-    if remaining:
-        selected.append(remaining.pop(0))
-
-    while remaining and len(selected) < k:
-        # For each remaining, compute MMR score wrt selected set
-        best_idx = None
-        best_score = -1e9
-        for i in remaining:
-            relevance = candidates[i][1]
-            max_sim = 0.0
-            for j in selected:
-                sim = _pairwise_text_sim(texts[i], texts[j])
-                if sim > max_sim:
-                    max_sim = sim
-            mmr_score = lambda_ * relevance - (1 - lambda_) * max_sim
-            if mmr_score > best_score:
-                best_score = mmr_score
-                best_idx = i
-        if best_idx is None:
-            break
-        selected.append(best_idx)
-        remaining.remove(best_idx)
+    # Best-scoring first (stable), so argmax ties resolve toward higher relevance
+    relevance = np.fromiter((float(s) for _, s in candidates), dtype=np.float64, count=len(candidates))
+    order = np.argsort(-relevance, kind="stable")
+    articles = [candidates[i][0] for i in order]
+    relevance = relevance[order]
+    sim = pairwise_similarity(articles, vectors[order] if vectors is not None else None)
+
+    # Seed with best-scoring item; max_sim[i] = max similarity of i to the selected set
+    selected = [0]
+    max_sim = sim[0].copy()
+    available = np.ones(len(articles), dtype=bool)
+    available[0] = False
+
+    while available.any() and len(selected) < k:
+        mmr_scores = np.where(available, lambda_ * relevance - (1 - lambda_) * max_sim, -np.inf)
+        best = int(np.argmax(mmr_scores))
+        selected.append(best)
+        available[best] = False
+        np.maximum(max_sim, sim[best], out=max_sim)
 
-    return [candidates[i][0] for i in selected]
+    return [articles[i] for i in selected]
 
 
 async def _maybe_rerank(query: str, articles: List[Any]) -> List[Any]:
     """Optionally rerank using a cross-encoder if installed."""
     if not articles:
         return []
+    items = [(article_key(a), f"{getattr(a, 'title', '')} {getattr(a, 'summary', '')}") for a in articles]
     try:
-        from sentence_transformers import CrossEncoder
-    except Exception:
-        return articles  # Reranker not installed
-
-    pairs = [(query, f"{getattr(a, 'title', '')} {getattr(a, 'summary', '')}") for a in articles]
-
-    def score_pairs() -> List[float]:
-        model_name = "BAAI/bge-reranker-large"
-        model = CrossEncoder(model_name, max_length=512)
-        return model.predict(pairs).tolist()
-
-    try:
-        scores: List[float] = await asyncio.to_thread(score_pairs)
+        scores = await reranker.rerank_scores(query, items, model_key="large")
     except Exception:
         return articles
 
+    if scores is None:
+        return articles  # Reranker not installed
+
     ranked = list(zip(articles, scores))
     ranked.sort(key=lambda x: x[1], reverse=True)
     return [a for a, _ in ranked]
@@ -182,7 +219,7 @@ async def retrieve_evidence(
     repo,
     window_hours: int = 72,
 ) -> List[Dict[str, Any]]:
-    """Hybrid retrieval: BM25-ish + embeddings + time decay + MMR.
+    """Hybrid retrieval: BM25 + embeddings + time decay + MMR.
 
     Returns evidence pack of dicts: {outlet,title,published_at,excerpt,url}
     """
@@ -192,33 +229,33 @@ async def retrieve_evidence(
     # 2) Vector search from DB - increased for better coverage
     limit_db = 500
     vector_hits: List[Tuple[Any, float]] = repo.search_vectors(qvec, window_hours=window_hours, limit=limit_db)
+    # Keyword-only BM25 matches join the vector hits
+    vector_hits = merge_keyword_hits(vector_hits, text_index.search(query, window_hours=window_hours, limit=100), qvec)
 
     # 3) Optional category filter
-    articles = [a for (a, cos) in vector_hits]
-    cos_sims = {a.id: cos for (a, cos) in vector_hits}
     if category:
-        articles = filter_by_category(articles, category)
-
-    # 4) Score hybrid with improved weighting
-    scored: List[Tuple[Any, float]] = []
-    for a in articles:
-        text = f"{getattr(a, 'title', '')} {getattr(a, 'summary', '')}"
-        bm = bm25ish(query, text)
-        cos_sim = float(cos_sims.get(a.id, 0.0) or 0.0)
-        td = time_decay(getattr(a, 'published_at', None))
-        # Improved scoring: more weight on semantic similarity and content relevance
-        score = 0.35 * bm + 0.55 * cos_sim + 0.10 * td
-        scored.append((a, score))
+        vector_hits = [(a, cos) for (a, cos) in vector_hits if getattr(a, "source_category", None) == category]
+
+    # 4) Score hybrid over candidate columns: more weight on semantic similarity
+    candidates = CandidateArrays.from_hits(vector_hits)
+    lexical = text_index.lexical_scores(query, candidates.articles)
+    if lexical is not None:
+        candidates.lexical = np.asarray(lexical, dtype=np.float64)
+    else:
+        candidates.lexical = batch_bm25ish(query, candidates.texts())
+    scores = hybrid_scores(candidates, cos_weight=0.55, lexical_weight=0.35, time_weight=0.10)
 
     # 5) Take top 50 for better diversity before MMR
-    scored.sort(key=lambda x: x[1], reverse=True)
-    topk = [a for a, s in scored[:50]]
+    top = top_k_indices(scores, 50)
+    score_of = {id(candidates.articles[i]): float(scores[i]) for i in top}
+    topk = [candidates.articles[i] for i in top]
 
     # 6) Optional rerank (if installed)
     topk = await _maybe_rerank(query, topk)
 
     # 7) MMR diversify to 12 for more comprehensive coverage
-    mmr_selected = mmr_diversify([(a, next(s for (aa, s) in scored if aa is a)) for a in topk], k=12, lambda_=0.6)
+    mmr_selected = mmr_diversify([(a, score_of[id(a)]) for a in topk], k=12, lambda_=0.6,
+                                 vectors=candidate_vectors(topk))
 
     # 8) Allow up to 2 per domain, keep 6–8 sources for richer information
     final: List[Any] = []
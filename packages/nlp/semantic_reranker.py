@@ -4,6 +4,8 @@ from typing import Any, Dict, List, Optional, Tuple
 import numpy as np
 from rapidfuzz import fuzz
 
+from packages.nlp.reranker import reranker, article_key
+
 def calculate_freshness_score(published_at: Optional[Any]) -> float:
     """Calculate freshness score (0.0-1.0) with higher scores for recent content."""
     if not published_at:
@@ -75,7 +77,8 @@ async def lightweight_cross_encoder_rerank(
 ) -> List[Any]:
     """
     Lightweight cross-encoder reranking using semantic similarity + quality signals.
-    Falls back to rule-based approach if cross-encoder is not available.
+    Uses the shared cross-encoder (int8 ONNX when exported, else PyTorch) and
+    falls back to a rule-based approach when no reranker backend is available.
     
     Args:
         query: The user query
@@ -91,13 +94,10 @@ async def lightweight_cross_encoder_rerank(
     # Take top candidates for reranking (limit computational cost)
     rerank_candidates = candidates[:min(top_k, len(candidates))]
     
-    try:
-        # Try to use cross-encoder if available
-        from sentence_transformers import CrossEncoder
+    if reranker.backend_for("base"):
         return await _cross_encoder_rerank(query, rerank_candidates)
-    except ImportError:
-        # Fallback to lightweight semantic + quality scoring
-        return await _lightweight_rerank(query, rerank_candidates)
+    # Fallback to lightweight semantic + quality scoring
+    return await _lightweight_rerank(query, rerank_candidates)
 
 
 async def _cross_encoder_rerank(
@@ -106,22 +106,17 @@ async def _cross_encoder_rerank(
 ) -> List[Any]:
     """Rerank using actual cross-encoder model."""
     
-    def score_pairs() -> List[float]:
-        # Use a lightweight multilingual cross-encoder
-        model_name = "BAAI/bge-reranker-base"  # Smaller, faster model
-        model = CrossEncoder(model_name, max_length=256)  # Shorter context for speed
-        
-        pairs = []
-        for article, _ in candidates:
-            text = f"{getattr(article, 'title', '')} {getattr(article, 'summary', '')}"[:500]
-            pairs.append((query, text))
-        
-        return model.predict(pairs).tolist()
-    
+    # Shared bge-reranker-base (shorter context for speed), loaded once per process
+    items = [
+        (article_key(article),
+         f"{getattr(article, 'title', '')} {getattr(article, 'summary', '')}"[:500])
+        for article, _ in candidates
+    ]
     try:
-        # Run in thread to avoid blocking
-        semantic_scores = await asyncio.to_thread(score_pairs)
+        semantic_scores = await reranker.rerank_scores(query, items, model_key="base")
     except Exception:
+        semantic_scores = None
+    if semantic_scores is None:
         # Fallback if model fails
         return await _lightweight_rerank(query, candidates)
     
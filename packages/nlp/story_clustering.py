@@ -1,40 +1,167 @@
-import hashlib
 import re
+import zlib
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional, Set, Tuple
 from collections import defaultdict
 import numpy as np
 from rapidfuzz import fuzz
 
-def create_minhash_signature(text: str, num_hashes: int = 64) -> Set[int]:
-    """Create MinHash signature for near-duplicate detection."""
-    # Normalize text
-    text = re.sub(r'[^\w\s]', ' ', text.lower())
-    words = text.split()
-    
-    # Create shingles (2-grams)
-    shingles = set()
-    for i in range(len(words) - 1):
-        shingle = f"{words[i]} {words[i+1]}"
-        shingles.add(shingle)
-    
-    if not shingles:
-        return set()
-    
-    # Generate hash values
-    hashes = []
-    for shingle in shingles:
-        hash_val = int(hashlib.md5(shingle.encode()).hexdigest(), 16)
-        hashes.append(hash_val)
-    
-    # MinHash signature - take minimum hash for each hash function
-    signature = set()
-    for i in range(num_hashes):
-        seed = i * 123456789  # Different seed for each hash function
-        min_hash = min((h ^ seed) & 0x7FFFFFFF for h in hashes)
-        signature.add(min_hash)
-    
-    return signature
+from packages.nlp.tokenizer import tokenize
+
+# MinHash permutations per signature
+NUM_PERM = 64
+# Shingle hashes per chunk in minhash_signatures (bounds the num_perm x chunk temp matrix)
+MINHASH_CHUNK = 50000
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+
+# Fixed seeds so signatures are stable across processes.
+# Multiply-shift hashing h(x) = ((a*x + b) mod 2^64) >> 32 with odd a is a universal family
+_rng = np.random.default_rng(20240611)
+_PERM_A = _rng.integers(1, 2**63, size=NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_PERM_B = _rng.integers(0, 2**63, size=NUM_PERM, dtype=np.uint64)
+
+
+def _shingle_hashes(text: str) -> np.ndarray:
+    """CRC32 of word 2-gram shingles (Bangla-aware tokens), deduplicated."""
+    words = tokenize(text)
+    shingles = {f"{words[i]} {words[i+1]}" for i in range(len(words) - 1)}
+    return np.fromiter((zlib.crc32(sh.encode("utf-8")) for sh in shingles), dtype=np.uint64, count=len(shingles))
+
+
+def minhash_signatures(texts: List[str], num_perm: int = NUM_PERM) -> Tuple[np.ndarray, np.ndarray]:
+    """MinHash signatures for many texts.
+
+    Returns (signatures, has_signature): an (n, num_perm) uint32 matrix and a
+    boolean mask that is False for texts too short to shingle (their rows
+    are meaningless and must not be compared).
+    """
+    a = _PERM_A[:num_perm, None]
+    b = _PERM_B[:num_perm, None]
+    per_text = [_shingle_hashes(t) for t in texts]
+    counts = np.fromiter((len(h) for h in per_text), dtype=np.int64, count=len(per_text))
+    signatures = np.full((len(texts), num_perm), _MAX_HASH, dtype=np.uint64)
+
+    # Process texts in chunks of concatenated shingles; per-text minimum via reduceat
+    start = 0
+    while start < len(texts):
+        stop, total = start, 0
+        while stop < len(texts) and (stop == start or total + counts[stop] <= MINHASH_CHUNK):
+            total += counts[stop]
+            stop += 1
+        rows = np.flatnonzero(counts[start:stop]) + start
+        if len(rows):
+            hashes = np.concatenate([per_text[i] for i in rows])
+            permuted = (a * hashes[None, :] + b) >> np.uint64(32)
+            offsets = np.concatenate([[0], np.cumsum(counts[rows])[:-1]])
+            signatures[rows] = np.minimum.reduceat(permuted, offsets, axis=1).T
+        start = stop
+
+    return signatures.astype(np.uint32), counts > 0
+
+
+def create_minhash_signature(text: str, num_hashes: int = NUM_PERM) -> np.ndarray:
+    """Fixed-length MinHash signature (uint32[num_hashes]) for near-duplicate detection.
+
+    Empty for text with fewer than two tokens.
+    """
+    signatures, has_signature = minhash_signatures([text], num_hashes)
+    return signatures[0] if has_signature[0] else np.empty(0, dtype=np.uint32)
+
+
+def minhash_similarity(sig1: np.ndarray, sig2: np.ndarray) -> float:
+    """Estimated Jaccard similarity: fraction of positions where two signatures agree."""
+    if len(sig1) == 0 or len(sig2) == 0 or len(sig1) != len(sig2):
+        return 0.0
+    return float(np.mean(sig1 == sig2))
+
+
+def lsh_params(threshold: float, num_perm: int = NUM_PERM) -> Tuple[int, int]:
+    """(bands, rows) for LSH banding.
+
+    Pairs with Jaccard s share at least one band with probability
+    1 - (1 - s^rows)^bands, which rises steeply around (1/bands)^(1/rows).
+    Picks the most rows per band whose rise point is still at or below the
+    threshold, so pairs above it are rarely missed and every candidate is
+    verified against the full signature afterwards.
+    """
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        if bands < 1:
+            break
+        if (1.0 / bands) ** (1.0 / rows) <= threshold:
+            best = (bands, rows)
+    return best
+
+
+def lsh_candidate_pairs(signatures: np.ndarray, has_signature: np.ndarray, bands: int, rows: int) -> np.ndarray:
+    """Index pairs (i < j) sharing at least one identical band, as an (m, 2) array."""
+    valid = np.flatnonzero(has_signature)
+    pairs: Set[Tuple[int, int]] = set()
+    if len(valid) < 2:
+        return np.empty((0, 2), dtype=np.int64)
+    for band in range(bands):
+        block = np.ascontiguousarray(signatures[valid, band * rows:(band + 1) * rows])
+        keys = block.view(np.dtype((np.void, block.dtype.itemsize * rows))).ravel()
+        _, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+        if counts.max() < 2:
+            continue
+        # Members of each bucket are contiguous once sorted by bucket
+        order = np.argsort(inverse.ravel(), kind="stable")
+        bounds = np.concatenate([[0], np.cumsum(counts)])
+        for bucket in np.flatnonzero(counts > 1):
+            members = np.sort(valid[order[bounds[bucket]:bounds[bucket + 1]]])
+            for x in range(len(members)):
+                for y in range(x + 1, len(members)):
+                    pairs.add((int(members[x]), int(members[y])))
+    if not pairs:
+        return np.empty((0, 2), dtype=np.int64)
+    return np.asarray(sorted(pairs), dtype=np.int64)
+
+
+class _UnionFind:
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+
+    def find(self, x: int) -> int:
+        root = x
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[x] != root:
+            self.parent[x], x = root, self.parent[x]
+        return root
+
+    def union(self, x: int, y: int) -> None:
+        rx, ry = self.find(x), self.find(y)
+        if rx != ry:
+            # Smaller index becomes the root so clusters keep input order
+            if rx < ry:
+                self.parent[ry] = rx
+            else:
+                self.parent[rx] = ry
+
+
+def near_duplicate_groups(texts: List[str], similarity_threshold: float = 0.4,
+                          num_perm: int = NUM_PERM) -> List[List[int]]:
+    """Group indices of near-duplicate texts (MinHash + LSH + union-find).
+
+    Groups are ordered by their first index and list members in input order;
+    texts without near duplicates form singleton groups.
+    """
+    signatures, has_signature = minhash_signatures(texts, num_perm)
+    bands, rows = lsh_params(similarity_threshold, num_perm)
+    pairs = lsh_candidate_pairs(signatures, has_signature, bands, rows)
+
+    uf = _UnionFind(len(texts))
+    if len(pairs):
+        similarity = (signatures[pairs[:, 0]] == signatures[pairs[:, 1]]).mean(axis=1)
+        for i, j in pairs[similarity >= similarity_threshold]:
+            uf.union(int(i), int(j))
+
+    groups: Dict[int, List[int]] = defaultdict(list)
+    for i in range(len(texts)):
+        groups[uf.find(i)].append(i)
+    return [groups[root] for root in sorted(groups)]
 
 
 def jaccard_similarity(set1: Set[int], set2: Set[int]) -> float:
@@ -115,6 +242,10 @@ def calculate_freshness_for_clustering(published_at: Optional[Any]) -> float:
 def cluster_similar_stories(articles: List[Any], similarity_threshold: float = 0.4) -> List[Dict[str, Any]]:
     """
     Cluster similar stories using MinHash signatures.
+
+    Candidate pairs come from LSH banding, are verified against the full
+    signatures and joined transitively (union-find), so cost grows roughly
+    linearly with the number of articles.
     
     Args:
         articles: List of article objects
@@ -126,39 +257,10 @@ def cluster_similar_stories(articles: List[Any], similarity_threshold: float = 0
     if not articles:
         return []
     
-    # Create MinHash signatures for all articles
-    signatures = {}
-    for i, article in enumerate(articles):
-        title = getattr(article, 'title', '')
-        summary = getattr(article, 'summary', '')
-        text = f"{title} {summary}"
-        signatures[i] = create_minhash_signature(text)
-    
-    # Find clusters using similarity threshold
+    texts = [f"{getattr(a, 'title', '')} {getattr(a, 'summary', '')}" for a in articles]
+
     clusters = []
-    used_indices = set()
-    
-    for i, article_i in enumerate(articles):
-        if i in used_indices:
-            continue
-            
-        # Start new cluster
-        cluster_members = [i]
-        used_indices.add(i)
-        
-        # Find similar articles
-        sig_i = signatures[i]
-        for j, article_j in enumerate(articles[i+1:], start=i+1):
-            if j in used_indices:
-                continue
-                
-            sig_j = signatures[j]
-            similarity = jaccard_similarity(sig_i, sig_j)
-            
-            if similarity >= similarity_threshold:
-                cluster_members.append(j)
-                used_indices.add(j)
-        
+    for cluster_members in near_duplicate_groups(texts, similarity_threshold):
         # Create cluster info
         cluster_articles = [articles[idx] for idx in cluster_members]
         
@@ -3,19 +3,29 @@ from datetime import datetime, timezone, timedelta
 from typing import Any, Dict, List, Optional, Tuple
 from packages.nlp.retrieve import retrieve_evidence
 from packages.nlp.enhanced_retrieve import enhanced_retrieve_evidence
+from packages.nlp.retrieval_plan import RetrievalPlan
 from packages.nlp.window_analyzer import analyze_query_window, get_story_id
 
+BACKGROUND_WINDOW_HOURS = 720  # 30 days of historical context
+RECENT_WINDOW_HOURS = 24
+
 
 async def retrieve_story_context(
     query: str,
     category: Optional[str],
     repo,
     user_window_hours: Optional[int] = None,
-    session_id: Optional[str] = None
+    session_id: Optional[str] = None,
+    plan: Optional[RetrievalPlan] = None
 ) -> Dict[str, Any]:
     """
     Enhanced retrieval that handles background context and story continuity.
     
+    All windows (primary, 24h, background) share one RetrievalPlan: the query
+    is embedded once and BM25 scores are reused, but each window runs its own
+    vector search unless a wider search already returned every match. Pass
+    `plan` to share it with later retrieval steps in the same request.
+    
     Returns:
     {
         'recent_evidence': List[Dict],      # Last 24h updates
@@ -36,8 +46,12 @@ async def retrieve_story_context(
     is_immediate = window_analysis['is_immediate']
     story_detected = window_analysis['story_detected']
     
+    # One embedding shared by the primary and background searches (one search per window)
+    if plan is None:
+        plan = RetrievalPlan(query, repo)
+    
     # Base evidence retrieval with enhanced scoring
-    primary_evidence = await enhanced_retrieve_evidence(query, category, repo, window_hours=window_hours)
+    primary_evidence = await enhanced_retrieve_evidence(query, category, repo, window_hours=window_hours, plan=plan)
     
     # Generate story ID for clustering
     story_id = get_story_id(query, primary_evidence) if story_detected else None
@@ -45,7 +59,7 @@ async def retrieve_story_context(
     # Determine retrieval strategy
     if needs_background and story_detected:
         return await _retrieve_with_background_context(
-            query, category, repo, primary_evidence, story_id, window_analysis
+            query, category, repo, primary_evidence, story_id, window_analysis, plan
         )
     elif is_immediate:
         return await _retrieve_immediate_context(
@@ -63,15 +77,20 @@ async def _retrieve_with_background_context(
     repo,
     primary_evidence: List[Dict],
     story_id: Optional[str],
-    window_analysis: Dict
+    window_analysis: Dict,
+    plan: Optional[RetrievalPlan] = None
 ) -> Dict[str, Any]:
     """Retrieve both recent updates and historical background."""
     
     # Get recent evidence (last 24h for updates)
-    recent_evidence = await enhanced_retrieve_evidence(query, category, repo, window_hours=24)
+    recent_evidence = await enhanced_retrieve_evidence(
+        query, category, repo, window_hours=RECENT_WINDOW_HOURS, plan=plan
+    )
     
     # Get broader historical context (30 days)
-    background_evidence = await enhanced_retrieve_evidence(query, category, repo, window_hours=720)
+    background_evidence = await enhanced_retrieve_evidence(
+        query, category, repo, window_hours=BACKGROUND_WINDOW_HOURS, plan=plan
+    )
     
     # Remove overlap - keep items from background that aren't in recent
     recent_urls = {item.get('url', '') for item in recent_evidence}
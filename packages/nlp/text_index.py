@@ -0,0 +1,344 @@
+"""
+In-process BM25 inverted index over recent article titles and summaries.
+
+The old lexical scores (bm25ish / enhanced_bm25) ran fuzzy matching per
+candidate and only over what the vector search had already returned, so a
+keyword the embedding missed could never be found. This index is maintained
+incrementally like the hot vector index (refreshed from articles whose text
+changed since the last refresh) and gives:
+
+- search(): keyword candidates on their own, independent of vector recall
+- lexical_scores(): BM25 for any candidate list, normalized to [0, 1]
+
+Scoring is Okapi BM25 (k1, b) over a title-weighted bag of words
+(TEXT_INDEX_TITLE_WEIGHT), tokenized with packages.nlp.tokenizer so Bangla
+and English both produce terms. Query scoring is a scatter-add of each query
+term's postings into a NumPy score vector: sub-millisecond for a few
+thousand articles.
+"""
+import math
+import os
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from packages.nlp.hot_index import (
+    HOT_INDEX_WINDOW_HOURS, INDEX_REFRESH_OVERLAP_S, INDEX_REFRESH_PAGE_SIZE, _epoch_hours,
+)
+from packages.nlp.tokenizer import tokenize
+
+TEXT_INDEX_WINDOW_HOURS = int(os.getenv("TEXT_INDEX_WINDOW_HOURS", str(HOT_INDEX_WINDOW_HOURS)))
+TEXT_INDEX_MAX_ROWS = int(os.getenv("TEXT_INDEX_MAX_ROWS", "20000"))
+TEXT_INDEX_ENABLED = os.getenv("TEXT_INDEX_ENABLED", "1") not in ("0", "false", "False")
+TEXT_INDEX_TITLE_WEIGHT = int(os.getenv("TEXT_INDEX_TITLE_WEIGHT", "2"))
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def article_terms(article: Any, title_weight: int = TEXT_INDEX_TITLE_WEIGHT) -> Counter:
+    """Term frequencies of an article with title terms counted `title_weight` times."""
+    terms = Counter(tokenize(getattr(article, "summary", "") or ""))
+    for term in tokenize(getattr(article, "title", "") or ""):
+        terms[term] += title_weight
+    return terms
+
+
+class BM25Index:
+    """Incrementally maintained inverted index with Okapi BM25 scoring."""
+
+    def __init__(self, window_hours: int = TEXT_INDEX_WINDOW_HOURS, max_rows: int = TEXT_INDEX_MAX_ROWS,
+                 k1: float = BM25_K1, b: float = BM25_B):
+        self.window_hours = int(window_hours)
+        self.max_rows = int(max_rows)
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+
+        # Slots are reused after removal; postings map term -> {slot: tf}
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._slot_by_id: Dict[Any, int] = {}
+        self._articles: List[Any] = []
+        self._terms: List[Optional[Counter]] = []
+        self._lengths: List[int] = []
+        self._published_h: List[float] = []
+        self._free: List[int] = []
+        self._total_length = 0
+        self._arrays: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+
+        self._last_updated_at: Optional[datetime] = None
+        self._last_refresh_at: Optional[float] = None
+        self.stats = {"queries": 0, "fallbacks": 0, "refreshes": 0, "rows_added": 0, "rows_evicted": 0}
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    @property
+    def size(self) -> int:
+        return len(self._slot_by_id)
+
+    @property
+    def ready(self) -> bool:
+        return self._last_refresh_at is not None and self.size > 0
+
+    @property
+    def avg_length(self) -> float:
+        return self._total_length / self.size if self.size else 0.0
+
+    def add(self, articles: Sequence[Any]) -> int:
+        """Insert or replace articles (by id). Returns rows written."""
+        with self._lock:
+            for article in articles:
+                self._remove_locked(article.id)
+                terms = article_terms(article)
+                slot = self._free.pop() if self._free else len(self._articles)
+                if slot == len(self._articles):
+                    self._articles.append(None)
+                    self._terms.append(None)
+                    self._lengths.append(0)
+                    self._published_h.append(np.nan)
+                self._articles[slot] = article
+                self._terms[slot] = terms
+                self._lengths[slot] = sum(terms.values())
+                self._published_h[slot] = _epoch_hours(getattr(article, "published_at", None))
+                self._slot_by_id[article.id] = slot
+                self._total_length += self._lengths[slot]
+                for term, tf in terms.items():
+                    self._postings.setdefault(term, {})[slot] = tf
+            self.stats["rows_added"] += len(articles)
+            self._arrays = None
+            self._evict_locked()
+        return len(articles)
+
+    def remove(self, article_ids: Sequence[Any]) -> int:
+        with self._lock:
+            removed = sum(1 for article_id in article_ids if self._remove_locked(article_id))
+            self._arrays = None
+        return removed
+
+    def _remove_locked(self, article_id: Any) -> bool:
+        slot = self._slot_by_id.pop(article_id, None)
+        if slot is None:
+            return False
+        for term in self._terms[slot]:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(slot, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_length -= self._lengths[slot]
+        self._articles[slot] = None
+        self._terms[slot] = None
+        self._lengths[slot] = 0
+        self._published_h[slot] = np.nan
+        self._free.append(slot)
+        return True
+
+    def _evict_locked(self) -> None:
+        """Drop articles older than the window, then the oldest over max_rows."""
+        cutoff_h = time.time() / 3600.0 - self.window_hours
+        dated = [(self._published_h[slot], article_id) for article_id, slot in self._slot_by_id.items()
+                 if not math.isnan(self._published_h[slot])]
+        expired = [article_id for published_h, article_id in dated if published_h < cutoff_h]
+        overflow = self.size - len(expired) - self.max_rows
+        if overflow > 0:
+            dated.sort()
+            expired_set = set(expired)
+            expired.extend([aid for _, aid in dated if aid not in expired_set][:overflow])
+        for article_id in expired:
+            self._remove_locked(article_id)
+        if expired:
+            self.stats["rows_evicted"] += len(expired)
+            self._arrays = None
+
+    def refresh(self, repo=None) -> int:
+        """Index articles whose text changed since the last refresh (full load on first call).
+
+        Pages forward by (updated_at, id) and re-reads INDEX_REFRESH_OVERLAP_S
+        before the watermark, like the hot vector index; edited articles are
+        re-indexed in place.
+        """
+        if repo is None:
+            from packages.db import repo as db_repo
+            repo = db_repo
+
+        since = self._last_updated_at
+        if since is not None:
+            since -= timedelta(seconds=INDEX_REFRESH_OVERLAP_S)
+
+        written, seen, after = 0, 0, None
+        while True:
+            articles = repo.fetch_recent_articles_since(
+                window_hours=self.window_hours,
+                updated_since=since,
+                limit=INDEX_REFRESH_PAGE_SIZE,
+                after=after,
+            )
+            written += self.add(articles)
+            seen += len(articles)
+            with self._lock:
+                for article in articles:
+                    updated_at = getattr(article, "updated_at", None)
+                    if updated_at and (self._last_updated_at is None or updated_at > self._last_updated_at):
+                        self._last_updated_at = updated_at
+            if len(articles) < INDEX_REFRESH_PAGE_SIZE:
+                break
+            after = (articles[-1].updated_at, articles[-1].id)
+
+        with self._lock:
+            if not seen:
+                self._evict_locked()
+            self._last_refresh_at = time.time()
+            self.stats["refreshes"] += 1
+        return written
+
+    # ------------------------------------------------------------------
+    # Scoring
+    # ------------------------------------------------------------------
+
+    def _slot_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(BM25 length norm, published hours, live mask) per slot."""
+        if self._arrays is None:
+            lengths = np.asarray(self._lengths, dtype=np.float64)
+            avg = self.avg_length or 1.0
+            norm = self.k1 * (1.0 - self.b + self.b * lengths / avg)
+            alive = np.zeros(len(self._articles), dtype=bool)
+            alive[list(self._slot_by_id.values())] = True
+            self._arrays = (norm, np.asarray(self._published_h, dtype=np.float64), alive)
+        return self._arrays
+
+    def idf(self, term: str) -> float:
+        df = len(self._postings.get(term, ()))
+        n = self.size
+        return math.log(1.0 + (n - df + 0.5) / (df + 0.5))
+
+    def _query_terms(self, query: str) -> List[str]:
+        return list(dict.fromkeys(tokenize(query)))
+
+    def _score_all_locked(self, terms: List[str]) -> np.ndarray:
+        """BM25 of every slot for the query terms (dead slots score 0)."""
+        norm, _, _ = self._slot_arrays()
+        scores = np.zeros(len(self._articles), dtype=np.float64)
+        for term in terms:
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            slots = np.fromiter(postings.keys(), dtype=np.int64, count=len(postings))
+            tf = np.fromiter(postings.values(), dtype=np.float64, count=len(postings))
+            scores[slots] += self.idf(term) * tf * (self.k1 + 1.0) / (tf + norm[slots])
+        return scores
+
+    def _score_terms(self, terms: List[str], doc_terms: Counter) -> float:
+        """BM25 of an article that is not in the index, using the index statistics."""
+        length = sum(doc_terms.values())
+        denom_base = self.k1 * (1.0 - self.b + self.b * length / (self.avg_length or 1.0))
+        score = 0.0
+        for term in terms:
+            tf = doc_terms.get(term, 0)
+            if tf:
+                score += self.idf(term) * tf * (self.k1 + 1.0) / (tf + denom_base)
+        return score
+
+    def search(self, query: str, window_hours: int = 72, limit: int = 200) -> Optional[List[Tuple[Any, float]]]:
+        """
+        Top BM25 matches within `window_hours`, best first.
+
+        Returns None when the index cannot answer (disabled, empty, or the
+        window is wider than what it holds) so callers rely on vector hits.
+        """
+        if not TEXT_INDEX_ENABLED or not self.ready or int(window_hours) > self.window_hours:
+            self.stats["fallbacks"] += 1
+            return None
+        terms = self._query_terms(query)
+        if not terms:
+            return []
+
+        with self._lock:
+            scores = self._score_all_locked(terms)
+            _, published_h, alive = self._slot_arrays()
+            cutoff_h = time.time() / 3600.0 - int(window_hours)
+            valid = alive & (np.isnan(published_h) | (published_h >= cutoff_h)) & (scores > 0)
+            scores = np.where(valid, scores, 0.0)
+            n_valid = int(valid.sum())
+            k = min(int(limit), n_valid)
+            if k <= 0:
+                return []
+            top = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.flatnonzero(valid)
+            top = top[np.argsort(-scores[top])]
+            self.stats["queries"] += 1
+            return [(self._articles[i], float(scores[i])) for i in top]
+
+    def lexical_scores(self, query: str, articles: Sequence[Any]) -> Optional[List[float]]:
+        """
+        BM25 of each article for `query`, scaled to [0, 1].
+
+        Scores are divided by the best score any indexed article gets for the
+        query, so they do not depend on which candidates the caller passes.
+        Articles outside the index are scored with the index's statistics.
+        Returns None when the index is not loaded; callers keep their old
+        lexical scoring then.
+        """
+        if not TEXT_INDEX_ENABLED or not self.ready:
+            return None
+        terms = self._query_terms(query)
+        if not terms or not articles:
+            return [0.0] * len(articles)
+
+        with self._lock:
+            all_scores = self._score_all_locked(terms)
+            raw = np.zeros(len(articles), dtype=np.float64)
+            for i, article in enumerate(articles):
+                slot = self._slot_by_id.get(getattr(article, "id", None))
+                if slot is not None:
+                    raw[i] = all_scores[slot]
+                else:
+                    raw[i] = self._score_terms(terms, article_terms(article))
+        best = max(float(all_scores.max()) if len(all_scores) else 0.0, float(raw.max()))
+        if best <= 0.0:
+            return [0.0] * len(articles)
+        return (raw / best).tolist()
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "enabled": TEXT_INDEX_ENABLED,
+            "ready": self.ready,
+            "rows": self.size,
+            "terms": len(self._postings),
+            "avg_length": round(self.avg_length, 1),
+            "window_hours": self.window_hours,
+            "last_updated_at": self._last_updated_at.isoformat() if self._last_updated_at else None,
+            **self.stats,
+        }
+
+
+# Process-wide instance
+text_index = BM25Index()
+
+
+def merge_keyword_hits(
+    vector_hits: List[Tuple[Any, float]],
+    keyword_hits: Optional[List[Tuple[Any, float]]],
+    qvec: Optional[Sequence[float]] = None,
+) -> List[Tuple[Any, float]]:
+    """
+    Vector hits plus keyword-only hits as (article, cosine) pairs.
+
+    Keyword-only articles get their cosine from the hot vector index when it
+    holds them (0.0 otherwise, e.g. not embedded yet).
+    """
+    if not keyword_hits:
+        return vector_hits
+    seen = {getattr(a, "id", None) for a, _ in vector_hits}
+    extra = [a for a, _ in keyword_hits if getattr(a, "id", None) not in seen]
+    if not extra:
+        return vector_hits
+
+    cosines: Dict[Any, float] = {}
+    if qvec is not None:
+        from packages.nlp.hot_index import hot_index
+        cosines = hot_index.cosine_for(qvec, [a.id for a in extra])
+    return list(vector_hits) + [(a, cosines.get(a.id, 0.0)) for a in extra]
@@ -0,0 +1,117 @@
+"""
+Shared Bangla/English word tokenizer for lexical matching.
+
+`[a-zA-Z0-9]+` and even `\\w+` split Bangla words apart (vowel signs and the
+hasanta are combining marks, not word characters), so Bangla text produced
+no usable tokens. Tokens here are runs of the Bengali block or of ASCII
+letters/digits after normalization:
+
+- NFC, so ড় / ঢ় / য় typed as letter + nukta match the precomposed forms
+- zero-width joiner/non-joiner removed, Bengali digits mapped to ASCII
+- casefold for English, with light plural/possessive stripping
+- common Bangla inflections stripped (ঢাকার, ঢাকায়, ঢাকাকে -> ঢাকা;
+  শিক্ষার্থীরা -> শিক্ষার্থী; শহরের, শহরে -> শহর), repeatedly until the
+  stem is stable so a base word and its inflections share a stem. Stems
+  need not be words: a root-final র after a vowel sign cannot be told from
+  the genitive without a lexicon, so সরকার and সরকারের both become সরকা
+
+Both queries and documents go through the same function, so the
+normalization only has to be consistent, not linguistically complete.
+"""
+import re
+import unicodedata
+from typing import List
+
+_TOKEN_RE = re.compile(r"[\u0980-\u09FF]+|[a-z0-9]+")
+_ZERO_WIDTH_RE = re.compile(r"[\u200B-\u200D\uFEFF]")
+_POSSESSIVE_RE = re.compile(r"['\u2019]s\b")
+_BENGALI_DIGITS = str.maketrans("০১২৩৪৫৬৭৮৯", "0123456789")
+
+# Dependent vowel signs (া ি ী ু ূ ৃ ে ৈ ো ৌ)
+_VOWEL_SIGNS = set("ািীুূৃেৈোৌ")
+_HASANTA = "\u09CD"
+
+# Plural/case suffixes stripped when the stem keeps MIN_STEM letters, longest first
+_BN_SUFFIXES = ("গুলোকে", "গুলোর", "গুলো", "গুলি", "দেরকে", "দের", "েরা", "ের", "কে")
+# Classifiers; not stripped after i-kar or a hasanta, where ট belongs to the
+# root (কমিটি, পার্টি)
+_BN_CLASSIFIERS = ("টির", "টি", "টা")
+# Stripped only after a vowel (ঢাকার, ঢাকায়, ছাত্রীরা, বাড়িতে). After a
+# consonant তে is the locative ে of a ত-final root (ভারতে, রাতে)
+_BN_VOWEL_SUFFIXES = ("রা", "র", "য়", "তে")
+# Letters (consonants and independent vowels, not signs) a stem must keep
+MIN_STEM = 2
+# Passes until a stem stops changing, so an inflected form and its base
+# reach the same stem (সরকারের -> সরকার -> সরকা, like সরকার)
+_MAX_STEM_PASSES = 3
+
+
+def _letters(text: str) -> int:
+    return sum(1 for ch in text if "\u0985" <= ch <= "\u09B9" or "\u09CE" <= ch <= "\u09DF")
+
+
+def _ends_in_vowel(stem: str) -> bool:
+    last = stem[-1]
+    return last in _VOWEL_SIGNS or "\u0985" <= last <= "\u0994"
+
+
+def _strip_bn(token: str) -> str:
+    for suffix in _BN_SUFFIXES:
+        if token.endswith(suffix) and _letters(token[:-len(suffix)]) >= MIN_STEM:
+            return token[:-len(suffix)]
+    for suffix in _BN_CLASSIFIERS:
+        if token.endswith(suffix):
+            stem = token[:-len(suffix)]
+            if _letters(stem) >= MIN_STEM and stem[-1] not in ("ি", "ী", _HASANTA):
+                return stem
+    for suffix in _BN_VOWEL_SUFFIXES:
+        if token.endswith(suffix):
+            stem = token[:-len(suffix)]
+            if _letters(stem) >= MIN_STEM and _ends_in_vowel(stem):
+                return stem
+    # Locative ে after a consonant (দেশে, বাজারে, নির্বাচনে)
+    if token.endswith("ে") and len(token) > 1 and token[-2] not in _VOWEL_SIGNS \
+            and token[-2] != _HASANTA and _letters(token[:-1]) >= MIN_STEM:
+        return token[:-1]
+    return token
+
+
+def _stem_bn(token: str) -> str:
+    for _ in range(_MAX_STEM_PASSES):
+        stemmed = _strip_bn(token)
+        if stemmed == token:
+            break
+        token = stemmed
+    return token
+
+
+def _stem_en(token: str) -> str:
+    if len(token) <= 3 or token.isdigit():
+        return token
+    if token.endswith("ies") and len(token) > 4:
+        return token[:-3] + "y"
+    if token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        return token[:-1]
+    return token
+
+
+def normalize_for_match(text: str) -> str:
+    """NFC, casefolded, zero-width free, ASCII digits."""
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFC", text)
+    text = _ZERO_WIDTH_RE.sub("", text)
+    return text.translate(_BENGALI_DIGITS).casefold()
+
+
+def tokenize(text: str) -> List[str]:
+    """Normalized word tokens (with repeats, in order) for Bangla and English text."""
+    if not text:
+        return []
+    tokens = []
+    for token in _TOKEN_RE.findall(_POSSESSIVE_RE.sub("", normalize_for_match(text))):
+        if "\u0980" <= token[0] <= "\u09FF":
+            tokens.append(_stem_bn(token))
+        else:
+            tokens.append(_stem_en(token))
+    return tokens
@@ -121,6 +121,40 @@ class KhoborMetrics:
             'Total tokens used',
             ['model', 'type']  # type: input/output
         )
+        
+        # Embedding cache
+        self.prom_embedding_cache = PrometheusCounter(
+            'khoboragent_embedding_cache_lookups_total',
+            'Embedding cache lookups by kind and result tier (memory, redis, miss)',
+            ['kind', 'tier']
+        )
+        
+        # Query-embedding micro-batcher
+        self.prom_query_embed_batch_fill = Histogram(
+            'khoboragent_query_embed_batch_fill_ratio',
+            'Query-embedding micro-batch size divided by max batch',
+            buckets=[0.05, 0.1, 0.25, 0.5, 0.75, 1.0]
+        )
+        
+        self.prom_query_embed_added_latency = Histogram(
+            'khoboragent_query_embed_added_latency_seconds',
+            'Time a query embedding waited in the micro-batch window',
+            buckets=[0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, float('inf')]
+        )
+        
+        # Shared HTTP client pools
+        self.prom_http_connections = PrometheusCounter(
+            'khoboragent_http_requests_by_connection_total',
+            'Pooled HTTP requests by whether the connection was reused',
+            ['client', 'reused']
+        )
+        
+        self.prom_http_pool_wait = Histogram(
+            'khoboragent_http_pool_wait_seconds',
+            'Time waiting for a pooled HTTP connection',
+            ['client'],
+            buckets=[0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, float('inf')]
+        )
     
     def _init_opentelemetry_metrics(self):
         """Initialize OpenTelemetry metrics"""
@@ -234,6 +268,40 @@ class KhoborMetrics:
                 self.prom_tokens_used.labels(model=model, type="input").inc(input_tokens)
                 self.prom_tokens_used.labels(model=model, type="output").inc(output_tokens)
     
+    def record_http_pool_request(self, client: str, reused: bool, pool_wait_seconds: float):
+        """Record connection reuse and pool wait for a shared HTTP client request"""
+        with self._lock:
+            self.counters[f"http.{client}.{'reused' if reused else 'new_connection'}"] += 1
+            self.histograms[f"http.{client}.pool_wait"].append(pool_wait_seconds)
+            
+            if PROMETHEUS_AVAILABLE:
+                self.prom_http_connections.labels(client=client, reused=str(reused)).inc()
+                self.prom_http_pool_wait.labels(client=client).observe(pool_wait_seconds)
+    
+    def record_embedding_cache(self, kind: str, memory_hits: int, redis_hits: int, misses: int):
+        """Record embedding cache lookups for query or store embeddings"""
+        with self._lock:
+            for tier, count in (("memory", memory_hits), ("redis", redis_hits), ("miss", misses)):
+                if not count:
+                    continue
+                self.counters[f"embed.cache.{kind}.{tier}"] += count
+                if PROMETHEUS_AVAILABLE:
+                    self.prom_embedding_cache.labels(kind=kind, tier=tier).inc(count)
+    
+    def record_query_embed_batch(self, batch_size: int, max_batch: int, added_latency_seconds: List[float]):
+        """Record a coalesced query-embedding batch and how long its items waited"""
+        fill_ratio = batch_size / max(max_batch, 1)
+        with self._lock:
+            self.counters["embed.query.batches"] += 1
+            self.counters["embed.query.texts"] += batch_size
+            self.histograms["embed.query.batch_fill_ratio"].append(fill_ratio)
+            self.histograms["embed.query.added_latency"].extend(added_latency_seconds)
+            
+            if PROMETHEUS_AVAILABLE:
+                self.prom_query_embed_batch_fill.observe(fill_ratio)
+                for latency in added_latency_seconds:
+                    self.prom_query_embed_added_latency.observe(latency)
+    
     def set_active_requests(self, count: int):
         """Set current active request count"""
         with self._lock:
@@ -1,14 +1,21 @@
 import time
+import json
 import hashlib
 import asyncio
 from typing import Any, Dict, Optional, Tuple
-from packages.util.redis_cache import get_cache, RedisCache
+from packages.util.redis_cache import get_cache, RedisCache, query_intent
 
 TTL_SECONDS_DEFAULT = 300  # 5 minutes (reduced from 15 for more dynamic caching)
 
 # Fallback in-memory cache if Redis is unavailable
 _FALLBACK_CACHE: Dict[str, Tuple[Any, float]] = {}
 
+# Per-level hit/miss counters for the two-level news cache (per process)
+_LEVEL_STATS: Dict[str, Dict[str, int]] = {
+    "pre_retrieval": {"hits": 0, "misses": 0},
+    "story": {"hits": 0, "misses": 0},
+}
+
 
 def _now() -> float:
     return time.time()
@@ -94,6 +101,138 @@ async def set_async(
         return True
 
 
+# Two-level news cache: a pre-retrieval key checked before any embedding or
+# vector search, and a story-aware key that dedupes paraphrases of one story
+def _record_level(level: str, hit: bool) -> None:
+    _LEVEL_STATS[level]["hits" if hit else "misses"] += 1
+
+
+def _level_fallback_key(level: str, **parts: Any) -> str:
+    """Memory-cache key for a cache level: canonical JSON of its parts (hashed by get/set)."""
+    return f"{level}:" + json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def get_level_stats() -> Dict[str, Dict[str, Any]]:
+    """Hit/miss counters and hit ratio for each cache level."""
+    stats = {}
+    for level, counts in _LEVEL_STATS.items():
+        total = counts["hits"] + counts["misses"]
+        stats[level] = {
+            **counts,
+            "hit_ratio": counts["hits"] / total if total else 0.0,
+        }
+    return stats
+
+
+async def get_pre_retrieval_async(
+    mode: str,
+    query: str,
+    window_analysis: Dict[str, Any],
+    lang: str = "bn",
+    region: Optional[str] = None
+) -> Tuple[Optional[Any], bool]:
+    """
+    Level-1 lookup keyed on normalized query, lang, window analysis and region.
+    
+    Returns:
+        Tuple of (cached_value, is_cache_hit)
+    """
+    try:
+        cache = await get_cache()
+        key = cache._create_pre_retrieval_key(mode, query, window_analysis, region, lang)
+        result = await cache.get_by_key(key)
+    except Exception as e:
+        print(f"[CACHE] Redis error, falling back to memory cache: {e}")
+        result = get(_level_fallback_key("pre", mode=mode, query=query, lang=lang,
+                                         window=window_analysis, region=region))
+    _record_level("pre_retrieval", result is not None)
+    return result, result is not None
+
+
+async def get_story_async(
+    mode: str,
+    story_id: Optional[str],
+    query: str,
+    lang: str = "bn",
+    window_hours: Optional[int] = None,
+    region: Optional[str] = None
+) -> Tuple[Optional[Any], bool]:
+    """
+    Level-2 lookup keyed on story cluster and query intent instead of query text.
+    
+    Returns:
+        Tuple of (cached_value, is_cache_hit)
+    """
+    if not story_id:
+        return None, False
+    try:
+        cache = await get_cache()
+        key = cache._create_story_key(mode, story_id, query, window_hours, region, lang)
+        result = await cache.get_by_key(key)
+    except Exception as e:
+        print(f"[CACHE] Redis error, falling back to memory cache: {e}")
+        result = get(_level_fallback_key("story", mode=mode, story_id=story_id, intent=query_intent(query),
+                                         lang=lang, window_hours=window_hours, region=region))
+    _record_level("story", result is not None)
+    return result, result is not None
+
+
+async def set_two_level_async(
+    mode: str,
+    query: str,
+    value: Any,
+    window_analysis: Dict[str, Any],
+    lang: str = "bn",
+    region: Optional[str] = None,
+    story_id: Optional[str] = None,
+    is_breaking: bool = False
+) -> bool:
+    """Write a response under the pre-retrieval key and, if known, the story key."""
+    window_hours = window_analysis.get("window_hours")
+    try:
+        cache = await get_cache()
+        ttl = cache._get_ttl_for_mode(mode, is_breaking)
+        ok = await cache.set_by_key(
+            cache._create_pre_retrieval_key(mode, query, window_analysis, region, lang), value, ttl
+        )
+        if story_id:
+            ok = await cache.set_by_key(
+                cache._create_story_key(mode, story_id, query, window_hours, region, lang), value, ttl
+            ) and ok
+        return ok
+    except Exception as e:
+        print(f"[CACHE] Redis error, falling back to memory cache: {e}")
+        set(_level_fallback_key("pre", mode=mode, query=query, lang=lang,
+                                window=window_analysis, region=region), value)
+        if story_id:
+            set(_level_fallback_key("story", mode=mode, story_id=story_id, intent=query_intent(query),
+                                    lang=lang, window_hours=window_hours, region=region), value)
+        return True
+
+
+async def set_pre_retrieval_async(
+    mode: str,
+    query: str,
+    value: Any,
+    window_analysis: Dict[str, Any],
+    lang: str = "bn",
+    region: Optional[str] = None,
+    is_breaking: bool = False
+) -> bool:
+    """Write a response under the pre-retrieval key only (e.g. after a story-key hit)."""
+    try:
+        cache = await get_cache()
+        return await cache.set_by_key(
+            cache._create_pre_retrieval_key(mode, query, window_analysis, region, lang), value,
+            cache._get_ttl_for_mode(mode, is_breaking)
+        )
+    except Exception as e:
+        print(f"[CACHE] Redis error, falling back to memory cache: {e}")
+        set(_level_fallback_key("pre", mode=mode, query=query, lang=lang,
+                                window=window_analysis, region=region), value)
+        return True
+
+
 # Backward compatibility - synchronous functions with fallback
 def get(key: str) -> Optional[Any]:
     """Synchronous get from fallback memory cache"""
@@ -0,0 +1,128 @@
+"""
+Long-lived pooled async HTTP clients.
+
+A SharedAsyncClient owns one httpx.AsyncClient (keep-alive, optional HTTP/2,
+bounded pool) for the life of the process instead of one per call. The API
+opens it at startup and closes it at shutdown; other processes (ingest
+worker, scripts) open it lazily on first use.
+
+httpx clients are tied to the event loop that created them, so calls from a
+different loop (e.g. embed_text's asyncio.run in a helper thread) get a
+one-off client rather than the shared one.
+
+Every pooled request reports whether its connection was reused and how long
+it waited for a pool slot (packages.observability metrics).
+"""
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+
+from packages.observability.metrics import get_metrics
+
+try:
+    import h2  # noqa: F401  (httpx needs it for http2=True)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class SharedAsyncClient:
+    """Lifecycle-managed httpx.AsyncClient with pool metrics."""
+
+    def __init__(
+        self,
+        name: str,
+        timeout: float = 15.0,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 30.0,
+        http2: bool = True,
+    ):
+        self.name = name
+        self.timeout = timeout
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.http2 = http2 and HTTP2_AVAILABLE
+        if http2 and not HTTP2_AVAILABLE:
+            print(f"[HTTP] h2 not installed; {name} client falls back to HTTP/1.1 keep-alive")
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.stats = {"requests": 0, "reused": 0, "new_connections": 0, "one_off_clients": 0,
+                      "pool_wait_ms_total": 0.0, "pool_wait_ms_max": 0.0}
+
+    def _build(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(timeout=self.timeout, limits=self.limits, http2=self.http2)
+
+    async def start(self) -> None:
+        """Open the pooled client on the running loop (no-op if already open there)."""
+        loop = asyncio.get_running_loop()
+        if self._client is not None and self._loop is loop:
+            return
+        if self._client is not None and self._loop is not None and not self._loop.is_closed():
+            return  # Owned by another live loop
+        self._client = self._build()
+        self._loop = loop
+
+    async def aclose(self) -> None:
+        """Close the pooled client if it belongs to the running loop."""
+        if self._client is not None and self._loop is asyncio.get_running_loop():
+            await self._client.aclose()
+            self._client = None
+            self._loop = None
+
+    async def post(self, url: str, **kwargs: Any) -> httpx.Response:
+        await self.start()
+        if self._loop is asyncio.get_running_loop():
+            return await self._send(self._client, url, **kwargs)
+
+        # Different event loop than the pooled client: use a one-off client
+        self.stats["one_off_clients"] += 1
+        async with self._build() as client:
+            return await self._send(client, url, **kwargs)
+
+    async def _send(self, client: httpx.AsyncClient, url: str, **kwargs: Any) -> httpx.Response:
+        start = time.perf_counter()
+        marks: Dict[str, Any] = {}
+
+        async def trace(event_name: str, info: Dict[str, Any]) -> None:
+            # First sign of a connection: a TCP connect (new) or sending headers (reused)
+            if "acquired_at" in marks:
+                return
+            if event_name == "connection.connect_tcp.started":
+                marks["acquired_at"], marks["reused"] = time.perf_counter(), False
+            elif event_name.endswith(".send_request_headers.started"):
+                marks["acquired_at"], marks["reused"] = time.perf_counter(), True
+
+        extensions = dict(kwargs.pop("extensions", None) or {})
+        extensions["trace"] = trace
+        response = await client.post(url, extensions=extensions, **kwargs)
+
+        if "acquired_at" in marks:
+            wait_s = marks["acquired_at"] - start
+            self.stats["requests"] += 1
+            self.stats["reused" if marks["reused"] else "new_connections"] += 1
+            self.stats["pool_wait_ms_total"] += wait_s * 1000.0
+            self.stats["pool_wait_ms_max"] = max(self.stats["pool_wait_ms_max"], wait_s * 1000.0)
+            try:
+                get_metrics().record_http_pool_request(self.name, marks["reused"], wait_s)
+            except Exception:
+                pass
+        return response
+
+    def info(self) -> Dict[str, Any]:
+        requests = self.stats["requests"]
+        return {
+            "open": self._client is not None,
+            "http2": self.http2,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "reuse_ratio": self.stats["reused"] / requests if requests else 0.0,
+            "avg_pool_wait_ms": self.stats["pool_wait_ms_total"] / requests if requests else 0.0,
+            **self.stats,
+        }
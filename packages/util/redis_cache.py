@@ -7,6 +7,8 @@ from typing import Any, Dict, List, Optional, Union, Tuple
 import redis.asyncio as redis
 from redis.asyncio import Redis
 
+from packages.nlp.tokenizer import tokenize
+
 # Redis connection configuration
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
 REDIS_DB = int(os.getenv("REDIS_DB", "0"))
@@ -15,8 +17,20 @@ REDIS_DB = int(os.getenv("REDIS_DB", "0"))
 CACHE_PREFIX = "khoboragent"
 QUERY_CACHE_PREFIX = f"{CACHE_PREFIX}:query"
 NEGATIVE_CACHE_PREFIX = f"{CACHE_PREFIX}:negative"
+PRE_RETRIEVAL_CACHE_PREFIX = f"{CACHE_PREFIX}:pre"
+STORY_CACHE_PREFIX = f"{CACHE_PREFIX}:story"
 HEALTH_CACHE_PREFIX = f"{CACHE_PREFIX}:health"
 
+def query_intent(query: str) -> str:
+    """
+    Order-insensitive normalized query: the sorted set of stemmed tokens.
+    
+    Paraphrases that only differ in word order, punctuation or inflection
+    share an intent; questions asking for different things do not.
+    """
+    return " ".join(sorted(set(tokenize(query))))
+
+
 class RedisCache:
     """Redis-based caching system with story-aware keys and dynamic TTLs"""
     
@@ -105,6 +119,106 @@ class RedisCache:
         
         return ":".join(key_parts)
     
+    def _create_pre_retrieval_key(
+        self,
+        mode: str,
+        query: str,
+        window_analysis: Dict[str, Any],
+        region: Optional[str] = None,
+        lang: str = "bn"
+    ) -> str:
+        """
+        Create level-1 cache key that can be computed before retrieval.
+        
+        Uses only the normalized query and the cheap window analysis output,
+        so a hit skips embedding, vector search, rerank and clustering.
+        """
+        normalized_query = self._normalize_query(query)
+        query_hash = hashlib.md5(normalized_query.encode()).hexdigest()[:12]
+        
+        flags = "".join([
+            "i" if window_analysis.get("is_immediate") else "-",
+            "b" if window_analysis.get("needs_background") else "-",
+            "s" if window_analysis.get("story_detected") else "-",
+        ])
+        
+        key_parts = [
+            PRE_RETRIEVAL_CACHE_PREFIX,
+            mode,
+            lang,
+            query_hash,
+            f"w{window_analysis.get('window_hours')}",
+            flags,
+        ]
+        if region:
+            key_parts.append(f"r{region}")
+        
+        return ":".join(key_parts)
+    
+    def _create_story_key(
+        self,
+        mode: str,
+        story_id: str,
+        query: str,
+        window_hours: Optional[int] = None,
+        region: Optional[str] = None,
+        lang: str = "bn"
+    ) -> str:
+        """
+        Create level-2 cache key shared by paraphrases of the same story.
+        
+        Keyed on the story cluster plus the query intent (query_intent), so
+        rewordings of one question reuse the answer but a different question
+        about the same story does not.
+        """
+        story_hash = hashlib.md5(story_id.encode()).hexdigest()[:8]
+        intent_hash = hashlib.md5(query_intent(query).encode()).hexdigest()[:12]
+        key_parts = [STORY_CACHE_PREFIX, mode, lang, f"s{story_hash}", f"q{intent_hash}"]
+        if window_hours is not None:
+            key_parts.append(f"w{window_hours}")
+        if region:
+            key_parts.append(f"r{region}")
+        return ":".join(key_parts)
+    
+    async def get_by_key(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Get cached response for a precomputed key."""
+        try:
+            redis_client = await self._get_redis()
+            cached_data = await redis_client.get(cache_key)
+            
+            if cached_data:
+                data = json.loads(cached_data)
+                data["cache_hit"] = True
+                data["cache_key"] = cache_key
+                return data
+            
+        except Exception as e:
+            print(f"[CACHE] Error getting cache for key {cache_key}: {e}")
+        
+        return None
+    
+    async def set_by_key(self, cache_key: str, data: Dict[str, Any], ttl: int) -> bool:
+        """Cache response data under a precomputed key."""
+        try:
+            cache_data = data.copy()
+            cache_data.update({
+                "cached_at": datetime.now(timezone.utc).isoformat(),
+                "cache_ttl": ttl,
+                "cache_key": cache_key
+            })
+            
+            redis_client = await self._get_redis()
+            await redis_client.setex(
+                cache_key,
+                ttl,
+                json.dumps(cache_data, ensure_ascii=False)
+            )
+            return True
+            
+        except Exception as e:
+            print(f"[CACHE] Error setting cache for key {cache_key}: {e}")
+            return False
+    
     def _get_ttl_for_mode(self, mode: str, is_breaking: bool = False) -> int:
         """
         Get TTL (in seconds) based on content type and urgency.
@@ -317,6 +431,8 @@ class RedisCache:
             # Get key counts by prefix
             query_keys = len(await redis_client.keys(f"{QUERY_CACHE_PREFIX}:*"))
             negative_keys = len(await redis_client.keys(f"{NEGATIVE_CACHE_PREFIX}:*"))
+            pre_retrieval_keys = len(await redis_client.keys(f"{PRE_RETRIEVAL_CACHE_PREFIX}:*"))
+            story_keys = len(await redis_client.keys(f"{STORY_CACHE_PREFIX}:*"))
             
             return {
                 "redis_version": info.get("redis_version", "unknown"),
@@ -325,6 +441,8 @@ class RedisCache:
                 "total_keys": info.get("db0", {}).get("keys", 0),
                 "query_cache_keys": query_keys,
                 "negative_cache_keys": negative_keys,
+                "pre_retrieval_cache_keys": pre_retrieval_keys,
+                "story_cache_keys": story_keys,
                 "uptime_seconds": info.get("uptime_in_seconds", 0),
                 "cache_hit_ratio": info.get("keyspace_hits", 0) / max(1, info.get("keyspace_hits", 0) + info.get("keyspace_misses", 0))
             }
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Compute stored text features (articles.features) for existing articles.
+
+Articles upserted before the column existed, or under an older
+FEATURES_VERSION, still work (features are computed on read), but pay that
+cost on every request until backfilled. Rows already up to date are
+skipped unless --force is given.
+
+Usage:
+    python scripts/backfill_article_features.py --page-size 500
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add packages to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from packages.db.repo import init_db, backfill_article_features
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Backfill articles.features")
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument("--force", action="store_true", help="Recompute features for every article")
+    args = parser.parse_args()
+
+    init_db()
+    start = time.perf_counter()
+    updated = backfill_article_features(page_size=args.page_size, force=args.force)
+    print(f"[FEATURES] Backfilled {updated} articles in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark the DB write side of an ingest cycle: per-row upserts (one
+transaction per article and per vector) versus the bulk upsert APIs.
+
+Writes synthetic articles under a bench:// URL prefix against DATABASE_URL
+and deletes them afterwards. Embedding API time is excluded; vectors are random.
+
+Usage:
+    python scripts/bench_ingest_upsert.py --feeds 18 --entries 50
+"""
+import argparse
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+# Add packages to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from packages.config.embedding import config
+from packages.db.repo import (
+    init_db, session_scope, text,
+    upsert_article, upsert_embedding,
+    upsert_articles_bulk, upsert_embeddings_bulk,
+)
+
+
+def _synthetic_feeds(run_id: str, label: str, feeds: int, entries: int):
+    now = datetime.now(timezone.utc).isoformat()
+    return [
+        [
+            {
+                "url": f"bench://upsert/{run_id}/{label}/{f}/{e}",
+                "title": f"Benchmark article {f}-{e}",
+                "source": f"bench-feed-{f}",
+                "source_category": "general",
+                "summary": "বাংলা সংবাদ সারাংশ " * 20,
+                "published_at": now,
+            }
+            for e in range(entries)
+        ]
+        for f in range(feeds)
+    ]
+
+
+def _random_vectors(n: int):
+    vecs = np.random.default_rng(0).standard_normal((n, config.dimension)).astype(np.float32)
+    return vecs / np.linalg.norm(vecs, axis=1, keepdims=True)
+
+
+def run_per_row(feeds_data, vectors) -> float:
+    start = time.perf_counter()
+    ids = []
+    for feed in feeds_data:
+        for article in feed:
+            ids.append(upsert_article(article))
+    for article_id, vec in zip(ids, vectors):
+        upsert_embedding(article_id, vec)
+    return time.perf_counter() - start
+
+
+def run_bulk(feeds_data, vectors) -> float:
+    start = time.perf_counter()
+    ids = []
+    for feed in feeds_data:
+        ids.extend(upsert_articles_bulk(feed).ids)
+    upsert_embeddings_bulk(zip(ids, vectors))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-row vs bulk ingest upsert benchmark")
+    parser.add_argument("--feeds", type=int, default=18)
+    parser.add_argument("--entries", type=int, default=50)
+    args = parser.parse_args()
+
+    init_db()
+    run_id = uuid.uuid4().hex[:8]
+    n = args.feeds * args.entries
+    vectors = _random_vectors(n)
+    print(f"[BENCH] {args.feeds} feeds x {args.entries} entries = {n} articles, dim={config.dimension}")
+
+    try:
+        per_row = run_per_row(_synthetic_feeds(run_id, "row", args.feeds, args.entries), vectors)
+        print(f"[BENCH] per-row upserts: {per_row:.2f}s ({n / per_row:.0f} articles/s)")
+
+        bulk = run_bulk(_synthetic_feeds(run_id, "bulk", args.feeds, args.entries), vectors)
+        print(f"[BENCH] bulk upserts:    {bulk:.2f}s ({n / bulk:.0f} articles/s)")
+        print(f"[BENCH] speedup: {per_row / bulk:.1f}x")
+    finally:
+        with session_scope() as session:
+            session.execute(
+                text("DELETE FROM articles WHERE url LIKE :prefix"),
+                {"prefix": f"bench://upsert/{run_id}/%"},
+            )
+        print("[BENCH] Cleaned up benchmark rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Benchmark two-stage search on shortened embeddings: recall@k versus latency.
+
+Loads stored full vectors from DATABASE_URL and takes exact full-dimension
+cosine top-k as ground truth. For each shortened dimension and overfetch
+factor it ranks by the shortened vectors, rescores the candidates with the
+full vectors and reports recall@k, per-query latency and bytes per vector.
+
+With --db it also times repo.search_vectors (whatever EMBED_SEARCH_DIM the
+process runs with) and scores its results against the same ground truth, so
+running it once with EMBED_SEARCH_DIM=0 and once with e.g. 256 compares the
+current setup against the two-stage layout end to end.
+
+Queries are embedded with the configured model when OPENAI_API_KEY is set,
+otherwise random stored vectors stand in for queries.
+
+Usage:
+    python scripts/bench_reduced_dim.py --dims 256 512 1024 --k 10 --db
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+# Add packages to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from packages.config.embedding import config
+from packages.db import repo
+
+QUERIES = [
+    "আজকের খবর",
+    "latest news",
+    "বাংলাদেশের অর্থনীতি",
+    "cricket score",
+    "ঢাকার আবহাওয়া",
+    "election results",
+    "শেয়ার বাজার",
+    "flood situation in Sylhet",
+]
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    k = min(k, scores.shape[0])
+    idx = np.argpartition(-scores, k - 1)[:k]
+    return idx[np.argsort(-scores[idx])]
+
+
+def _recall(found, truth) -> float:
+    return len(set(found) & set(truth)) / max(len(truth), 1)
+
+
+def _load_queries(matrix: np.ndarray, n: int) -> np.ndarray:
+    if config.api_key:
+        from packages.nlp.embed import embed_store
+        vecs = asyncio.run(embed_store(QUERIES[:n]))
+        return _normalize(np.asarray(vecs, dtype=np.float32))
+    print("[BENCH] OPENAI_API_KEY not set; using stored vectors as queries")
+    rows = np.random.default_rng(0).choice(matrix.shape[0], size=min(n, matrix.shape[0]), replace=False)
+    return matrix[rows]
+
+
+def bench_in_memory(matrix: np.ndarray, queries: np.ndarray, dims: List[int], overfetch: List[int], k: int):
+    truth = [_top_k(matrix @ q, k) for q in queries]
+
+    start = time.perf_counter()
+    for q in queries:
+        _top_k(matrix @ q, k)
+    full_ms = (time.perf_counter() - start) * 1000.0 / len(queries)
+    print(f"\n{'layout':<22}{'recall@' + str(k):>10}{'ms/query':>10}{'bytes/vec':>11}")
+    print(f"{'full ' + str(matrix.shape[1]):<22}{1.0:>10.3f}{full_ms:>10.2f}{matrix.shape[1] * 4:>11}")
+
+    for dim in dims:
+        short = _normalize(matrix[:, :dim])
+        short_queries = _normalize(queries[:, :dim])
+        for factor in overfetch:
+            recalls = []
+            start = time.perf_counter()
+            for q, q_short, expected in zip(queries, short_queries, truth):
+                candidates = _top_k(short @ q_short, k * factor)
+                rescored = candidates[_top_k(matrix[candidates] @ q, k)]
+                recalls.append(_recall(rescored, expected))
+            ms = (time.perf_counter() - start) * 1000.0 / len(queries)
+            label = f"{dim} + rescore x{factor}"
+            print(f"{label:<22}{np.mean(recalls):>10.3f}{ms:>10.2f}{dim * 4:>11}")
+
+
+def bench_db(ids: List, matrix: np.ndarray, queries: np.ndarray, k: int, window_hours: int):
+    mode = f"two-stage {config.search_dimension} x{config.search_overfetch}" if config.two_stage else "single-stage"
+    id_index = {article_id: i for i, article_id in enumerate(ids)}
+    latencies, recalls = [], []
+    for q in queries:
+        truth = _top_k(matrix @ q, k)
+        start = time.perf_counter()
+        hits = repo.search_vectors(q, window_hours=window_hours, limit=k)
+        latencies.append((time.perf_counter() - start) * 1000.0)
+        recalls.append(_recall([id_index.get(art.id) for art, _ in hits], truth))
+    latencies.sort()
+    print(f"\n[BENCH] DB search_vectors ({mode}): recall@{k}={np.mean(recalls):.3f} "
+          f"p50={latencies[len(latencies) // 2]:.1f}ms max={latencies[-1]:.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shortened-embedding recall@k vs latency")
+    parser.add_argument("--dims", type=int, nargs="+", default=[256, 512, 1024])
+    parser.add_argument("--overfetch", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=len(QUERIES))
+    parser.add_argument("--window-hours", type=int, default=24 * 365)
+    parser.add_argument("--limit", type=int, default=50000, help="Stored vectors to load")
+    parser.add_argument("--db", action="store_true", help="Also time repo.search_vectors")
+    args = parser.parse_args()
+
+    rows = repo.fetch_recent_vectors(window_hours=args.window_hours, limit=args.limit)
+    rows = [(art, vec) for art, vec, _ in rows if len(vec) == config.dimension]
+    if len(rows) < args.k:
+        print(f"[BENCH] Need at least {args.k} stored {config.dimension}-dim vectors; found {len(rows)}")
+        return
+    ids = [art.id for art, _ in rows]
+    matrix = _normalize(np.stack([vec for _, vec in rows]).astype(np.float32))
+    queries = _load_queries(matrix, args.queries)
+    print(f"[BENCH] {matrix.shape[0]} vectors x {matrix.shape[1]} dims, {len(queries)} queries, k={args.k}")
+
+    bench_in_memory(matrix, queries, [d for d in args.dims if d < matrix.shape[1]], args.overfetch, args.k)
+    if args.db:
+        bench_db(ids, matrix, queries, args.k, args.window_hours)
+
+
+if __name__ == "__main__":
+    main()
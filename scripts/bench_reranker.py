@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Benchmark reranker backends: ms per 40 pairs and ranking agreement.
+
+For each query the 40 most fuzzy-relevant recent articles (a cheap stand-in
+for the first retrieval stage) are scored by every available backend:
+
+    lightweight   rule-based _lightweight_rerank (no model)
+    torch         sentence-transformers CrossEncoder
+    onnx-fp32     models/rerankers/<model>/model.onnx
+    onnx-int8     models/rerankers/<model>/model.int8.onnx
+
+Quality is measured against the most exact backend available (torch, else
+onnx-fp32): overlap of the top-10 and Spearman correlation of the full
+40-item ranking. Latency is the median over --repeats runs per query.
+
+Usage:
+    python scripts/export_onnx_reranker.py --model base
+    python scripts/bench_reranker.py --model base --pairs 40
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+from rapidfuzz import fuzz
+
+# Add packages to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from packages.db import repo
+from packages.nlp import reranker as reranker_module
+from packages.nlp.reranker import RERANKER_MODELS, RERANKER_ONNX_DIR, OnnxCrossEncoder
+from packages.nlp.semantic_reranker import _lightweight_rerank
+
+QUERIES = [
+    "আজকের খবর",
+    "latest news",
+    "বাংলাদেশের অর্থনীতি",
+    "cricket score",
+    "ঢাকার আবহাওয়া",
+    "election results",
+    "শেয়ার বাজার",
+    "flood situation in Sylhet",
+]
+
+
+def _article_text(article) -> str:
+    return f"{getattr(article, 'title', '')} {getattr(article, 'summary', '')}"[:500]
+
+
+def _ranks(order: List[int]) -> np.ndarray:
+    ranks = np.empty(len(order), dtype=np.float64)
+    ranks[np.asarray(order)] = np.arange(len(order))
+    return ranks
+
+
+def _spearman(order_a: List[int], order_b: List[int]) -> float:
+    a, b = _ranks(order_a), _ranks(order_b)
+    if a.std() == 0 or b.std() == 0:
+        return 1.0
+    return float(np.corrcoef(a, b)[0, 1])
+
+
+def _model_backends(model_key: str) -> Dict[str, Callable]:
+    """name -> predict(pairs) for every model backend that can load here."""
+    model_name, max_length = RERANKER_MODELS.get(model_key, (model_key, 512))
+    backends: Dict[str, Callable] = {}
+    if reranker_module.SENTENCE_TRANSFORMERS_AVAILABLE:
+        from sentence_transformers import CrossEncoder
+        model = CrossEncoder(model_name, max_length=max_length)
+        backends["torch"] = lambda pairs, m=model: np.asarray(m.predict(pairs, batch_size=40, show_progress_bar=False))
+    if reranker_module.ONNX_RUNTIME_AVAILABLE:
+        for label, filename in (("onnx-fp32", "model.onnx"), ("onnx-int8", "model.int8.onnx")):
+            path = RERANKER_ONNX_DIR / model_key / filename
+            if path.is_file():
+                model = OnnxCrossEncoder(path, max_length=max_length)
+                backends[label] = lambda pairs, m=model: m.predict(pairs, batch_size=40)
+    return backends
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reranker backend latency and agreement")
+    parser.add_argument("--model", default="base", help=f"One of {', '.join(RERANKER_MODELS)}")
+    parser.add_argument("--pairs", type=int, default=40, help="Candidates reranked per query")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--window-hours", type=int, default=24 * 7)
+    args = parser.parse_args()
+
+    articles = repo.fetch_recent_candidates(window_hours=args.window_hours, limit=2000)
+    if len(articles) < args.pairs:
+        print(f"[BENCH] Need at least {args.pairs} recent articles; found {len(articles)}")
+        return
+
+    backends = _model_backends(args.model)
+    print(f"[BENCH] {len(articles)} recent articles, {len(QUERIES)} queries x {args.pairs} pairs; "
+          f"model backends: {', '.join(backends) or 'none'}")
+
+    orders: Dict[str, List[List[int]]] = {name: [] for name in ["lightweight", *backends]}
+    latencies: Dict[str, List[float]] = {name: [] for name in orders}
+
+    for query in QUERIES:
+        candidates = sorted(articles, key=lambda a: fuzz.partial_ratio(query, a.title or ""), reverse=True)
+        candidates = candidates[:args.pairs]
+        pairs = [(query, _article_text(a)) for a in candidates]
+
+        # Lightweight rerank returns articles; map them back to candidate positions
+        index = {id(a): i for i, a in enumerate(candidates)}
+        runs = []
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            ranked = asyncio.run(_lightweight_rerank(query, [(a, 0.0) for a in candidates]))
+            runs.append((time.perf_counter() - start) * 1000.0)
+        latencies["lightweight"].append(statistics.median(runs))
+        orders["lightweight"].append([index[id(a)] for a in ranked])
+
+        for name, predict in backends.items():
+            predict(pairs[:2])  # first call allocates the session arena
+            runs = []
+            for _ in range(args.repeats):
+                start = time.perf_counter()
+                scores = predict(pairs)
+                runs.append((time.perf_counter() - start) * 1000.0)
+            latencies[name].append(statistics.median(runs))
+            orders[name].append(list(np.argsort(-np.asarray(scores), kind="stable")))
+
+    reference = "torch" if "torch" in backends else "onnx-fp32" if "onnx-fp32" in backends else None
+    print(f"\n{'backend':<14}{'ms/' + str(args.pairs) + ' pairs':>14}{'top10 overlap':>15}{'spearman':>10}"
+          f"   (vs {reference or 'n/a'})")
+    for name in orders:
+        ms = statistics.median(latencies[name])
+        if reference:
+            overlap = np.mean([len(set(o[:10]) & set(r[:10])) / 10.0
+                               for o, r in zip(orders[name], orders[reference])])
+            rho = np.mean([_spearman(o, r) for o, r in zip(orders[name], orders[reference])])
+            print(f"{name:<14}{ms:>14.1f}{overlap:>15.2f}{rho:>10.3f}")
+        else:
+            print(f"{name:<14}{ms:>14.1f}{'-':>15}{'-':>10}")
+    if not backends:
+        print("\n[BENCH] No model backend available; run scripts/export_onnx_reranker.py "
+              "or install sentence-transformers")
+
+
+if __name__ == "__main__":
+    main()
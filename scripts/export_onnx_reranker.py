@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Export a bge-reranker cross-encoder to ONNX and quantize it to int8.
+
+Writes models/rerankers/<key>/ with:
+    model.onnx        fp32 export (kept for benchmarking, --no-fp32 drops it)
+    model.int8.onnx   dynamic int8 quantization (what the API loads)
+    tokenizer.json    fast tokenizer used by OnnxCrossEncoder
+    config.json       model config (pad_token_id)
+
+packages/nlp/reranker.py picks the int8 model up automatically on the next
+process start. Needs torch, transformers and onnxruntime on the export host
+only; API hosts need onnxruntime and tokenizers.
+
+Usage:
+    python scripts/export_onnx_reranker.py --model base
+    python scripts/export_onnx_reranker.py --model large --opset 17
+"""
+import argparse
+import sys
+from pathlib import Path
+
+# Add packages to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from packages.nlp.reranker import RERANKER_MODELS, RERANKER_ONNX_DIR
+
+
+def export(model_key: str, out_dir: Path, opset: int, keep_fp32: bool) -> Path:
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    model_name, max_length = RERANKER_MODELS.get(model_key, (model_key, 512))
+    out_dir.mkdir(parents=True, exist_ok=True)
+    print(f"[EXPORT] Loading {model_name}")
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name).eval()
+
+    sample = tokenizer([("query", "document text")], truncation=True, max_length=max_length,
+                       padding=True, return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["logits"] = {0: "batch"}
+
+    fp32_path = out_dir / "model.onnx"
+    print(f"[EXPORT] Exporting {fp32_path} (opset {opset})")
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in input_names),
+            str(fp32_path),
+            input_names=input_names,
+            output_names=["logits"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+        )
+
+    int8_path = out_dir / "model.int8.onnx"
+    print(f"[EXPORT] Quantizing to {int8_path}")
+    quantize_dynamic(str(fp32_path), str(int8_path), weight_type=QuantType.QInt8)
+
+    tokenizer.save_pretrained(str(out_dir))
+    model.config.to_json_file(str(out_dir / "config.json"))
+    if not (out_dir / "tokenizer.json").is_file():
+        raise RuntimeError(f"{model_name} has no fast tokenizer; tokenizer.json was not written")
+    if not keep_fp32:
+        fp32_path.unlink()
+
+    size_mb = int8_path.stat().st_size / 1e6
+    print(f"[EXPORT] ✅ {model_key}: {int8_path} ({size_mb:.0f} MB)")
+    return int8_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export and int8-quantize a cross-encoder reranker")
+    parser.add_argument("--model", default="base", help=f"One of {', '.join(RERANKER_MODELS)} or a HF model name")
+    parser.add_argument("--out-dir", help="Output directory (default: RERANKER_ONNX_DIR/<model>)")
+    parser.add_argument("--opset", type=int, default=17)
+    parser.add_argument("--no-fp32", action="store_true", help="Delete the fp32 export after quantizing")
+    args = parser.parse_args()
+
+    out_dir = Path(args.out_dir) if args.out_dir else RERANKER_ONNX_DIR / args.model
+    try:
+        export(args.model, out_dir, args.opset, keep_fp32=not args.no_fp32)
+    except ImportError as e:
+        print(f"[EXPORT] ❌ Missing export dependency ({e}); pip install torch transformers onnxruntime")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Measure /ask latency percentiles while the API process runs an ingest cycle.
+
+Sends /ask requests at a fixed rate, first with no ingest running (baseline),
+then while a run requested via /admin/ingest/run is in progress. Queries are
+repeated so most requests are cache hits: they do almost no work themselves,
+so their latency shows how long the event loop is stalled by ingest.
+
+Compare parsing on the loop against the worker pool by restarting the API
+(with the in-process ingest worker, INGEST_IN_PROCESS=1) with
+INGEST_PARSE_WORKERS=0 (before) and with the default (after).
+
+Usage:
+    python scripts/measure_ask_latency_during_ingest.py --api-url http://localhost:8000 --rate 20
+"""
+import argparse
+import asyncio
+import time
+from typing import List
+
+import httpx
+
+QUERIES = [
+    "আজকের খবর কী?",
+    "latest news from Dhaka",
+    "বাংলাদেশের অর্থনীতি",
+    "cricket update",
+]
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return float("nan")
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[idx]
+
+
+async def _one_ask(client: httpx.AsyncClient, api_url: str, query: str, samples: List[float], errors: List[str]):
+    start = time.perf_counter()
+    try:
+        resp = await client.post(f"{api_url}/ask", json={"query": query, "lang": "bn"})
+        resp.raise_for_status()
+        samples.append((time.perf_counter() - start) * 1000.0)
+    except Exception as e:
+        errors.append(str(e))
+
+
+async def _load(client: httpx.AsyncClient, api_url: str, rate: float, stop: asyncio.Event) -> List[float]:
+    """Fire /ask at `rate` req/s until `stop` is set; return latencies in ms."""
+    samples: List[float] = []
+    errors: List[str] = []
+    tasks = []
+    i = 0
+    while not stop.is_set():
+        tasks.append(asyncio.create_task(_one_ask(client, api_url, QUERIES[i % len(QUERIES)], samples, errors)))
+        i += 1
+        await asyncio.sleep(1.0 / rate)
+    await asyncio.gather(*tasks)
+    if errors:
+        print(f"[MEASURE] {len(errors)} failed requests (first: {errors[0]})")
+    return samples
+
+
+def _report(label: str, samples: List[float]):
+    print(f"[MEASURE] {label:<9} n={len(samples):<5} "
+          f"p50={_percentile(samples, 50):.0f}ms p95={_percentile(samples, 95):.0f}ms "
+          f"p99={_percentile(samples, 99):.0f}ms max={max(samples) if samples else float('nan'):.0f}ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="p99 /ask latency during ingest")
+    parser.add_argument("--api-url", default="http://localhost:8000")
+    parser.add_argument("--rate", type=float, default=20.0, help="/ask requests per second")
+    parser.add_argument("--baseline-seconds", type=float, default=30.0)
+    args = parser.parse_args()
+
+    async with httpx.AsyncClient(timeout=120.0) as client:
+        # Warm the response cache so steady-state requests are cheap
+        for query in QUERIES:
+            await client.post(f"{args.api_url}/ask", json={"query": query, "lang": "bn"})
+
+        stop = asyncio.Event()
+        load = asyncio.create_task(_load(client, args.api_url, args.rate, stop))
+        await asyncio.sleep(args.baseline_seconds)
+        stop.set()
+        _report("baseline", await load)
+
+        stop = asyncio.Event()
+        load = asyncio.create_task(_load(client, args.api_url, args.rate, stop))
+        ingest_start = time.perf_counter()
+        run = (await client.get(f"{args.api_url}/admin/ingest/run")).json()["run"]
+        while run.get("status") in ("requested", "running"):
+            await asyncio.sleep(1.0)
+            run = (await client.get(f"{args.api_url}/admin/ingest/runs/{run['id']}")).json()["run"]
+        ingest_s = time.perf_counter() - ingest_start
+        stop.set()
+        _report("ingest", await load)
+        print(f"[MEASURE] ingest run {run['id']} {run['status']} after {ingest_s:.1f}s "
+              f"(feeds={run.get('feeds')}, embedded={run.get('embedded')})")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
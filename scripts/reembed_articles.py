@@ -2,123 +2,219 @@
 """
 Re-embed all articles with the current embedding model.
 Run this after changing the embedding model or resetting the index.
+
+The article UUID space is split into --partitions contiguous ranges, each
+walked with keyset pagination (id > cursor ORDER BY id) and checkpointed in
+reembed_checkpoints after every fully stored page (a page with failed
+embeddings stops the partition without moving its cursor). Interrupted jobs
+resume where they stopped; rerun the same command. Rerunning a job whose
+partitions are all done starts a new pass over every article (e.g. after
+reset_embedding_index or for articles added since), so the same command
+always embeds whatever is missing. Several processes can share one job
+(e.g. `--partition 0 1` on one host, `--partition 2 3` on another), and
+within a process reading, embedding and writing run as concurrent stages.
+
+Articles whose stored vector already has the current content hash (same
+text, model and dimension) are skipped unless --force is given.
+Progress is shown under /admin/embedding/info.
+
+Usage:
+    python scripts/reembed_articles.py --partitions 4 --page-size 200
 """
+import argparse
 import asyncio
+import os
+import socket
 import sys
+import uuid
 from pathlib import Path
-from datetime import datetime, timezone
+from typing import List, Optional, Tuple
 
 # Add packages to path
 sys.path.append(str(Path(__file__).parent.parent))
 
 from packages.config.embedding import config
-from packages.db.repo import session_scope, get_recent_articles
-from packages.db.models import Article
+from packages.db.repo import (
+    session_scope, text, fetch_article_page, upsert_embeddings_bulk,
+    article_embedding_text, embedding_content_hash,
+)
+from packages.db.reembed_jobs import (
+    init_reembed_db, create_job, restart_finished_job, claim_partition, save_checkpoint, finish_partition,
+)
 from packages.nlp.embed import embed_store
-from packages.db.repo import upsert_embedding
-from sqlalchemy import select, func
 
-async def reembed_all_articles():
-    """Re-embed all articles with current model."""
+# Pages buffered between stages; bounds memory while keeping stages busy
+STAGE_QUEUE_SIZE = 2
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+
+def partition_bounds(partition: int, partitions: int) -> Tuple[Optional[uuid.UUID], Optional[uuid.UUID]]:
+    """[start, end) of a partition in UUID order; None means unbounded."""
+    span = 2 ** 128
+    start = None if partition == 0 else uuid.UUID(int=span * partition // partitions)
+    end = None if partition == partitions - 1 else uuid.UUID(int=span * (partition + 1) // partitions)
+    return start, end
+
+
+async def reembed_partition(job_id: str, partition: int, partitions: int, page_size: int, force: bool) -> bool:
+    """Read, embed and store one partition from its checkpoint. False if not claimed."""
+    row = await asyncio.to_thread(claim_partition, job_id, partition, WORKER_ID)
+    if not row:
+        print(f"[REEMBED] Partition {partition} is done or held by another worker")
+        return False
+
+    start_id, end_id = partition_bounds(partition, partitions)
+    cursor = row["last_article_id"]
+    print(f"[REEMBED] Partition {partition}/{partitions} "
+          f"{'resuming after ' + str(cursor) if cursor else 'starting'}")
+
+    pages: asyncio.Queue = asyncio.Queue(maxsize=STAGE_QUEUE_SIZE)
+    embedded: asyncio.Queue = asyncio.Queue(maxsize=STAGE_QUEUE_SIZE)
+
+    async def read_stage():
+        after = cursor
+        while True:
+            page = await asyncio.to_thread(fetch_article_page, start_id, end_id, after, page_size)
+            if not page:
+                await pages.put(None)
+                return
+            after = page[-1][0]
+            todo: List[Tuple[uuid.UUID, str, str]] = []
+            for article_id, title, summary, stored_hash in page:
+                text_for_store = article_embedding_text(title, summary)
+                if not text_for_store:
+                    continue
+                content_hash = embedding_content_hash(text_for_store)
+                if force or stored_hash != content_hash:
+                    todo.append((article_id, text_for_store, content_hash))
+            await pages.put((after, todo, len(page) - len(todo)))
+
+    async def embed_stage():
+        while True:
+            item = await pages.get()
+            if item is None:
+                await embedded.put(None)
+                return
+            after, todo, skipped = item
+            vectors = await embed_store([t for _, t, _ in todo]) if todo else []
+            await embedded.put((after, todo, vectors, skipped))
+
+    async def write_stage():
+        processed = 0
+        while True:
+            item = await embedded.get()
+            if item is None:
+                return processed
+            after, todo, vectors, skipped = item
+            written = 0
+            if todo:
+                written = await asyncio.to_thread(
+                    upsert_embeddings_bulk,
+                    [(article_id, vec) for (article_id, _, _), vec in zip(todo, vectors)],
+                    {article_id: content_hash for article_id, _, content_hash in todo},
+                )
+            if written < len(todo):
+                # Keep the cursor before this page; the rerun re-reads it and
+                # skips the rows that were stored (content hash matches)
+                raise RuntimeError(f"partition {partition}: stored {written}/{len(todo)} vectors of the page "
+                                   f"ending at {after}; stopping before the checkpoint")
+            saved = await asyncio.to_thread(save_checkpoint, job_id, partition, WORKER_ID, after,
+                                            written, skipped)
+            if not saved:
+                raise RuntimeError(f"partition {partition} was taken over by another worker")
+            processed += written
+            print(f"[REEMBED] Partition {partition}: +{written} embedded, {skipped} unchanged (cursor {after})")
+
+    stages = [asyncio.create_task(stage()) for stage in (read_stage, embed_stage, write_stage)]
+    try:
+        results = await asyncio.gather(*stages)
+    except BaseException as e:
+        for stage in stages:
+            stage.cancel()
+        # The cursor only covers stored pages; the next run resumes from there.
+        # Blocking call on purpose: on cancellation an await would not run.
+        finish_partition(job_id, partition, WORKER_ID, 'failed' if isinstance(e, Exception) else 'pending')
+        raise
+
+    await asyncio.to_thread(finish_partition, job_id, partition, WORKER_ID, 'done')
+    print(f"[REEMBED] Partition {partition} done: {results[-1]} embedded")
+    return True
+
+
+async def reembed_all_articles(args) -> int:
+    """Run (or resume) the re-embed job; returns the number of failed partitions."""
     print(f"[REEMBED] Starting re-embedding with {config.model_name} (dim={config.dimension})")
-    
+    await asyncio.to_thread(init_reembed_db)
+
+    job_id = args.job or f"{config.model_name}:{config.dimension}"
+    partitions = await asyncio.to_thread(create_job, job_id, args.partitions, config.model_name, config.dimension)
+    if partitions != args.partitions:
+        print(f"[REEMBED] Job {job_id} was created with {partitions} partitions; keeping that")
+    if await asyncio.to_thread(restart_finished_job, job_id):
+        print(f"[REEMBED] Job {job_id} had finished; starting a new pass")
+    selected = [p for p in (args.partition if args.partition is not None else range(partitions))
+                if 0 <= p < partitions]
+    print(f"[REEMBED] Job {job_id}: worker {WORKER_ID} running partitions {selected}")
+
+    semaphore = asyncio.Semaphore(args.concurrency or len(selected))
+
+    async def run(partition: int):
+        async with semaphore:
+            return await reembed_partition(job_id, partition, partitions, args.page_size, args.force)
+
+    results = await asyncio.gather(*(run(p) for p in selected), return_exceptions=True)
+    failed = 0
+    for partition, result in zip(selected, results):
+        if isinstance(result, Exception):
+            failed += 1
+            print(f"[REEMBED] Partition {partition} failed: {result}")
+
+    # Verify results
     with session_scope() as session:
-        # Count total articles
-        total_articles = session.execute(
-            select(func.count(Article.id))
-        ).scalar() or 0
-        
-        print(f"[REEMBED] Found {total_articles} articles to process")
-        
-        if total_articles == 0:
-            print("[REEMBED] No articles to process")
-            return
-        
-        # Process articles in batches
-        batch_size = 50
-        processed = 0
-        errors = 0
-        
-        for offset in range(0, total_articles, batch_size):
-            articles = session.execute(
-                select(Article)
-                .order_by(Article.inserted_at.desc())
-                .offset(offset)
-                .limit(batch_size)
-            ).scalars().all()
-            
-            if not articles:
-                break
-            
-            try:
-                # Prepare texts for embedding
-                texts = []
-                article_ids = []
-                
-                for article in articles:
-                    # Create combined text for embedding
-                    text = f"{article.title or ''}\n{article.summary or ''}".strip()
-                    if text:
-                        texts.append(text)
-                        article_ids.append(article.id)
-                
-                if not texts:
-                    processed += len(articles)
-                    continue
-                
-                # Generate embeddings
-                print(f"[REEMBED] Processing batch {offset//batch_size + 1}: {len(texts)} articles")
-                embeddings = await embed_store(texts)
-                
-                # Store embeddings
-                for article_id, embedding in zip(article_ids, embeddings):
-                    try:
-                        upsert_embedding(article_id, embedding)
-                        processed += 1
-                        
-                        if processed % 100 == 0:
-                            print(f"[REEMBED] Progress: {processed}/{total_articles} ({processed/total_articles*100:.1f}%)")
-                            
-                    except Exception as e:
-                        print(f"[REEMBED] Error embedding article {article_id}: {e}")
-                        errors += 1
-                
-                # Commit batch
-                session.commit()
-                
-            except Exception as e:
-                print(f"[REEMBED] Error processing batch {offset//batch_size + 1}: {e}")
-                errors += batch_size
-                session.rollback()
-        
-        print(f"[REEMBED] Completed: {processed} successful, {errors} errors")
-        
-        # Verify results
-        from packages.db.repo import text
         vector_stats = session.execute(text("""
-            SELECT 
-                model_name, 
-                model_dimension, 
+            SELECT
+                model_name,
+                model_dimension,
                 COUNT(*) as count
-            FROM article_vectors 
+            FROM article_vectors
             GROUP BY model_name, model_dimension
             ORDER BY count DESC
         """)).fetchall()
-        
-        print("[REEMBED] Final vector distribution:")
-        for stat in vector_stats:
-            print(f"  - {stat.model_name} (dim={stat.model_dimension}): {stat.count} vectors")
 
-if __name__ == "__main__":
+    print("[REEMBED] Final vector distribution:")
+    for stat in vector_stats:
+        print(f"  - {stat.model_name} (dim={stat.model_dimension}): {stat.count} vectors")
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resumable re-embedding of all articles")
+    parser.add_argument("--job", help="Job id (default: <model>:<dimension>)")
+    parser.add_argument("--partitions", type=int, default=4, help="UUID ranges for a new job")
+    parser.add_argument("--partition", type=int, nargs="+", help="Only run these partitions")
+    parser.add_argument("--concurrency", type=int, help="Partitions run at once in this process")
+    parser.add_argument("--page-size", type=int, default=200)
+    parser.add_argument("--force", action="store_true", help="Re-embed even if the content hash matches")
+    args = parser.parse_args()
+
     print(f"Re-embedding articles with {config.model_name} (dimension: {config.dimension})")
     print("This may take several minutes depending on the number of articles...")
-    
+
     try:
-        asyncio.run(reembed_all_articles())
-        print("[REEMBED] ✅ Re-embedding completed successfully!")
+        failed = asyncio.run(reembed_all_articles(args))
     except KeyboardInterrupt:
-        print("[REEMBED] ❌ Process interrupted by user")
+        print("[REEMBED] ❌ Process interrupted by user; rerun to resume from the checkpoint")
         sys.exit(1)
     except Exception as e:
         print(f"[REEMBED] ❌ Fatal error: {e}")
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
+
+    if failed:
+        print(f"[REEMBED] ❌ {failed} partition(s) failed; rerun to resume them")
+        sys.exit(1)
+    print("[REEMBED] ✅ Re-embedding completed successfully!")
+
+
+if __name__ == "__main__":
+    main()
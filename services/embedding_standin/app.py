@@ -0,0 +1,152 @@
+"""
+Offline OpenAI-compatible embedding server for load tests and CI.
+
+    uvicorn services.embedding_standin.app:app --port 8100
+    OPENAI_EMBED_BASE_URL=http://localhost:8100/v1/embeddings make api
+
+POST /v1/embeddings accepts the OpenAI request shape (`input` as a string or
+list, `model`, optional `dimensions` and `encoding_format`) and returns
+deterministic vectors derived from the text: every word and character
+trigram is hashed to a few signed dimensions and the sum is L2-normalized.
+Texts that share words and trigrams therefore land close together, so
+retrieval results are meaningful and identical across runs.
+
+Latency and failures are injected from the environment:
+    STANDIN_LATENCY_MS         fixed delay per request
+    STANDIN_JITTER_MS          extra uniform random delay per request
+    STANDIN_PER_ITEM_MS        extra delay per input text
+    STANDIN_ERROR_RATE         fraction of requests answered with 500
+    STANDIN_RATE_LIMIT_RATE    fraction answered with 429 + Retry-After
+    STANDIN_RETRY_AFTER_S      Retry-After value for injected 429s
+    STANDIN_SEED               seed for the jitter/error random stream
+"""
+import asyncio
+import base64
+import hashlib
+import os
+import random
+import re
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+# Add packages to path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from packages.config.embedding import MODEL_DIMENSIONS
+from packages.util.normalize import normalize_text
+
+LATENCY_MS = float(os.getenv("STANDIN_LATENCY_MS", "0"))
+JITTER_MS = float(os.getenv("STANDIN_JITTER_MS", "0"))
+PER_ITEM_MS = float(os.getenv("STANDIN_PER_ITEM_MS", "0"))
+ERROR_RATE = float(os.getenv("STANDIN_ERROR_RATE", "0"))
+RATE_LIMIT_RATE = float(os.getenv("STANDIN_RATE_LIMIT_RATE", "0"))
+RETRY_AFTER_S = float(os.getenv("STANDIN_RETRY_AFTER_S", "1"))
+SEED = int(os.getenv("STANDIN_SEED", "0"))
+
+DEFAULT_DIMENSION = 3072
+# Signed dimensions each feature is spread over
+PROJECTIONS_PER_FEATURE = 8
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _features(text: str) -> List[str]:
+    """Word unigrams plus character trigrams within each word."""
+    features: List[str] = []
+    for word in _WORD_RE.findall(normalize_text(text).lower()):
+        features.append(f"w:{word}")
+        padded = f"#{word}#"
+        features.extend(f"c:{padded[i:i + 3]}" for i in range(max(1, len(padded) - 2)))
+    return features
+
+
+def standin_embedding(text: str, dimension: int = DEFAULT_DIMENSION) -> np.ndarray:
+    """Deterministic unit vector for `text` from hashed n-gram projections."""
+    vec = np.zeros(dimension, dtype=np.float32)
+    features = _features(text) or [f"empty:{text}"]
+    for feature in features:
+        digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=4 * PROJECTIONS_PER_FEATURE).digest()
+        slots = np.frombuffer(digest, dtype=np.uint32)
+        signs = np.where(slots & 1, 1.0, -1.0).astype(np.float32)
+        np.add.at(vec, (slots >> 1) % dimension, signs)
+    norm = float(np.linalg.norm(vec))
+    return vec / norm if norm > 0 else vec
+
+
+class EmbeddingRequest(BaseModel):
+    input: Union[str, List[str]]
+    model: str = "text-embedding-3-large"
+    dimensions: Optional[int] = None
+    encoding_format: str = "float"
+
+
+app = FastAPI(title="Embedding stand-in", version="1.0.0")
+
+_rng = random.Random(SEED)
+stats: Dict[str, int] = {"requests": 0, "texts": 0, "injected_errors": 0, "injected_rate_limits": 0}
+
+
+@app.post("/v1/embeddings")
+async def create_embeddings(req: EmbeddingRequest):
+    texts = [req.input] if isinstance(req.input, str) else list(req.input)
+    stats["requests"] += 1
+
+    delay_ms = LATENCY_MS + _rng.uniform(0, JITTER_MS) + PER_ITEM_MS * len(texts)
+    if delay_ms > 0:
+        await asyncio.sleep(delay_ms / 1000.0)
+
+    roll = _rng.random()
+    if roll < RATE_LIMIT_RATE:
+        stats["injected_rate_limits"] += 1
+        return JSONResponse(
+            status_code=429,
+            headers={"retry-after": str(RETRY_AFTER_S)},
+            content={"error": {"message": "Injected rate limit", "type": "rate_limit_error"}},
+        )
+    if roll < RATE_LIMIT_RATE + ERROR_RATE:
+        stats["injected_errors"] += 1
+        return JSONResponse(
+            status_code=500,
+            content={"error": {"message": "Injected server error", "type": "server_error"}},
+        )
+
+    full_dim = MODEL_DIMENSIONS.get(req.model, DEFAULT_DIMENSION)
+    dim = min(req.dimensions or full_dim, full_dim)
+    data = []
+    tokens = 0
+    for i, text in enumerate(texts):
+        vec = standin_embedding(text, full_dim)
+        if dim < full_dim:
+            # Shortened embeddings behave like the real API: truncate, re-normalize
+            vec = vec[:dim] / max(float(np.linalg.norm(vec[:dim])), 1e-12)
+        if req.encoding_format == "base64":
+            embedding = base64.b64encode(vec.astype(np.float32).tobytes()).decode("ascii")
+        else:
+            embedding = vec.tolist()
+        data.append({"object": "embedding", "index": i, "embedding": embedding})
+        tokens += len(_WORD_RE.findall(text))
+
+    stats["texts"] += len(texts)
+    return {
+        "object": "list",
+        "data": data,
+        "model": req.model,
+        "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+    }
+
+
+@app.get("/health")
+async def health():
+    return {
+        "status": "ok",
+        "latency_ms": LATENCY_MS,
+        "jitter_ms": JITTER_MS,
+        "per_item_ms": PER_ITEM_MS,
+        "error_rate": ERROR_RATE,
+        "rate_limit_rate": RATE_LIMIT_RATE,
+        **stats,
+    }
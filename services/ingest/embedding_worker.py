@@ -0,0 +1,143 @@
+"""
+Async embedding workers draining the embedding_jobs outbox.
+
+Ingest only upserts articles and queues them (same transaction); these
+workers batch-embed the queued texts and bulk-write vectors, so feed
+fetching never waits on the embedding API and failed embeddings are
+retried from the table instead of lost. Every ingest worker process runs a
+pool (leader or not); SKIP LOCKED leases keep them from taking the same job.
+"""
+import asyncio
+import os
+import socket
+import time
+from typing import Any, Dict, List, Optional
+
+from packages.config.embedding import config
+from packages.db.embedding_jobs import (
+    claim_embedding_jobs, complete_embedding_jobs, fail_embedding_jobs,
+)
+from packages.nlp.embed import embed_store
+from packages.nlp.hot_index import hot_index
+
+EMBED_WORKERS = int(os.getenv("EMBED_WORKERS", "2"))
+EMBED_JOB_BATCH = int(os.getenv("EMBED_JOB_BATCH", "128"))
+EMBED_JOB_POLL_S = float(os.getenv("EMBED_JOB_POLL_S", "2"))
+EMBED_JOB_LEASE_S = int(os.getenv("EMBED_JOB_LEASE_S", "120"))
+
+
+class EmbeddingWorkerPool:
+    """N async loops that claim, embed and store outbox batches."""
+
+    def __init__(self, workers: int = EMBED_WORKERS, batch_size: int = EMBED_JOB_BATCH,
+                 poll_seconds: float = EMBED_JOB_POLL_S):
+        self.workers = max(1, workers)
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._wake: Optional[asyncio.Event] = None
+        self._running = False
+        self.stats: Dict[str, Any] = {"batches": 0, "embedded": 0, "failed": 0, "last_batch_at": None,
+                                      "last_batch_ms": None}
+
+    def notify(self) -> None:
+        """Wake idle workers early (ingest just queued jobs in this process)."""
+        if self._wake is not None:
+            self._wake.set()
+
+    async def run(self, stop: asyncio.Event) -> None:
+        """Run the pool until `stop` is set."""
+        self._wake = asyncio.Event()
+        self._running = True
+        print(f"[EMBED_WORKER] {self.workers} embedding workers started (batch {self.batch_size})")
+        try:
+            await asyncio.gather(*(self._loop(i, stop) for i in range(self.workers)))
+        finally:
+            self._running = False
+            print("[EMBED_WORKER] Embedding workers stopped")
+
+    async def _idle(self, stop: asyncio.Event) -> None:
+        wake = self._wake
+        waiters = [asyncio.ensure_future(stop.wait()), asyncio.ensure_future(wake.wait())]
+        try:
+            await asyncio.wait(waiters, timeout=self.poll_seconds, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+        wake.clear()
+
+    async def _loop(self, index: int, stop: asyncio.Event) -> None:
+        worker_id = f"{self.worker_id}:{index}"
+        while not stop.is_set():
+            try:
+                jobs = await asyncio.to_thread(claim_embedding_jobs, worker_id, self.batch_size, EMBED_JOB_LEASE_S)
+            except Exception as e:
+                print(f"[EMBED_WORKER] Could not claim jobs: {e}")
+                jobs = []
+            if not jobs:
+                await self._idle(stop)
+                continue
+            await self.process(jobs)
+
+    async def process(self, jobs: List[Dict[str, Any]]) -> int:
+        """Embed and store one claimed batch; failures go back to the outbox."""
+        start = time.perf_counter()
+        empty = [job["article_id"] for job in jobs if not job["text"]]
+        if empty:
+            await asyncio.to_thread(fail_embedding_jobs, empty, "article has no text to embed")
+        jobs = [job for job in jobs if job["text"]]
+        if not jobs:
+            return 0
+
+        ids = [job["article_id"] for job in jobs]
+        try:
+            vectors = await embed_store([job["text"] for job in jobs])
+            # A vector of the wrong size would never be stored; fail its job
+            # now instead of leaving it leased until the lease runs out
+            bad = [(job, vec) for job, vec in zip(jobs, vectors) if vec is None or len(vec) != config.dimension]
+            if bad:
+                sizes = sorted({len(vec) if vec is not None else 0 for _, vec in bad})
+                error = f"embedding dimensions {sizes}, expected {config.dimension}"
+                print(f"[EMBED_WORKER] Failing {len(bad)} jobs: {error}")
+                self.stats["failed"] += len(bad)
+                await asyncio.to_thread(fail_embedding_jobs, [job["article_id"] for job, _ in bad], error)
+            written = await asyncio.to_thread(complete_embedding_jobs, [
+                (job["article_id"], vec, job["content_hash"], job["job_hash"])
+                for job, vec in zip(jobs, vectors)
+                if vec is not None and len(vec) == config.dimension
+            ])
+        except Exception as e:
+            print(f"[EMBED_WORKER] Batch of {len(jobs)} failed, will retry: {e}")
+            self.stats["failed"] += len(jobs)
+            try:
+                await asyncio.to_thread(fail_embedding_jobs, ids, str(e))
+            except Exception as release_error:
+                # Lease expiry returns them to the queue anyway
+                print(f"[EMBED_WORKER] Could not release failed jobs: {release_error}")
+            return 0
+
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        self.stats["batches"] += 1
+        self.stats["embedded"] += written
+        self.stats["last_batch_at"] = time.time()
+        self.stats["last_batch_ms"] = round(elapsed_ms, 1)
+        print(f"[EMBED_WORKER] Embedded {written}/{len(jobs)} queued articles in {elapsed_ms:.0f}ms")
+
+        # Serve new vectors right away when this process also answers queries
+        if written and hot_index.ready:
+            try:
+                await asyncio.to_thread(hot_index.refresh)
+            except Exception as e:
+                print(f"[EMBED_WORKER] Hot index refresh failed: {e}")
+        return written
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "running": self._running,
+            "workers": self.workers,
+            "batch_size": self.batch_size,
+            **self.stats,
+        }
+
+
+embedding_workers = EmbeddingWorkerPool()
@@ -1,25 +1,53 @@
 import os
 import asyncio
+import multiprocessing
 import random
 import time
-import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Tuple, Optional
+from typing import Any, Collection, Dict, List, NamedTuple, Tuple, Optional
 import aiohttp
-import feedparser
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 import yaml
 
-from packages.db.repo import init_db, upsert_article, upsert_embedding, fetch_recent_candidates
+from packages.db.repo import init_db, upsert_articles_bulk, fetch_recent_candidates
 from packages.db.feed_health import (
     init_feed_health_db, record_feed_attempt, get_healthy_feeds, 
-    disable_unhealthy_feeds, get_feed_timeout
+    disable_unhealthy_feeds, get_feed_timeout, get_feed_validators, get_feed_publish_rates,
+    get_feed_seen_entries
 )
-from packages.nlp.embed import embed_store
-from packages.util.normalize import truncate_text
+from services.ingest.embedding_worker import embedding_workers
+from services.ingest.feed_parser import parse_feed_entries
+from services.ingest.feed_schedule import feed_schedule
 
 DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data", "rss_sources.yaml")
 
+# Global budget of concurrent feed fetches, shared by every poll
+FEED_FETCH_CONCURRENCY = int(os.getenv("FEED_FETCH_CONCURRENCY", "10"))
+# How often the adaptive scheduler checks for feeds that are due
+POLL_TICK_SECONDS = int(os.getenv("FEED_POLL_TICK_SECONDS", "30"))
+
+# Worker processes for feedparser + entry normalization, so parsing never
+# blocks the event loop serving /ask. 0 parses inline on the loop.
+INGEST_PARSE_WORKERS = int(os.getenv("INGEST_PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))
+_parse_pool: Optional[ProcessPoolExecutor] = None
+
+_CYCLE_LOCK = asyncio.Lock()
+
+# Per-feed keys of entries stored in the previous cycle. Replaced with the
+# current feed contents each cycle, so it stays bounded by feed length.
+# Persisted in feed_health and seeded from there on a feed's first poll in
+# this process, so a restart or leader change does not re-upsert every entry.
+_SEEN_ENTRIES: Dict[str, set] = {}
+
+
+class FeedPollResult(NamedTuple):
+    """Article counts from one feed poll"""
+    stored: int     # Rows upserted (new entries and edited ones)
+    queued: int     # Of those, queued for embedding (text changed)
+    unchanged: int  # Of those, text already embedded with the current model
+
 
 def _load_feeds() -> List[Dict[str, Any]]:
     """Load feeds from YAML configuration"""
@@ -28,55 +56,83 @@ def _load_feeds() -> List[Dict[str, Any]]:
     return data.get("feeds", [])
 
 
-def _normalize_entry(entry: Dict[str, Any], feed_meta: Dict[str, Any]) -> Dict[str, Any]:
-    """Normalize RSS entry to article format"""
-    title = entry.get("title") or entry.get("summary") or "Untitled"
-    link = entry.get("link") or entry.get("id") or ""
-    summary = truncate_text(entry.get("summary", ""), max_length=500)
-
-    # Parse published date
-    published = None
-    for key in ("published", "updated", "created"):
-        if entry.get(key + "_parsed"):
-            try:
-                published = datetime(*entry[key + "_parsed"][0:6], tzinfo=timezone.utc).isoformat()
-                break
-            except Exception:
-                pass
-        if entry.get(key):
-            try:
-                published = datetime.fromisoformat(str(entry[key]).replace("Z", "+00:00")).isoformat()
-                break
-            except Exception:
-                continue
+def _get_parse_pool() -> Optional[ProcessPoolExecutor]:
+    global _parse_pool
+    if _parse_pool is None and INGEST_PARSE_WORKERS > 0:
+        # spawn: workers only import feed_parser, never a forked copy of the API
+        _parse_pool = ProcessPoolExecutor(
+            max_workers=INGEST_PARSE_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _parse_pool
 
-    source = feed_meta.get("name", "Unknown")
-    category = feed_meta.get("category", "general")
 
-    return {
-        "title": title.strip()[:512],
-        "url": link,
-        "source": source,
-        "source_category": category,
-        "summary": summary,
-        "published_at": published,
-    }
+def shutdown_parse_pool():
+    """Stop the feed parsing worker processes"""
+    global _parse_pool
+    if _parse_pool is not None:
+        _parse_pool.shutdown(wait=False, cancel_futures=True)
+        _parse_pool = None
+
+
+async def parse_feed_off_loop(content: str, feed: Dict[str, Any], seen_keys: Collection[str]) -> Dict[str, Any]:
+    """
+    Run parse_feed_entries in the worker pool and await its result.
+    
+    Each feed's result is handed back to the loop as soon as its worker
+    finishes; the number in flight is bounded by the pool size and the
+    feed fetch semaphore.
+    """
+    pool = _get_parse_pool()
+    if pool is None:
+        return parse_feed_entries(content, feed, seen_keys)
+    
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(pool, parse_feed_entries, content, feed, frozenset(seen_keys))
+    except BrokenProcessPool as e:
+        print(f"[INGEST] Parse pool broken, restarting it: {e}")
+        shutdown_parse_pool()
+        return await asyncio.to_thread(parse_feed_entries, content, feed, seen_keys)
+
+
+async def _seen_entries_for(feed_url: str) -> set:
+    """Entry keys stored by the last successful poll, loaded from the DB once per process"""
+    seen = _SEEN_ENTRIES.get(feed_url)
+    if seen is None:
+        seen = set(await asyncio.to_thread(get_feed_seen_entries, feed_url))
+        _SEEN_ENTRIES[feed_url] = seen
+    return seen
 
 
 async def fetch_feed_with_backoff(
     session: aiohttp.ClientSession, 
     feed: Dict[str, Any],
     max_retries: int = 3
-) -> Tuple[Optional[feedparser.FeedParserDict], int, Optional[str]]:
+) -> Tuple[Optional[Dict[str, Any]], int, Optional[str]]:
     """
     Fetch a single RSS feed with exponential backoff and jitter.
     
+    Parsing is left to the caller (see parse_feed_off_loop).
+    
     Returns:
-        Tuple of (parsed_feed, latency_ms, error_message)
+        Tuple of (response, latency_ms, error_message); response holds
+        status (200 or 304), content, etag and modified
     """
     feed_url = feed["url"]
     feed_name = feed.get("name", "Unknown")
-    timeout = get_feed_timeout(feed_url) / 1000.0  # Convert to seconds
+    # Feed health lookups are sync psycopg2 calls; keep them off the event loop
+    timeout = await asyncio.to_thread(get_feed_timeout, feed_url) / 1000.0  # Convert to seconds
+    etag, last_modified = await asyncio.to_thread(get_feed_validators, feed_url)
+    
+    headers = {
+        'User-Agent': 'KhoborAgent/2.0 RSS Reader',
+        'Accept': 'application/rss+xml, application/xml, text/xml'
+    }
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
     
     for attempt in range(max_retries + 1):
         start_time = time.time()
@@ -96,22 +152,27 @@ async def fetch_feed_with_backoff(
             async with session.get(
                 feed_url,
                 timeout=aiohttp.ClientTimeout(total=timeout),
-                headers={
-                    'User-Agent': 'KhoborAgent/2.0 RSS Reader',
-                    'Accept': 'application/rss+xml, application/xml, text/xml'
-                }
+                headers=headers
             ) as response:
+                if response.status == 304:
+                    # Unchanged since last fetch: no body to download or parse
+                    latency_ms = int((time.time() - start_time) * 1000)
+                    return {
+                        'status': 304,
+                        'content': None,
+                        'etag': response.headers.get('ETag') or etag,
+                        'modified': response.headers.get('Last-Modified') or last_modified,
+                    }, latency_ms, None
+                
                 if response.status == 200:
                     content = await response.text()
                     latency_ms = int((time.time() - start_time) * 1000)
-                    
-                    # Parse RSS content
-                    parsed = feedparser.parse(content)
-                    if parsed.bozo and parsed.bozo_exception:
-                        # RSS parsing had issues but might still be usable
-                        print(f"[INGEST] RSS parsing warning for {feed_name}: {parsed.bozo_exception}")
-                    
-                    return parsed, latency_ms, None
+                    return {
+                        'status': 200,
+                        'content': content,
+                        'etag': response.headers.get('ETag'),
+                        'modified': response.headers.get('Last-Modified'),
+                    }, latency_ms, None
                 else:
                     error_message = f"HTTP {response.status}: {response.reason}"
                     
@@ -138,82 +199,125 @@ async def fetch_feed_with_backoff(
 async def fetch_single_feed(
     session: aiohttp.ClientSession, 
     feed: Dict[str, Any]
-) -> Tuple[List[Tuple[str, str]], int]:
+) -> FeedPollResult:
     """
     Fetch and process a single feed.
     
+    New or changed articles are upserted and queued for the embedding
+    workers in the same transaction.
+    
     Returns:
-        Tuple of (articles_to_embed, articles_count)
+        FeedPollResult: articles stored, queued for embedding, and stored
+        with text whose embedding is already current
     """
     feed_url = feed["url"]
     feed_name = feed.get("name", "Unknown")
     
     # Fetch with backoff
-    parsed, latency_ms, error_message = await fetch_feed_with_backoff(session, feed)
+    fetched, latency_ms, error_message = await fetch_feed_with_backoff(session, feed)
     
-    articles_to_embed = []
-    articles_count = 0
+    articles_count = queued = unchanged = 0
     
-    if parsed is None:
+    if fetched is None:
         # Record failed attempt
-        record_feed_attempt(feed_url, feed_name, False, latency_ms, error_message, 0)
+        feed_schedule.observe(feed_url, 0, success=False)
+        await asyncio.to_thread(record_feed_attempt, feed_url, feed_name, False, latency_ms, error_message, 0,
+                                schedule=feed_schedule.state_for(feed_url))
         print(f"[INGEST] Failed to fetch {feed_name}: {error_message}")
-        return articles_to_embed, 0
+        return FeedPollResult(0, 0, 0)
+    
+    etag, last_modified = fetched.get('etag'), fetched.get('modified')
+    
+    if fetched.get('status') == 304:
+        feed_schedule.observe(feed_url, 0)
+        await asyncio.to_thread(record_feed_attempt, feed_url, feed_name, True, latency_ms, None, 0, etag, last_modified,
+                                schedule=feed_schedule.state_for(feed_url))
+        print(f"[INGEST] ✓ {feed_name}: not modified in {latency_ms}ms")
+        return FeedPollResult(0, 0, 0)
     
     # Process entries
     try:
-        for entry in parsed.entries[:50]:  # Limit to 50 most recent
-            try:
-                article = _normalize_entry(entry, feed)
-                article_id = upsert_article(article)
-                
-                text_for_store = f"{article['title']} {article['summary'][:400]}".strip()
-                if text_for_store:
-                    articles_to_embed.append((str(article_id), text_for_store))
-                    articles_count += 1
-                    
-            except Exception as e:
-                print(f"[INGEST] Error processing entry from {feed_name}: {e}")
-                continue
+        # Parse, skip seen entries and normalize off the event loop
+        result = await parse_feed_off_loop(fetched['content'], feed, await _seen_entries_for(feed_url))
+        if result['bozo']:
+            # RSS parsing had issues but might still be usable
+            print(f"[INGEST] RSS parsing warning for {feed_name}: {result['bozo']}")
+        for error in result['errors']:
+            print(f"[INGEST] Error processing entry from {feed_name}: {error}")
+        
+        entry_keys = result['entry_keys']
+        articles = result['articles']
+        
+        # One multi-row upsert (one transaction) per feed, outbox rows included
+        if articles:
+            article_ids, queued, unchanged = await asyncio.to_thread(upsert_articles_bulk, articles, enqueue_embeddings=True)
+            articles_count = sum(1 for article_id in article_ids if article_id is not None)
+        if queued:
+            embedding_workers.notify()
+        _SEEN_ENTRIES[feed_url] = set(entry_keys)
         
         # Record successful attempt
-        record_feed_attempt(feed_url, feed_name, True, latency_ms, None, articles_count)
-        print(f"[INGEST] ✓ {feed_name}: {articles_count} articles in {latency_ms}ms")
+        feed_schedule.observe(feed_url, articles_count)
+        await asyncio.to_thread(record_feed_attempt, feed_url, feed_name, True, latency_ms, None, articles_count,
+                                etag, last_modified, schedule=feed_schedule.state_for(feed_url),
+                                seen_entries=entry_keys)
+        print(f"[INGEST] ✓ {feed_name}: {articles_count} articles stored ({queued} queued for embedding, "
+              f"{unchanged} with unchanged text), {len(entry_keys) - len(articles)} already seen, in {latency_ms}ms")
         
     except Exception as e:
         # Record failed attempt if processing failed
-        record_feed_attempt(feed_url, feed_name, False, latency_ms, f"Processing error: {str(e)}", 0)
+        feed_schedule.observe(feed_url, 0, success=False)
+        await asyncio.to_thread(record_feed_attempt, feed_url, feed_name, False, latency_ms,
+                                f"Processing error: {str(e)}", 0, schedule=feed_schedule.state_for(feed_url))
         print(f"[INGEST] Processing failed for {feed_name}: {e}")
     
-    return articles_to_embed, articles_count
+    return FeedPollResult(articles_count, queued, unchanged)
 
 
-async def enhanced_ingest_cycle() -> Tuple[int, int]:
+async def enhanced_ingest_cycle(feed_urls: Optional[Collection[str]] = None) -> Tuple[int, int]:
     """
     Enhanced concurrent ingestion with health monitoring and backoff.
     
+    Cycles in one process never overlap (scheduled polls and requested full
+    runs queue behind each other).
+    
+    Args:
+        feed_urls: Only poll these feeds (adaptive scheduler); None polls all
+    
     Returns:
-        Tuple of (feeds_attempted, articles_embedded)
+        Tuple of (feeds_attempted, articles_queued_for_embedding)
     """
+    async with _CYCLE_LOCK:
+        return await _ingest_cycle(feed_urls)
+
+
+async def _ingest_cycle(feed_urls: Optional[Collection[str]]) -> Tuple[int, int]:
     start_time = time.time()
     
-    # Initialize health monitoring if needed
-    try:
-        init_feed_health_db()
-    except Exception as e:
-        print(f"[INGEST] Warning: Could not initialize feed health DB: {e}")
-    
-    # Disable unhealthy feeds automatically
-    try:
-        disabled_feeds = disable_unhealthy_feeds()
-        if disabled_feeds:
-            print(f"[INGEST] Auto-disabled {len(disabled_feeds)} unhealthy feeds")
-    except Exception as e:
-        print(f"[INGEST] Warning: Could not check feed health: {e}")
+    if feed_urls is None:
+        # Initialize health monitoring if needed
+        try:
+            await asyncio.to_thread(init_feed_health_db)
+        except Exception as e:
+            print(f"[INGEST] Warning: Could not initialize feed health DB: {e}")
+        
+        # Disable unhealthy feeds automatically
+        try:
+            disabled_feeds = await asyncio.to_thread(disable_unhealthy_feeds)
+            if disabled_feeds:
+                print(f"[INGEST] Auto-disabled {len(disabled_feeds)} unhealthy feeds")
+        except Exception as e:
+            print(f"[INGEST] Warning: Could not check feed health: {e}")
     
     # Load all feeds and filter by health
     all_feeds = _load_feeds()
-    healthy_feed_urls = {f['feed_url'] for f in get_healthy_feeds()} if get_healthy_feeds else set()
+    if feed_urls is not None:
+        all_feeds = [f for f in all_feeds if f['url'] in feed_urls]
+    try:
+        healthy_feed_urls = {f['feed_url'] for f in await asyncio.to_thread(get_healthy_feeds)}
+    except Exception as e:
+        print(f"[INGEST] Warning: Could not load feed health: {e}")
+        healthy_feed_urls = set()
     
     # Use healthy feeds if available, otherwise fall back to all feeds
     if healthy_feed_urls:
@@ -223,8 +327,6 @@ async def enhanced_ingest_cycle() -> Tuple[int, int]:
         feeds_to_process = all_feeds
         print(f"[INGEST] Processing all {len(feeds_to_process)} feeds (health data unavailable)")
     
-    to_embed: List[Tuple[str, str]] = []  # (article_id, text)
-    
     # Create session with connection pooling
     connector = aiohttp.TCPConnector(
         limit=20,  # Total connection pool size
@@ -242,7 +344,7 @@ async def enhanced_ingest_cycle() -> Tuple[int, int]:
     ) as session:
         
         # Create semaphore to limit concurrent requests
-        semaphore = asyncio.Semaphore(10)  # Max 10 concurrent feed fetches
+        semaphore = asyncio.Semaphore(FEED_FETCH_CONCURRENCY)
         
         async def bounded_fetch(feed):
             async with semaphore:
@@ -253,48 +355,22 @@ async def enhanced_ingest_cycle() -> Tuple[int, int]:
         results = await asyncio.gather(*tasks, return_exceptions=True)
         
         # Collect results
-        total_articles = 0
+        total_stored = total_queued = total_unchanged = 0
         for i, result in enumerate(results):
             if isinstance(result, Exception):
                 feed_name = feeds_to_process[i].get('name', 'Unknown')
                 print(f"[INGEST] Task failed for {feed_name}: {result}")
                 continue
-            
-            articles_to_embed, articles_count = result
-            to_embed.extend(articles_to_embed)
-            total_articles += articles_count
-    
-    # Deduplicate by article_id, keep the longest text
-    dedup: Dict[str, str] = {}
-    for aid, text in to_embed:
-        if (aid not in dedup) or (len(text) > len(dedup[aid])):
-            dedup[aid] = text
-
-    ids = list(dedup.keys())
-    texts = [dedup[aid] for aid in ids]
-    
-    # Batch embed with error handling
-    embedded_count = 0
-    if texts:
-        try:
-            print(f"[INGEST] Embedding {len(texts)} articles...")
-            vectors = await embed_store(texts)
-            
-            for aid, vec in zip(ids, vectors):
-                try:
-                    upsert_embedding(uuid.UUID(aid), vec)
-                    embedded_count += 1
-                except Exception as e:
-                    print(f"[INGEST] Error storing embedding for {aid}: {e}")
-                    
-        except Exception as e:
-            print(f"[INGEST] Embedding batch failed: {e}")
+            total_stored += result.stored
+            total_queued += result.queued
+            total_unchanged += result.unchanged
     
+    # Embedding happens in the outbox workers (services/ingest/embedding_worker.py)
     total_time = time.time() - start_time
-    print(f"[INGEST] Cycle complete: {len(feeds_to_process)} feeds, {total_articles} articles, "
-          f"{embedded_count} embedded in {total_time:.1f}s")
+    print(f"[INGEST] Cycle complete: {len(feeds_to_process)} feeds, {total_stored} articles stored "
+          f"({total_queued} queued for embedding, {total_unchanged} with unchanged text) in {total_time:.1f}s")
     
-    return len(feeds_to_process), embedded_count
+    return len(feeds_to_process), total_queued
 
 
 # Scheduler instance
@@ -304,12 +380,24 @@ _scheduler: Optional[AsyncIOScheduler] = None
 async def _scheduled_enhanced_ingest():
     """Wrapper function for scheduled enhanced ingest"""
     try:
-        feeds_count, embedded_count = await enhanced_ingest_cycle()
-        print(f"[SCHEDULER] Enhanced ingest completed: {feeds_count} feeds, {embedded_count} articles embedded")
+        feeds_count, queued_count = await enhanced_ingest_cycle()
+        print(f"[SCHEDULER] Enhanced ingest completed: {feeds_count} feeds, {queued_count} articles queued for embedding")
     except Exception as e:
         print(f"[SCHEDULER] Enhanced ingest failed: {e}")
 
 
+async def _scheduled_adaptive_poll():
+    """Poll only the feeds whose adaptive next-poll time has passed"""
+    try:
+        due = feed_schedule.due([f["url"] for f in _load_feeds()])
+        if not due:
+            return
+        feeds_count, queued_count = await enhanced_ingest_cycle(feed_urls=set(due))
+        print(f"[SCHEDULER] Adaptive poll completed: {feeds_count} due feeds, {queued_count} articles queued for embedding")
+    except Exception as e:
+        print(f"[SCHEDULER] Adaptive poll failed: {e}")
+
+
 def start_enhanced_scheduler():
     """Start the enhanced ingestion scheduler"""
     global _scheduler
@@ -318,13 +406,19 @@ def start_enhanced_scheduler():
         print("[SCHEDULER] Enhanced scheduler already running")
         return
     
+    try:
+        init_feed_health_db()
+        feed_schedule.seed(get_feed_publish_rates())
+    except Exception as e:
+        print(f"[SCHEDULER] Warning: Could not seed feed publish rates: {e}")
+    
     _scheduler = AsyncIOScheduler()
     
-    # Schedule enhanced ingest every 5 minutes
+    # Check every tick for feeds that are due; each feed has its own interval
     _scheduler.add_job(
-        _scheduled_enhanced_ingest,
+        _scheduled_adaptive_poll,
         trigger="interval",
-        minutes=5,
+        seconds=POLL_TICK_SECONDS,
         id="enhanced_ingest_cycle",
         replace_existing=True,
         max_instances=1  # Prevent overlapping runs
@@ -340,7 +434,7 @@ def start_enhanced_scheduler():
     )
     
     _scheduler.start()
-    print("[SCHEDULER] Enhanced ingestion scheduler started (5min intervals)")
+    print(f"[SCHEDULER] Adaptive ingestion scheduler started ({POLL_TICK_SECONDS}s ticks)")
 
 
 def stop_enhanced_scheduler():
@@ -351,6 +445,8 @@ def stop_enhanced_scheduler():
         _scheduler.shutdown()
         _scheduler = None
         print("[SCHEDULER] Enhanced ingestion scheduler stopped")
+    
+    shutdown_parse_pool()
 
 
 # Backward compatibility functions
@@ -0,0 +1,92 @@
+"""
+CPU-bound feed parsing, run in worker processes.
+
+Kept free of DB, HTTP and NLP imports so spawned workers start quickly.
+parse_feed_entries does everything between "response body" and "article
+dicts" (feedparser.parse, seen-set filtering, _normalize_entry) and returns
+plain picklable data.
+"""
+from datetime import datetime, timezone
+from typing import Any, Collection, Dict, List, Optional
+
+import feedparser
+
+from packages.util.normalize import truncate_text
+
+MAX_ENTRIES_PER_FEED = 50
+
+
+def _normalize_entry(entry: Dict[str, Any], feed_meta: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalize RSS entry to article format"""
+    title = entry.get("title") or entry.get("summary") or "Untitled"
+    link = entry.get("link") or entry.get("id") or ""
+    summary = truncate_text(entry.get("summary", ""), max_length=500)
+
+    # Parse published date
+    published = None
+    for key in ("published", "updated", "created"):
+        if entry.get(key + "_parsed"):
+            try:
+                published = datetime(*entry[key + "_parsed"][0:6], tzinfo=timezone.utc).isoformat()
+                break
+            except Exception:
+                pass
+        if entry.get(key):
+            try:
+                published = datetime.fromisoformat(str(entry[key]).replace("Z", "+00:00")).isoformat()
+                break
+            except Exception:
+                continue
+
+    source = feed_meta.get("name", "Unknown")
+    category = feed_meta.get("category", "general")
+
+    return {
+        "title": title.strip()[:512],
+        "url": link,
+        "source": source,
+        "source_category": category,
+        "summary": summary,
+        "published_at": published,
+    }
+
+
+def _entry_key(entry: Dict[str, Any]) -> str:
+    """Identity of an entry revision: GUID (or link) plus its updated/published stamp"""
+    guid = entry.get("id") or entry.get("guid") or entry.get("link") or ""
+    stamp = entry.get("updated") or entry.get("published") or ""
+    return f"{guid}|{stamp}"
+
+
+def parse_feed_entries(
+    content: str,
+    feed_meta: Dict[str, Any],
+    seen_keys: Optional[Collection[str]] = None,
+    limit: int = MAX_ENTRIES_PER_FEED,
+) -> Dict[str, Any]:
+    """
+    Parse a feed body and normalize entries not already in `seen_keys`.
+    
+    Returns:
+        Dict with entry_keys (all current entries), articles (new or changed
+        entries, normalized), errors (per-entry failures) and bozo (parser warning)
+    """
+    parsed = feedparser.parse(content)
+    bozo = str(parsed.bozo_exception) if parsed.bozo and parsed.get("bozo_exception") else None
+    
+    seen_keys = seen_keys or ()
+    entries = parsed.entries[:limit]  # Most recent first
+    entry_keys: List[str] = []
+    articles: List[Dict[str, Any]] = []
+    errors: List[str] = []
+    for entry in entries:
+        key = _entry_key(entry)
+        entry_keys.append(key)
+        if key in seen_keys:
+            continue  # Stored in an earlier cycle and unchanged since
+        try:
+            articles.append(_normalize_entry(entry, feed_meta))
+        except Exception as e:
+            errors.append(str(e))
+    
+    return {"entry_keys": entry_keys, "articles": articles, "errors": errors, "bozo": bozo}
@@ -0,0 +1,125 @@
+"""
+Adaptive per-feed polling schedule.
+
+Each feed's publish rate (new items per hour) is tracked as an EWMA of what
+each poll actually found, seeded from feed_health_history. The poll interval
+is chosen so a poll is expected to find about TARGET_ITEMS_PER_POLL new items,
+clamped between MIN_INTERVAL_S and MAX_INTERVAL_S, with jitter so feeds do not
+synchronize. Failed polls back off exponentially.
+"""
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+MIN_INTERVAL_S = int(os.getenv("FEED_POLL_MIN_INTERVAL_S", "120"))
+MAX_INTERVAL_S = int(os.getenv("FEED_POLL_MAX_INTERVAL_S", "3600"))
+DEFAULT_INTERVAL_S = 300  # Matches the old fixed 5-minute cycle
+TARGET_ITEMS_PER_POLL = float(os.getenv("FEED_POLL_TARGET_ITEMS", "2"))
+RATE_ALPHA = 0.3  # EWMA weight of the newest observation
+JITTER_FRACTION = 0.1
+
+
+class FeedSchedule:
+    """Learned publish rate and next poll time for every feed."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state: Dict[str, Dict[str, Any]] = {}
+
+    def _entry(self, feed_url: str) -> Dict[str, Any]:
+        state = self._state.get(feed_url)
+        if state is None:
+            state = {
+                "rate_per_hour": None,
+                "interval_s": DEFAULT_INTERVAL_S,
+                "next_poll_at": 0.0,  # Due immediately
+                "last_poll_at": None,
+                "last_new_items": None,
+                "consecutive_failures": 0,
+            }
+            self._state[feed_url] = state
+        return state
+
+    @staticmethod
+    def interval_for_rate(rate_per_hour: Optional[float]) -> float:
+        """Seconds between polls for a publish rate, clamped to the allowed range."""
+        if rate_per_hour is None:
+            return float(DEFAULT_INTERVAL_S)
+        if rate_per_hour <= 0:
+            return float(MAX_INTERVAL_S)
+        interval = TARGET_ITEMS_PER_POLL / rate_per_hour * 3600.0
+        return float(min(MAX_INTERVAL_S, max(MIN_INTERVAL_S, interval)))
+
+    @staticmethod
+    def _jittered(interval_s: float) -> float:
+        return interval_s * (1.0 + random.uniform(-JITTER_FRACTION, JITTER_FRACTION))
+
+    def seed(self, rates: Dict[str, float]) -> None:
+        """Initialize rates from history (feed_url -> items/hour) for unseen feeds."""
+        with self._lock:
+            for feed_url, rate in rates.items():
+                state = self._entry(feed_url)
+                if state["rate_per_hour"] is None:
+                    state["rate_per_hour"] = float(rate)
+                    state["interval_s"] = self.interval_for_rate(rate)
+
+    def observe(self, feed_url: str, new_items: int, success: bool = True, now: Optional[float] = None) -> None:
+        """Fold one poll's outcome into the feed's rate and schedule its next poll."""
+        now = time.time() if now is None else now
+        with self._lock:
+            state = self._entry(feed_url)
+            if not success:
+                state["consecutive_failures"] += 1
+                backoff = state["interval_s"] * (2 ** min(state["consecutive_failures"], 4))
+                state["next_poll_at"] = now + self._jittered(min(MAX_INTERVAL_S, backoff))
+                return
+
+            last = state["last_poll_at"]
+            if last is not None and now > last:
+                observed = new_items / ((now - last) / 3600.0)
+                prev = state["rate_per_hour"]
+                state["rate_per_hour"] = observed if prev is None else RATE_ALPHA * observed + (1 - RATE_ALPHA) * prev
+
+            state["interval_s"] = self.interval_for_rate(state["rate_per_hour"])
+            state["next_poll_at"] = now + self._jittered(state["interval_s"])
+            state["last_poll_at"] = now
+            state["last_new_items"] = int(new_items)
+            state["consecutive_failures"] = 0
+
+    def due(self, feed_urls: List[str], now: Optional[float] = None) -> List[str]:
+        """Feeds whose next poll time has passed, most overdue first."""
+        now = time.time() if now is None else now
+        with self._lock:
+            due = [(self._entry(url)["next_poll_at"], url) for url in feed_urls]
+        return [url for next_at, url in sorted(due) if next_at <= now]
+
+    @staticmethod
+    def _public(state: Dict[str, Any]) -> Dict[str, Any]:
+        def _iso(ts):
+            return datetime.fromtimestamp(ts, tz=timezone.utc).isoformat() if ts else None
+
+        return {
+            "rate_per_hour": round(state["rate_per_hour"], 3) if state["rate_per_hour"] is not None else None,
+            "interval_s": round(state["interval_s"], 1),
+            "next_poll_at": _iso(state["next_poll_at"]),
+            "last_poll_at": _iso(state["last_poll_at"]),
+            "last_new_items": state["last_new_items"],
+            "consecutive_failures": state["consecutive_failures"],
+        }
+
+    def state_for(self, feed_url: str) -> Dict[str, Any]:
+        """One feed's rate and schedule, as stored in feed_health.schedule."""
+        with self._lock:
+            return self._public(self._entry(feed_url))
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Per-feed rate and schedule, with timestamps as ISO strings."""
+        with self._lock:
+            return {url: self._public(s) for url, s in self._state.items()}
+
+
+# Process-wide schedule used by the enhanced scheduler
+feed_schedule = FeedSchedule()
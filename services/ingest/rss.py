@@ -15,8 +15,8 @@ import re
 # Add packages to path
 sys.path.append(str(Path(__file__).parent.parent.parent))
 from packages.util.normalize import normalize_text, clean_title, extract_domain, truncate_text, clean_text, fingerprint
-from packages.db.repo import upsert_article, fetch_recent_candidates, upsert_embedding, init_db
-from packages.nlp.embed import embed_text
+from packages.db.repo import upsert_article, fetch_recent_candidates, init_db
+from packages.nlp.article_features import article_features
 
 class Feed(BaseModel):
     name: str
@@ -276,23 +276,9 @@ def gather_candidates(query: str = "", window_hours: int = 72, max_items: int =
                             "summary": article.summary,
                             "published_at": article.published_at
                         }
-                        article_id = upsert_article(db_article)
+                        # Embedded later by the outbox workers (services/ingest/embedding_worker.py)
+                        upsert_article(db_article, enqueue_embedding=True)
                         inserted_to_db += 1
-                        
-                        # Generate embedding for new articles
-                        content_for_embedding = ""
-                        if article.title:
-                            content_for_embedding += article.title
-                        if article.summary:
-                            content_for_embedding += " " + article.summary
-                        
-                        if content_for_embedding.strip():
-                            try:
-                                embedding = embed_text(content_for_embedding.strip())
-                                if embedding and len(embedding) == 1536:
-                                    upsert_embedding(article_id, embedding)
-                            except Exception as e:
-                                print(f"Warning: Failed to generate embedding for {article.url}: {e}")
                     
                     except Exception as e:
                         print(f"Warning: Failed to save article to database {article.url}: {e}")
@@ -361,7 +347,7 @@ def load_from_cache() -> List[Article]:
                             published_at=db_article.published_at.isoformat() if db_article.published_at else None,
                             summary=db_article.summary or "",
                             domain=extract_domain(db_article.url),
-                            fp_title=fingerprint(db_article.title)
+                            fp_title=article_features(db_article)["fp"]
                         )
                         articles.append(article)
                     except Exception as e:
@@ -0,0 +1,172 @@
+"""
+Dedicated ingest worker.
+
+    python -m services.ingest.worker
+
+Any number of instances may run. A Postgres session-level advisory lock elects
+one leader, which runs the adaptive feed scheduler and executes ingest runs
+requested through the API (/admin/ingest/run). Followers retry the lock and
+take over when the leader's connection goes away.
+
+Every instance, leader or not, also runs a pool of embedding workers that
+drains the embedding_jobs outbox filled by ingest.
+"""
+import asyncio
+import os
+import signal
+import socket
+import sys
+import uuid
+from pathlib import Path
+from typing import Optional
+
+import psycopg2
+
+# Add packages to path
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from packages.db.repo import get_db_config, init_db
+from packages.db.feed_health import init_feed_health_db
+from packages.db.ingest_runs import (
+    INGEST_LEADER_LOCK_KEY, init_ingest_runs_db, claim_next_run, finish_run,
+    fail_orphaned_runs, record_leader_heartbeat,
+)
+from packages.nlp.embed import embedding_http
+from services.ingest.enhanced_scheduler import (
+    FEED_FETCH_CONCURRENCY, enhanced_ingest_cycle, start_enhanced_scheduler, stop_enhanced_scheduler,
+)
+from services.ingest.embedding_worker import embedding_workers
+
+LEADER_RETRY_SECONDS = int(os.getenv("INGEST_LEADER_RETRY_S", "15"))
+RUN_POLL_SECONDS = int(os.getenv("INGEST_RUN_POLL_S", "5"))
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+class LeaderLock:
+    """Session-level pg advisory lock held on a dedicated connection."""
+
+    def __init__(self, key: int = INGEST_LEADER_LOCK_KEY):
+        self.key = key
+        self._conn = None
+
+    def try_acquire(self) -> bool:
+        conn = psycopg2.connect(**get_db_config())
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute("SELECT pg_try_advisory_lock(%s)", (self.key,))
+            acquired = bool(cur.fetchone()[0])
+        if acquired:
+            self._conn = conn
+        else:
+            conn.close()
+        return acquired
+
+    def still_held(self) -> bool:
+        """False once the lock connection is gone (the lock went with it)."""
+        if self._conn is None:
+            return False
+        try:
+            with self._conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            return True
+        except Exception:
+            self.release()
+            return False
+
+    def release(self):
+        if self._conn is not None:
+            try:
+                self._conn.close()  # Closing the session releases the lock
+            except Exception:
+                pass
+            self._conn = None
+
+
+async def _sleep_or_stop(stop: asyncio.Event, seconds: float) -> None:
+    try:
+        await asyncio.wait_for(stop.wait(), timeout=seconds)
+    except asyncio.TimeoutError:
+        pass
+
+
+async def _lead(lock: LeaderLock, stop: asyncio.Event) -> None:
+    """Leader duties until the lock is lost or the worker is stopped."""
+    while not stop.is_set():
+        if not await asyncio.to_thread(lock.still_held):
+            print(f"[WORKER] {WORKER_ID} lost ingest leadership")
+            return
+
+        await asyncio.to_thread(record_leader_heartbeat, WORKER_ID, False, FEED_FETCH_CONCURRENCY)
+
+        run = await asyncio.to_thread(claim_next_run, WORKER_ID)
+        if run:
+            print(f"[WORKER] Running requested ingest {run['id']} (by {run.get('requested_by')})")
+            try:
+                feeds_ct, queued_ct = await enhanced_ingest_cycle()
+                await asyncio.to_thread(finish_run, run["id"], feeds_ct, queued_ct)
+            except Exception as e:
+                print(f"[WORKER] Requested ingest {run['id']} failed: {e}")
+                await asyncio.to_thread(finish_run, run["id"], 0, 0, str(e))
+            continue
+
+        await _sleep_or_stop(stop, RUN_POLL_SECONDS)
+
+
+async def run_worker(stop: Optional[asyncio.Event] = None) -> None:
+    """Elect a leader among ingest instances and run ingestion on it."""
+    stop = stop or asyncio.Event()
+
+    for init in (init_db, init_feed_health_db, init_ingest_runs_db):
+        try:
+            await asyncio.to_thread(init)
+        except Exception as e:
+            print(f"[WORKER] Warning: {init.__name__} failed: {e}")
+
+    embedders = asyncio.create_task(embedding_workers.run(stop))
+
+    lock = LeaderLock()
+    print(f"[WORKER] {WORKER_ID} started; waiting for ingest leadership")
+    while not stop.is_set():
+        try:
+            acquired = await asyncio.to_thread(lock.try_acquire)
+        except Exception as e:
+            print(f"[WORKER] Leader election failed: {e}")
+            acquired = False
+
+        if not acquired:
+            await _sleep_or_stop(stop, LEADER_RETRY_SECONDS)
+            continue
+
+        print(f"[WORKER] {WORKER_ID} is the ingest leader")
+        try:
+            await asyncio.to_thread(record_leader_heartbeat, WORKER_ID, True, FEED_FETCH_CONCURRENCY)
+            await asyncio.to_thread(fail_orphaned_runs, WORKER_ID)
+            start_enhanced_scheduler()
+            await _lead(lock, stop)
+        except Exception as e:
+            print(f"[WORKER] Leader loop error: {e}")
+        finally:
+            stop_enhanced_scheduler()
+            lock.release()
+
+    await embedders
+    print(f"[WORKER] {WORKER_ID} stopped")
+
+
+def main():
+    async def _main():
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+        try:
+            await run_worker(stop)
+        finally:
+            await embedding_http.aclose()
+
+    asyncio.run(_main())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Tests for per-article text features stored at ingest
+"""
+import sys
+import unittest
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add packages to path
+sys.path.append(str(Path(__file__).parent.parent))
+from packages.nlp.article_features import (
+    FEATURES_VERSION, article_features, article_language, calculate_text_richness,
+    compute_article_features, detect_content_angle, detect_language,
+)
+from packages.util.normalize import fingerprint
+
+
+class TestArticleFeatures(unittest.TestCase):
+
+    def setUp(self):
+        self.article = SimpleNamespace(
+            title="Flood situation in Sylhet",
+            summary="Reuters report: rivers rising in Sylhet districts",
+            source="Reuters",
+            published_at=datetime(2026, 10, 14, 6, 0, tzinfo=timezone.utc),
+        )
+
+    def test_features_match_the_per_request_functions(self):
+        a = self.article
+        features = compute_article_features(a.title, a.summary, a.source, a.published_at)
+        content = f"{a.title} {a.summary}"
+        self.assertEqual(features["v"], FEATURES_VERSION)
+        self.assertEqual(features["lang"], detect_language(content)["language"])
+        self.assertAlmostEqual(features["richness"], calculate_text_richness(content))
+        self.assertEqual(features["angle"], detect_content_angle(a))
+        self.assertEqual(features["fp"], fingerprint(a.title))
+        self.assertAlmostEqual(features["pub_h"], a.published_at.timestamp() / 3600.0, places=3)
+        self.assertIn("flood", features["tokens"])
+        self.assertIn("district", features["tokens"])
+
+    def test_undated_articles_have_no_published_hours(self):
+        self.assertIsNone(compute_article_features("শিরোনাম", "", published_at=None)["pub_h"])
+        self.assertEqual(compute_article_features("শিরোনাম", "")["lang"], "bn")
+
+    def test_stored_features_are_used(self):
+        stored = dict(compute_article_features("x", "y"), angle="stored")
+        self.article.features = stored
+        self.assertIs(article_features(self.article), stored)
+
+    def test_missing_or_stale_features_are_computed_and_memoized(self):
+        self.article.features = {"v": FEATURES_VERSION - 1, "angle": "stale"}
+        features = article_features(self.article)
+        self.assertEqual(features["angle"], "wire")
+        self.assertIs(self.article.features, features)
+        self.assertEqual(article_language(self.article)["language"], "en")
+
+
+if __name__ == "__main__":
+    unittest.main()
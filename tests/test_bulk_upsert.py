@@ -0,0 +1,94 @@
+"""
+Tests for the multi-row article upsert used by ingestion
+"""
+import sys
+import unittest
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from unittest.mock import patch
+
+# Add packages to path
+sys.path.append(str(Path(__file__).parent.parent))
+from packages.db import repo
+
+
+class _Statement:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def returning(self, *columns):
+        return self
+
+
+class FakeSession:
+    """Executes fake upsert statements: one transaction, one call per chunk"""
+
+    def __init__(self):
+        self.statements = []
+        self.ids = {}
+
+    def execute(self, stmt):
+        self.statements.append([row["url"] for row in stmt.rows])
+        return [(row["url"], self.ids.setdefault(row["url"], uuid.uuid4())) for row in stmt.rows]
+
+
+class TestBulkUpsert(unittest.TestCase):
+
+    def setUp(self):
+        self.session = FakeSession()
+        self.transactions = 0
+        self.enqueued = []
+
+        @contextmanager
+        def fake_scope():
+            self.transactions += 1
+            yield self.session
+
+        def fake_enqueue(session, rows):
+            self.enqueued.append(rows)
+            return 1
+
+        patches = [
+            patch.object(repo, "session_scope", fake_scope),
+            patch.object(repo, "_article_upsert_stmt", _Statement),
+            patch.object(repo, "_enqueue_embedding_jobs", fake_enqueue),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _article(self, n, **extra):
+        return dict({"url": f"http://x/{n}", "title": f"t{n}", "summary": "", "source": "s"}, **extra)
+
+    def test_ids_align_with_input_and_duplicates_share_a_row(self):
+        articles = [self._article(1), self._article(2), self._article(1, title="t1 edited")]
+        result = repo.upsert_articles_bulk(articles)
+
+        self.assertEqual(self.transactions, 1)
+        self.assertEqual(self.session.statements, [["http://x/1", "http://x/2"]])
+        self.assertEqual(result.ids[0], result.ids[2])
+        self.assertEqual(result.ids[:2], [self.session.ids["http://x/1"], self.session.ids["http://x/2"]])
+        self.assertEqual((result.queued, result.unchanged), (0, 0))
+
+    def test_malformed_articles_get_none(self):
+        result = repo.upsert_articles_bulk([self._article(1), {"title": "no url"}])
+        self.assertIsNotNone(result.ids[0])
+        self.assertIsNone(result.ids[1])
+
+    def test_large_batches_are_chunked_in_one_transaction(self):
+        with patch.object(repo, "BULK_ARTICLE_CHUNK", 2):
+            result = repo.upsert_articles_bulk([self._article(n) for n in range(5)])
+        self.assertEqual([len(chunk) for chunk in self.session.statements], [2, 2, 1])
+        self.assertEqual(self.transactions, 1)
+        self.assertNotIn(None, result.ids)
+
+    def test_outbox_rows_are_written_in_the_same_transaction(self):
+        result = repo.upsert_articles_bulk([self._article(1), self._article(2)], enqueue_embeddings=True)
+        self.assertEqual(self.transactions, 1)
+        self.assertEqual([article_id for article_id, _ in self.enqueued[0]], result.ids)
+        self.assertEqual((result.queued, result.unchanged), (1, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
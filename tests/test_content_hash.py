@@ -0,0 +1,75 @@
+"""
+Tests for content-hash based skipping of unchanged articles
+"""
+import sys
+import unittest
+import uuid
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+# Add packages to path
+sys.path.append(str(Path(__file__).parent.parent))
+from packages.db import repo
+from packages.db.repo import article_embedding_text, embedding_content_hash
+
+
+class RecordingSession:
+    def __init__(self, rowcount):
+        self.rowcount = rowcount
+        self.calls = []
+
+    def execute(self, statement, params):
+        self.calls.append((str(statement), params))
+        return SimpleNamespace(rowcount=self.rowcount)
+
+
+class TestContentHash(unittest.TestCase):
+
+    def test_hash_follows_the_embedded_text(self):
+        text = article_embedding_text("Dhaka flood", "Water rising")
+        self.assertEqual(embedding_content_hash(text), embedding_content_hash(text))
+        self.assertNotEqual(embedding_content_hash(text),
+                            embedding_content_hash(article_embedding_text("Dhaka flood", "Water receding")))
+
+    def test_model_change_invalidates_every_hash(self):
+        text = article_embedding_text("Dhaka flood", "Water rising")
+        before = embedding_content_hash(text)
+        model, dimension, endpoint = repo.config.model_name, repo.config.dimension, repo.config.endpoint_id
+        for changed in ({"model_name": "another-model"}, {"dimension": dimension // 2},
+                        {"endpoint_id": "http://localhost:8100/v1/embeddings"}):
+            settings = dict({"model_name": model, "dimension": dimension, "endpoint_id": endpoint}, **changed)
+            with self.subTest(**changed), patch.object(repo, "config", SimpleNamespace(**settings)):
+                self.assertNotEqual(embedding_content_hash(text), before)
+
+
+class TestOutboxSkipsUnchanged(unittest.TestCase):
+
+    def test_only_rows_with_stale_hashes_are_queued(self):
+        session = RecordingSession(rowcount=1)
+        first, second = uuid.uuid4(), uuid.uuid4()
+        rows = [
+            (first, {"title": "Dhaka flood", "summary": "Water rising"}),
+            (None, {"title": "not stored", "summary": ""}),
+            (second, {"title": "Cricket", "summary": None}),
+        ]
+
+        self.assertEqual(repo._enqueue_embedding_jobs(session, rows), 1)
+
+        (sql, params), = session.calls
+        self.assertEqual(params["ids"], [first, second])
+        self.assertEqual(params["hashes"], [
+            embedding_content_hash(article_embedding_text("Dhaka flood", "Water rising")),
+            embedding_content_hash(article_embedding_text("Cricket", None)),
+        ])
+        # The comparison with the stored vector's hash happens in the insert itself
+        self.assertIn("av.content_hash IS DISTINCT FROM t.content_hash", sql)
+
+    def test_nothing_to_queue_skips_the_query(self):
+        session = RecordingSession(rowcount=0)
+        self.assertEqual(repo._enqueue_embedding_jobs(session, [(None, {"title": "x"})]), 0)
+        self.assertEqual(session.calls, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
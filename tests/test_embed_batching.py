@@ -0,0 +1,95 @@
+"""
+Tests for concurrent, token-packed embedding batches in embed_store
+"""
+import asyncio
+import random
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import httpx
+
+# Add packages to path
+sys.path.append(str(Path(__file__).parent.parent))
+from packages.nlp import embed
+
+
+class TestEmbedBatching(unittest.TestCase):
+
+    def setUp(self):
+        # Exercise the API path, not the embedding cache
+        patcher = patch.object(embed, "EMBED_CACHE_ENABLED", False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_pack_batches_respects_token_budget(self):
+        texts = ["a" * 400] * 10  # ~101 estimated tokens each
+        batches = embed._pack_batches(texts, max_items=100, max_tokens=250)
+        self.assertEqual([len(b) for b in batches], [2, 2, 2, 2, 2])
+        self.assertEqual(sum(batches, []), list(range(10)))
+
+    def test_bangla_weighs_more_than_ascii(self):
+        self.assertGreater(embed._estimate_tokens("বাংলা সংবাদ"), embed._estimate_tokens("bangla news"))
+
+    def test_concurrent_batches_keep_input_order(self):
+        async def fake_batch(texts, model, timeout=15.0):
+            await asyncio.sleep(random.uniform(0, 0.01))
+            return [[float(t)] for t in texts]
+
+        texts = [str(i) for i in range(50)]
+        with patch.object(embed, "_embed_batch", fake_batch):
+            vectors = asyncio.run(embed.embed_store(texts, batch_size=7))
+        self.assertEqual([v[0] for v in vectors], [float(i) for i in range(50)])
+
+    def test_batches_share_the_pooled_client_within_concurrency(self):
+        in_flight = {"now": 0, "max": 0}
+        posted = []
+
+        async def fake_post(url, json=None, **kwargs):
+            in_flight["now"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["now"])
+            await asyncio.sleep(0.005)
+            in_flight["now"] -= 1
+            posted.append(len(json["input"]))
+            request = httpx.Request("POST", url)
+            data = [{"embedding": [float(t)] * embed.EMBEDDING_DIM} for t in json["input"]]
+            return httpx.Response(200, json={"data": data}, request=request)
+
+        texts = [str(i) for i in range(40)]
+        with patch.object(embed.embedding_http, "post", fake_post), \
+                patch.object(embed, "EMBED_MAX_CONCURRENCY", 3):
+            vectors = asyncio.run(embed.embed_store(texts, batch_size=5))
+
+        self.assertEqual(sorted(posted), [5] * 8)
+        self.assertEqual(in_flight["max"], 3)
+        self.assertEqual([v[0] for v in vectors], [float(i) for i in range(40)])
+
+    def test_retries_on_429(self):
+        calls = {"n": 0}
+
+        async def flaky_batch(texts, model, timeout=15.0):
+            calls["n"] += 1
+            if calls["n"] == 1:
+                request = httpx.Request("POST", "https://api.example/embeddings")
+                response = httpx.Response(429, headers={"retry-after": "0"}, request=request)
+                raise httpx.HTTPStatusError("rate limited", request=request, response=response)
+            return [[1.0] for _ in texts]
+
+        with patch.object(embed, "_embed_batch", flaky_batch):
+            vectors = asyncio.run(embed.embed_store(["x", "y"]))
+        self.assertEqual(len(vectors), 2)
+        self.assertEqual(calls["n"], 2)
+
+    def test_client_errors_are_not_retried(self):
+        async def bad_batch(texts, model, timeout=15.0):
+            request = httpx.Request("POST", "https://api.example/embeddings")
+            raise httpx.HTTPStatusError("bad", request=request, response=httpx.Response(400, request=request))
+
+        with patch.object(embed, "_embed_batch", bad_batch):
+            with self.assertRaises(httpx.HTTPStatusError):
+                asyncio.run(embed.embed_store(["x"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+"""
+Tests for the two-tier embedding cache
+"""
+import asyncio
+import hashlib
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+
+# Add packages to path
+sys.path.append(str(Path(__file__).parent.parent))
+from packages.config import embedding as embedding_config
+from packages.config.embedding import config
+from packages.nlp import embed, embed_cache
+
+STANDIN_URL = "http://localhost:8100/v1/embeddings"
+
+
+def _vec(seed: float):
+    return [seed] * config.dimension
+
+
+class TestEmbeddingCache(unittest.TestCase):
+
+    def test_key_ignores_whitespace_but_not_model(self):
+        self.assertEqual(embed_cache.embedding_cache_key("latest  news "),
+                         embed_cache.embedding_cache_key("latest news"))
+        self.assertNotEqual(embed_cache.embedding_cache_key("latest news", "model-a", 3072),
+                            embed_cache.embedding_cache_key("latest news", "model-b", 3072))
+
+    def test_key_separates_standin_endpoint(self):
+        default = embed_cache.embedding_cache_key("latest news", "model-a", 3072, "")
+        # The default endpoint keeps the original key format (stored hashes stay valid)
+        self.assertEqual(default, hashlib.sha256("model-a\x1f3072\x1flatest news".encode("utf-8")).hexdigest())
+        self.assertNotEqual(embed_cache.embedding_cache_key("latest news", "model-a", 3072, STANDIN_URL), default)
+
+        with patch.object(embedding_config, "EMBED_BASE_URL_ENV", STANDIN_URL):
+            self.assertEqual(config.endpoint_id, STANDIN_URL)
+            self.assertNotEqual(embed_cache.embedding_cache_key("latest news", "model-a", 3072), default)
+
+    def test_standin_vectors_are_not_served_for_the_default_endpoint(self):
+        cache = embed_cache.EmbeddingCache(use_redis=False)
+
+        async def put_then_get():
+            with patch.object(embedding_config, "EMBED_BASE_URL_ENV", STANDIN_URL):
+                await cache.put_many(["x"], [_vec(1.0)])
+                cached = await cache.get_many(["x"])
+            return cached, await cache.get_many(["x"])
+
+        with patch.object(embedding_config, "EMBED_BASE_URL_ENV", embedding_config.DEFAULT_EMBED_BASE_URL):
+            standin, default = asyncio.run(put_then_get())
+        self.assertEqual(standin[0][0], 1.0)
+        self.assertEqual(default, [None])
+
+    def test_float16_bytes_roundtrip(self):
+        vec = np.linspace(-1, 1, config.dimension)
+        data = embed_cache.encode_vector(vec, "float16")
+        self.assertEqual(len(data), config.dimension * 2)
+        decoded = embed_cache.decode_vector(data, config.dimension, "float16")
+        self.assertTrue(np.allclose(decoded, vec, atol=1e-3))
+        self.assertIsNone(embed_cache.decode_vector(data, config.dimension, "float32"))
+
+    def test_lru_evicts_oldest(self):
+        cache = embed_cache.EmbeddingCache(memory_size=2, use_redis=False)
+
+        async def go():
+            await cache.put_many(["a", "b", "c"], [_vec(1.0), _vec(2.0), _vec(3.0)])
+            return await cache.get_many(["a", "b", "c"])
+
+        a, b, c = asyncio.run(go())
+        self.assertIsNone(a)
+        self.assertEqual(b[0], 2.0)
+        self.assertEqual(c[0], 3.0)
+        self.assertEqual(cache.stats["store"]["memory_hits"], 2)
+
+    def test_embed_store_only_sends_misses(self):
+        cache = embed_cache.EmbeddingCache(use_redis=False)
+        sent = []
+
+        async def fake_batch(texts, model, timeout=15.0):
+            sent.extend(texts)
+            return [_vec(float(len(t))) for t in texts]
+
+        async def go():
+            await embed.embed_store(["x", "yy"])
+            return await embed.embed_store(["x", "zzz", "yy"])
+
+        with patch.object(embed, "embedding_cache", cache), patch.object(embed, "_embed_batch", fake_batch):
+            vectors = asyncio.run(go())
+        self.assertEqual(sent, ["x", "yy", "zzz"])
+        self.assertEqual([v[0] for v in vectors], [1.0, 3.0, 2.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
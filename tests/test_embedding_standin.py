@@ -0,0 +1,52 @@
+"""
+Tests for the offline OpenAI-compatible embedding stand-in
+"""
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+# Add packages to path
+sys.path.append(str(Path(__file__).parent.parent))
+from services.embedding_standin import app as standin
+
+
+class TestEmbeddingStandin(unittest.TestCase):
+
+    def setUp(self):
+        self.client = TestClient(standin.app)
+
+    def test_vectors_are_deterministic_unit_vectors(self):
+        a = standin.standin_embedding("ঢাকায় বৃষ্টি", 3072)
+        b = standin.standin_embedding("ঢাকায়  বৃষ্টি", 3072)
+        self.assertTrue(np.array_equal(a, b))
+        self.assertAlmostEqual(float(np.linalg.norm(a)), 1.0, places=5)
+
+    def test_related_texts_are_closer(self):
+        query = standin.standin_embedding("cricket score today")
+        related = standin.standin_embedding("today's cricket match score")
+        unrelated = standin.standin_embedding("budget deficit and inflation")
+        self.assertGreater(float(query @ related), float(query @ unrelated))
+
+    def test_openai_response_shape(self):
+        resp = self.client.post("/v1/embeddings", json={"model": "text-embedding-3-small", "input": ["a", "b"]})
+        self.assertEqual(resp.status_code, 200)
+        body = resp.json()
+        self.assertEqual([item["index"] for item in body["data"]], [0, 1])
+        self.assertEqual(len(body["data"][0]["embedding"]), 1536)
+
+        short = self.client.post("/v1/embeddings", json={"input": "a", "dimensions": 256}).json()
+        self.assertEqual(len(short["data"][0]["embedding"]), 256)
+
+    def test_injected_rate_limit(self):
+        with patch.object(standin, "RATE_LIMIT_RATE", 1.0):
+            resp = self.client.post("/v1/embeddings", json={"input": "a"})
+        self.assertEqual(resp.status_code, 429)
+        self.assertIn("retry-after", resp.headers)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+"""
+Tests for the embedding outbox worker pool
+"""
+import asyncio
+import sys
+import unittest
+import uuid
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+# Add packages to path
+sys.path.append(str(Path(__file__).parent.parent))
+from services.ingest import embedding_worker
+
+
+def _job(text):
+    return {"article_id": uuid.uuid4(), "text": text, "content_hash": f"h:{text}",
+            "job_hash": f"h:{text}", "attempts": 1}
+
+
+class TestEmbeddingWorkerPool(unittest.TestCase):
+
+    def setUp(self):
+        self.completed, self.failed = [], []
+        patches = [
+            patch.object(embedding_worker, "complete_embedding_jobs",
+                         lambda results: self.completed.extend(results) or len(results)),
+            patch.object(embedding_worker, "fail_embedding_jobs",
+                         lambda ids, error: self.failed.append((list(ids), error))),
+            patch.object(embedding_worker, "config", SimpleNamespace(dimension=1)),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def test_batch_is_embedded_and_completed(self):
+        async def fake_embed(texts):
+            return [[float(len(t))] for t in texts]
+
+        pool = embedding_worker.EmbeddingWorkerPool(workers=1)
+        jobs = [_job("a"), _job("bb"), _job("")]
+        with patch.object(embedding_worker, "embed_store", fake_embed):
+            written = asyncio.run(pool.process(jobs))
+
+        self.assertEqual(written, 2)
+        self.assertEqual([(r[0], r[1]) for r in self.completed], [(jobs[0]["article_id"], [1.0]), (jobs[1]["article_id"], [2.0])])
+        # Jobs without text go back to the outbox as failures
+        self.assertEqual(self.failed[0][0], [jobs[2]["article_id"]])
+
+    def test_failed_batch_is_released_for_retry(self):
+        async def broken_embed(texts):
+            raise RuntimeError("API down")
+
+        pool = embedding_worker.EmbeddingWorkerPool(workers=1)
+        jobs = [_job("a"), _job("b")]
+        with patch.object(embedding_worker, "embed_store", broken_embed):
+            written = asyncio.run(pool.process(jobs))
+
+        self.assertEqual(written, 0)
+        self.assertEqual(self.completed, [])
+        self.assertEqual(self.failed, [([j["article_id"] for j in jobs], "API down")])
+        self.assertEqual(pool.stats["failed"], 2)
+
+    def test_wrong_dimension_vectors_fail_their_jobs(self):
+        async def short_embed(texts):
+            return [[1.0] if t != "bad" else [1.0, 2.0] for t in texts]
+
+        pool = embedding_worker.EmbeddingWorkerPool(workers=1)
+        jobs = [_job("a"), _job("bad")]
+        with patch.object(embedding_worker, "embed_store", short_embed):
+            written = asyncio.run(pool.process(jobs))
+
+        self.assertEqual(written, 1)
+        self.assertEqual([r[0] for r in self.completed], [jobs[0]["article_id"]])
+        # Released with backoff (and parked after max attempts) instead of staying leased
+        self.assertEqual(self.failed, [([jobs[1]["article_id"]], "embedding dimensions [2], expected 1")])
+        self.assertEqual(pool.stats["failed"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,189 @@
+"""
+Tests for single-feed ingestion (conditional GET, seen entries, outbox counts)
+"""
+import asyncio
+import sys
+import unittest
+import uuid
+from pathlib import Path
+from unittest.mock import patch
+
+# Add packages to path
+sys.path.append(str(Path(__file__).parent.parent))
+from packages.db.repo import ArticleUpsertResult
+from services.ingest import enhanced_scheduler
+from services.ingest.feed_schedule import FeedSchedule
+
+FEED = {"url": "http://feed", "name": "Feed", "category": "news"}
+
+RSS = """<?xml version="1.0"?>
+<rss version="2.0"><channel><title>Feed</title>
+<item><guid>a</guid><title>Alpha</title><link>http://feed/a</link><pubDate>Mon, 05 Oct 2026 10:00:00 GMT</pubDate></item>
+<item><guid>b</guid><title>Beta</title><link>http://feed/b</link><pubDate>Mon, 05 Oct 2026 11:00:00 GMT</pubDate></item>
+</channel></rss>"""
+
+KEY_A = "a|Mon, 05 Oct 2026 10:00:00 GMT"
+KEY_B = "b|Mon, 05 Oct 2026 11:00:00 GMT"
+
+
+class FeedIngestTestCase(unittest.TestCase):
+    """Runs fetch_single_feed against canned responses with the DB calls recorded."""
+
+    def setUp(self):
+        self.response = {"status": 200, "content": RSS, "etag": "v1", "modified": None}
+        self.stored_seen = []
+        self.seen_lookups = []
+        self.upserted = []
+        self.recorded = []
+        self.queued = 0
+        self.notified = 0
+
+        async def fake_fetch(session, feed):
+            return dict(self.response), 5, None
+
+        def fake_seen(feed_url):
+            self.seen_lookups.append(feed_url)
+            return list(self.stored_seen)
+
+        def fake_upsert(articles, enqueue_embeddings=False):
+            self.upserted.append([a["url"] for a in articles])
+            return ArticleUpsertResult([uuid.uuid4() for _ in articles], self.queued, len(articles) - self.queued)
+
+        patches = [
+            patch.object(enhanced_scheduler, "_SEEN_ENTRIES", {}),
+            patch.object(enhanced_scheduler, "INGEST_PARSE_WORKERS", 0),
+            patch.object(enhanced_scheduler, "feed_schedule", FeedSchedule()),
+            patch.object(enhanced_scheduler, "fetch_feed_with_backoff", fake_fetch),
+            patch.object(enhanced_scheduler, "get_feed_seen_entries", fake_seen),
+            patch.object(enhanced_scheduler, "upsert_articles_bulk", fake_upsert),
+            patch.object(enhanced_scheduler, "record_feed_attempt",
+                         lambda *args, **kwargs: self.recorded.append((args, kwargs))),
+            patch.object(enhanced_scheduler.embedding_workers, "notify", self._notify),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _notify(self):
+        self.notified += 1
+
+    def poll(self) -> int:
+        return asyncio.run(enhanced_scheduler.fetch_single_feed(None, FEED)).stored
+
+
+class TestSeenEntriesSurviveRestart(FeedIngestTestCase):
+
+    def test_first_poll_is_seeded_from_stored_entry_keys(self):
+        self.stored_seen = [KEY_A]
+
+        self.assertEqual(self.poll(), 1)
+        self.assertEqual(self.upserted, [["http://feed/b"]])
+        # Current keys are persisted with the attempt for the next leader
+        self.assertEqual(self.recorded[-1][1]["seen_entries"], [KEY_A, KEY_B])
+
+    def test_db_is_read_once_per_process(self):
+        self.assertEqual(self.poll(), 2)
+        self.assertEqual(self.poll(), 0)
+        self.assertEqual(self.seen_lookups, ["http://feed"])
+        self.assertEqual(self.upserted, [["http://feed/a", "http://feed/b"]])
+
+
+class FakeResponse:
+    def __init__(self, status, text="", headers=None):
+        self.status = status
+        self.reason = "OK"
+        self._text = text
+        self.headers = headers or {}
+
+    async def text(self):
+        return self._text
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeSession:
+    def __init__(self, response):
+        self.response = response
+        self.requests = []
+
+    def get(self, url, timeout=None, headers=None):
+        self.requests.append(headers)
+        return self.response
+
+
+class TestConditionalGet(unittest.TestCase):
+
+    def fetch(self, response, validators=("etag-1", "Mon, 05 Oct 2026 10:00:00 GMT")):
+        session = FakeSession(response)
+        with patch.object(enhanced_scheduler, "get_feed_timeout", lambda url: 5000), \
+                patch.object(enhanced_scheduler, "get_feed_validators", lambda url: validators):
+            result = asyncio.run(enhanced_scheduler.fetch_feed_with_backoff(session, FEED))
+        return session.requests[0], result
+
+    def test_stored_validators_are_sent(self):
+        headers, _ = self.fetch(FakeResponse(304))
+        self.assertEqual(headers["If-None-Match"], "etag-1")
+        self.assertEqual(headers["If-Modified-Since"], "Mon, 05 Oct 2026 10:00:00 GMT")
+
+        headers, _ = self.fetch(FakeResponse(200, RSS), validators=(None, None))
+        self.assertNotIn("If-None-Match", headers)
+        self.assertNotIn("If-Modified-Since", headers)
+
+    def test_not_modified_has_no_body_and_keeps_validators(self):
+        _, (fetched, _, error) = self.fetch(FakeResponse(304))
+        self.assertIsNone(error)
+        self.assertEqual(fetched["status"], 304)
+        self.assertIsNone(fetched["content"])
+        self.assertEqual((fetched["etag"], fetched["modified"]), ("etag-1", "Mon, 05 Oct 2026 10:00:00 GMT"))
+
+    def test_new_validators_come_from_the_200_response(self):
+        _, (fetched, _, _) = self.fetch(FakeResponse(200, RSS, {"ETag": "etag-2"}))
+        self.assertEqual((fetched["status"], fetched["etag"]), (200, "etag-2"))
+        self.assertEqual(fetched["content"], RSS)
+
+
+class TestNotModifiedPoll(FeedIngestTestCase):
+
+    def test_not_modified_skips_parse_and_upsert(self):
+        self.response = {"status": 304, "content": None, "etag": "etag-1", "modified": None}
+        with patch.object(enhanced_scheduler, "parse_feed_off_loop", side_effect=AssertionError("parsed")):
+            self.assertEqual(self.poll(), 0)
+        self.assertEqual(self.upserted, [])
+        args, kwargs = self.recorded[-1]
+        self.assertEqual(args[2], True)
+        self.assertEqual(args[6:8], ("etag-1", None))
+        self.assertNotIn("seen_entries", kwargs)
+
+
+class TestOutboxCounts(FeedIngestTestCase):
+
+    def test_queued_is_counted_apart_from_stored(self):
+        self.queued = 1
+        result = asyncio.run(enhanced_scheduler.fetch_single_feed(None, FEED))
+        self.assertEqual(result, enhanced_scheduler.FeedPollResult(stored=2, queued=1, unchanged=1))
+
+    def test_cycle_returns_articles_queued_for_embedding(self):
+        self.queued = 1
+        feeds = [FEED, {"url": "http://feed2", "name": "Feed 2", "category": "news"}]
+        with patch.object(enhanced_scheduler, "_load_feeds", lambda: feeds), \
+                patch.object(enhanced_scheduler, "get_healthy_feeds", lambda: []):
+            cycle = enhanced_scheduler.enhanced_ingest_cycle(feed_urls={"http://feed", "http://feed2"})
+            self.assertEqual(asyncio.run(cycle), (2, 2))
+        self.assertEqual(len(self.upserted), 2)
+
+    def test_workers_are_woken_only_when_jobs_were_queued(self):
+        self.assertEqual(self.poll(), 2)
+        self.assertEqual(self.notified, 0)
+
+        enhanced_scheduler._SEEN_ENTRIES.clear()
+        self.queued = 1
+        self.assertEqual(self.poll(), 2)
+        self.assertEqual(self.notified, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
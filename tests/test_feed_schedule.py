@@ -0,0 +1,80 @@
+"""
+Tests for the adaptive per-feed polling schedule
+"""
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Add packages to path
+sys.path.append(str(Path(__file__).parent.parent))
+from services.ingest import feed_schedule as fs
+from services.ingest import enhanced_scheduler
+
+
+class TestFeedSchedule(unittest.TestCase):
+
+    def setUp(self):
+        self.schedule = fs.FeedSchedule()
+
+    def test_new_feeds_are_due_immediately(self):
+        self.assertEqual(self.schedule.due(["a", "b"], now=1000.0), ["a", "b"])
+
+    def test_interval_clamped(self):
+        self.assertEqual(fs.FeedSchedule.interval_for_rate(1000.0), fs.MIN_INTERVAL_S)
+        self.assertEqual(fs.FeedSchedule.interval_for_rate(0.0), fs.MAX_INTERVAL_S)
+        self.assertEqual(fs.FeedSchedule.interval_for_rate(None), fs.DEFAULT_INTERVAL_S)
+
+    def test_fast_feed_polled_more_often_than_slow_feed(self):
+        now = 0.0
+        self.schedule.observe("fast", 0, now=now)
+        self.schedule.observe("slow", 0, now=now)
+        for _ in range(5):
+            now += 600
+            self.schedule.observe("fast", 10, now=now)
+            self.schedule.observe("slow", 0, now=now)
+        snap = self.schedule.snapshot()
+        self.assertLess(snap["fast"]["interval_s"], snap["slow"]["interval_s"])
+        self.assertGreater(snap["fast"]["rate_per_hour"], 0)
+        self.assertEqual(self.schedule.due(["fast", "slow"], now=now + fs.MIN_INTERVAL_S * 1.2), ["fast"])
+
+    def test_seed_sets_rate_for_unseen_feeds(self):
+        self.schedule.seed({"a": 60.0})
+        self.assertEqual(self.schedule.snapshot()["a"]["interval_s"], fs.MIN_INTERVAL_S)
+
+    def test_failure_backs_off(self):
+        self.schedule.observe("a", 0, success=False, now=0.0)
+        snap = self.schedule.snapshot()["a"]
+        self.assertEqual(snap["consecutive_failures"], 1)
+        self.assertEqual(self.schedule.due(["a"], now=fs.DEFAULT_INTERVAL_S * 1.5), [])
+
+    def test_state_for_matches_snapshot_entry(self):
+        self.schedule.observe("a", 0, now=1000.0)
+        self.assertEqual(self.schedule.state_for("a"), self.schedule.snapshot()["a"])
+
+
+class TestScheduleIsPersisted(unittest.TestCase):
+    """The leader stores each feed's schedule with its attempt, for API processes."""
+
+    def test_poll_outcome_is_recorded_with_updated_schedule(self):
+        schedule = fs.FeedSchedule()
+        recorded = []
+
+        async def fake_fetch(session, feed):
+            return {"status": 304, "content": None, "etag": "v1", "modified": None}, 12, None
+
+        with patch.object(enhanced_scheduler, "feed_schedule", schedule), \
+                patch.object(enhanced_scheduler, "fetch_feed_with_backoff", fake_fetch), \
+                patch.object(enhanced_scheduler, "record_feed_attempt",
+                             lambda *args, **kwargs: recorded.append((args, kwargs))):
+            asyncio.run(enhanced_scheduler.fetch_single_feed(None, {"url": "http://feed", "name": "Feed"}))
+
+        args, kwargs = recorded[0]
+        self.assertEqual(args[:3], ("http://feed", "Feed", True))
+        self.assertEqual(kwargs["schedule"], schedule.state_for("http://feed"))
+        self.assertIsNotNone(kwargs["schedule"]["last_poll_at"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+"""
+Tests for the in-process hot-window vector index
+"""
+import sys
+import unittest
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+
+# Add packages to path
+sys.path.append(str(Path(__file__).parent.parent))
+from packages.nlp import hot_index as hot_index_module
+from packages.nlp.hot_index import HotVectorIndex
+
+
+def _article(idx, hours_old):
+    published = None
+    if hours_old is not None:
+        published = datetime.now(timezone.utc) - timedelta(hours=hours_old)
+    return SimpleNamespace(id=idx, title=f"t{idx}", summary="", published_at=published)
+
+
+class FakeRepo:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def fetch_recent_vectors(self, window_hours=72, updated_since=None, limit=20000, after=None):
+        rows = sorted(self.rows, key=lambda r: (r[2], r[0].id))
+        rows = [r for r in rows if (updated_since is None or r[2] >= updated_since)
+                and (after is None or (r[2], r[0].id) > after)]
+        return rows[:limit]
+
+
+class TestHotVectorIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = HotVectorIndex(window_hours=72)
+        now = datetime.now(timezone.utc)
+        self.rows = [
+            (_article(1, 1), [1.0, 0.0, 0.0], now - timedelta(minutes=3)),
+            (_article(2, 30), [0.7, 0.7, 0.0], now - timedelta(minutes=2)),
+            (_article(3, None), [0.0, 1.0, 0.0], now - timedelta(minutes=1)),
+        ]
+        self.index.refresh(FakeRepo(self.rows))
+
+    def test_not_ready_falls_back(self):
+        self.assertIsNone(HotVectorIndex().search([1.0, 0.0, 0.0]))
+
+    def test_wider_window_falls_back(self):
+        self.assertIsNone(self.index.search([1.0, 0.0, 0.0], window_hours=720))
+
+    def test_topk_matches_brute_force_cosine(self):
+        hits = self.index.search([1.0, 0.1, 0.0], window_hours=72, limit=3)
+        self.assertEqual([a.id for a, _ in hits], [1, 2, 3])
+        q = np.array([1.0, 0.1, 0.0]) / np.linalg.norm([1.0, 0.1, 0.0])
+        expected = float(np.dot(q, np.array([0.7, 0.7, 0.0]) / np.linalg.norm([0.7, 0.7, 0.0])))
+        self.assertAlmostEqual(hits[1][1], expected, places=5)
+
+    def test_window_filter_keeps_undated(self):
+        hits = self.index.search([0.0, 1.0, 0.0], window_hours=24, limit=10)
+        self.assertEqual(sorted(a.id for a, _ in hits), [1, 3])
+
+    def test_incremental_refresh_replaces_rows(self):
+        updated = (_article(1, 1), [0.0, 0.0, 1.0], datetime.now(timezone.utc))
+        self.index.refresh(FakeRepo(self.rows + [updated]))
+        self.assertEqual(self.index.size, 3)
+        hits = self.index.search([0.0, 0.0, 1.0], window_hours=72, limit=1)
+        self.assertEqual(hits[0][0].id, 1)
+
+    def test_late_commit_behind_watermark_is_picked_up(self):
+        # Written by a transaction that started before the last row we saw
+        late = (_article(4, 1), [0.5, 0.5, 0.5], datetime.now(timezone.utc) - timedelta(minutes=1, seconds=30))
+        self.index.refresh(FakeRepo(self.rows + [late]))
+        self.assertEqual(self.index.size, 4)
+
+    def test_burst_larger_than_a_page_is_read_in_full(self):
+        now = datetime.now(timezone.utc)
+        burst = [(_article(10 + i, 1), [1.0, float(i), 0.0], now) for i in range(7)]
+        with patch.object(hot_index_module, "INDEX_REFRESH_PAGE_SIZE", 3):
+            index = HotVectorIndex(window_hours=72)
+            index.refresh(FakeRepo(self.rows + burst))
+        self.assertEqual(index.size, 10)
+
+    def test_eviction_of_aged_rows(self):
+        self.index.add([(_article(9, 100), [1.0, 1.0, 1.0])])
+        self.assertEqual(self.index.size, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+Tests for the shared pooled HTTP client (connection reuse, HTTP/1.1 fallback)
+"""
+import asyncio
+import sys
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest.mock import patch
+
+# Add packages to path
+sys.path.append(str(Path(__file__).parent.parent))
+from packages.util import http_client
+from packages.util.http_client import SharedAsyncClient
+
+
+class _EchoHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestSharedAsyncClient(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _EchoHandler)
+        cls.url = f"http://127.0.0.1:{cls.server.server_address[1]}/"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def test_sequential_requests_reuse_one_connection(self):
+        client = SharedAsyncClient("test", http2=False)
+
+        async def run():
+            await client.start()
+            pooled = client._client
+            responses = [await client.post(self.url, json={"n": n}) for n in range(3)]
+            self.assertIs(client._client, pooled)
+            await client.aclose()
+            return responses
+
+        responses = asyncio.run(run())
+        self.assertEqual([r.json()["n"] for r in responses], [0, 1, 2])
+        self.assertEqual(client.stats["new_connections"], 1)
+        self.assertEqual(client.stats["reused"], 2)
+        self.assertEqual(client.stats["one_off_clients"], 0)
+        self.assertAlmostEqual(client.info()["reuse_ratio"], 2 / 3)
+        self.assertFalse(client.info()["open"])
+
+    def test_http2_falls_back_to_http11_without_h2(self):
+        with patch.object(http_client, "HTTP2_AVAILABLE", False):
+            client = SharedAsyncClient("test", http2=True)
+        self.assertFalse(client.http2)
+
+        async def run():
+            response = await client.post(self.url, json={"ok": True})
+            await client.aclose()
+            return response
+
+        response = asyncio.run(run())
+        self.assertEqual(response.http_version, "HTTP/1.1")
+        self.assertEqual(response.json(), {"ok": True})
+
+
+if __name__ == "__main__":
+    unittest.main()
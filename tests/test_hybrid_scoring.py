@@ -0,0 +1,64 @@
+"""
+Tests for columnar hybrid scoring against the per-article scorers it replaces
+"""
+import sys
+import unittest
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+
+# Add packages to path
+sys.path.append(str(Path(__file__).parent.parent))
+from packages.nlp.enhanced_retrieve import calculate_freshness_boost
+from packages.nlp.hybrid_retrieve import enhanced_bm25
+from packages.nlp.hybrid_scoring import (
+    CandidateArrays, batch_bm25ish, batch_enhanced_bm25, hybrid_scores, top_k_indices,
+)
+from packages.nlp.retrieve import bm25ish, time_decay
+
+
+def _article(idx, title, hours_old):
+    published = None
+    if hours_old is not None:
+        published = datetime.now(timezone.utc) - timedelta(hours=hours_old)
+    return SimpleNamespace(id=idx, title=title, summary="", published_at=published)
+
+
+class TestHybridScoring(unittest.TestCase):
+
+    def setUp(self):
+        self.articles = [
+            _article(1, "Dhaka flood update", 0.5),
+            _article(2, "ঢাকার বন্যা পরিস্থিতি", 3),
+            _article(3, "Cricket score", 30),
+            _article(4, "Undated story", None),
+        ]
+        self.candidates = CandidateArrays.from_hits([(a, 0.1 * i) for i, a in enumerate(self.articles)])
+
+    def test_time_columns_match_scalar_functions(self):
+        expected_decay = [time_decay(a.published_at) for a in self.articles]
+        expected_boost = [calculate_freshness_boost(a.published_at) for a in self.articles]
+        np.testing.assert_allclose(self.candidates.time_decay(), expected_decay, rtol=1e-4, atol=1e-12)
+        np.testing.assert_allclose(self.candidates.freshness_boost(), expected_boost)
+
+    def test_batched_lexical_matches_scalar_functions(self):
+        texts = [a.title for a in self.articles] + [""]
+        for query in ("dhaka flood", "ঢাকা বন্যা"):
+            np.testing.assert_allclose(batch_bm25ish(query, texts), [bm25ish(query, t) for t in texts], atol=1e-6)
+            np.testing.assert_allclose(
+                batch_enhanced_bm25(query, texts, 1.5),
+                [enhanced_bm25(query, t, {"title_boost": 1.5}) for t in texts], atol=1e-6,
+            )
+
+    def test_hybrid_blend_and_top_k(self):
+        self.candidates.lexical = np.array([1.0, 0.0, 0.0, 0.0])
+        scores = hybrid_scores(self.candidates, cos_weight=0.5, lexical_weight=0.5, time_weight=0.0)
+        np.testing.assert_allclose(scores, [0.5, 0.05, 0.1, 0.15])
+        self.assertEqual(list(top_k_indices(scores, 2)), [0, 3])
+        self.assertEqual(len(top_k_indices(scores, 10)), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
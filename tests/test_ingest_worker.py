@@ -0,0 +1,171 @@
+"""
+Tests for ingest leader election and requested-run handling
+"""
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Add packages to path
+sys.path.append(str(Path(__file__).parent.parent))
+from services.ingest import worker
+
+
+class FakeAdvisoryLocks:
+    """psycopg2.connect stand-in: one advisory lock shared by every connection"""
+
+    def __init__(self):
+        self.holder = None
+        self.connections = []
+
+    def connect(self, **kwargs):
+        conn = FakeConnection(self)
+        self.connections.append(conn)
+        return conn
+
+
+class FakeConnection:
+    def __init__(self, locks):
+        self.locks = locks
+        self.closed = False
+        self.autocommit = False
+        self.broken = False
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def close(self):
+        self.closed = True
+        if self.locks.holder is self:
+            self.locks.holder = None  # Session end releases the lock
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.result = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        if self.conn.broken:
+            raise ConnectionError("server closed the connection")
+        if "pg_try_advisory_lock" in sql:
+            if self.conn.locks.holder is None:
+                self.conn.locks.holder = self.conn
+            self.result = (self.conn.locks.holder is self.conn,)
+
+    def fetchone(self):
+        return self.result
+
+
+class TestLeaderLock(unittest.TestCase):
+
+    def setUp(self):
+        self.locks = FakeAdvisoryLocks()
+        patcher = patch.object(worker.psycopg2, "connect", self.locks.connect)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_only_one_instance_leads(self):
+        first, second = worker.LeaderLock(), worker.LeaderLock()
+        self.assertTrue(first.try_acquire())
+        self.assertFalse(second.try_acquire())
+        # The loser does not keep a connection open
+        self.assertTrue(self.locks.connections[1].closed)
+
+        first.release()
+        self.assertTrue(second.try_acquire())
+
+    def test_lost_connection_ends_leadership(self):
+        first, second = worker.LeaderLock(), worker.LeaderLock()
+        first.try_acquire()
+        self.assertTrue(first.still_held())
+
+        self.locks.connections[0].broken = True
+        self.assertFalse(first.still_held())
+        self.assertTrue(second.try_acquire())
+
+
+class FakeLock:
+    def __init__(self, held_checks=10):
+        self.held_checks = held_checks
+
+    def still_held(self):
+        self.held_checks -= 1
+        return self.held_checks >= 0
+
+
+class TestLeaderRuns(unittest.TestCase):
+
+    def setUp(self):
+        self.requested = [{"id": "run-1", "requested_by": "api"}, {"id": "run-2", "requested_by": "api"}]
+        self.finished = []
+        self.cycle_results = [(3, 7), RuntimeError("feeds unreachable")]
+
+        def claim_next_run(worker_id):
+            return self.requested.pop(0) if self.requested else None
+
+        async def enhanced_ingest_cycle():
+            result = self.cycle_results.pop(0)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        patches = [
+            patch.object(worker, "claim_next_run", claim_next_run),
+            patch.object(worker, "finish_run", lambda *args: self.finished.append(args)),
+            patch.object(worker, "record_leader_heartbeat", lambda *args: None),
+            patch.object(worker, "enhanced_ingest_cycle", enhanced_ingest_cycle),
+            patch.object(worker, "RUN_POLL_SECONDS", 0),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_requested_runs_are_claimed_and_finished(self):
+        asyncio.run(worker._lead(FakeLock(held_checks=4), asyncio.Event()))
+        self.assertEqual(self.finished, [
+            ("run-1", 3, 7),
+            ("run-2", 0, 0, "feeds unreachable"),
+        ])
+
+    def test_leader_stops_when_lock_is_lost(self):
+        asyncio.run(worker._lead(FakeLock(held_checks=0), asyncio.Event()))
+        self.assertEqual(len(self.requested), 2)
+        self.assertEqual(self.finished, [])
+
+    def test_new_leader_fails_orphaned_runs_and_releases_on_stop(self):
+        calls = []
+        lock = worker.LeaderLock()
+
+        async def lead(lock, stop):
+            calls.append("lead")
+            stop.set()
+
+        async def no_embedders(stop):
+            await stop.wait()
+
+        with patch.object(worker, "init_db", lambda: None), \
+                patch.object(worker, "init_feed_health_db", lambda: None), \
+                patch.object(worker, "init_ingest_runs_db", lambda: None), \
+                patch.object(worker, "LeaderLock", lambda: lock), \
+                patch.object(lock, "try_acquire", lambda: True), \
+                patch.object(lock, "release", lambda: calls.append("release")), \
+                patch.object(worker, "fail_orphaned_runs", lambda worker_id: calls.append("fail_orphaned")), \
+                patch.object(worker, "start_enhanced_scheduler", lambda: calls.append("start")), \
+                patch.object(worker, "stop_enhanced_scheduler", lambda: calls.append("stop")), \
+                patch.object(worker, "_lead", lead), \
+                patch.object(worker.embedding_workers, "run", no_embedders):
+            asyncio.run(worker.run_worker())
+
+        self.assertEqual(calls, ["fail_orphaned", "start", "lead", "stop", "release"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+"""
+Tests for matrix-based MMR diversification
+"""
+import random
+import sys
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+
+# Add packages to path
+sys.path.append(str(Path(__file__).parent.parent))
+from packages.nlp import retrieve
+from packages.nlp.hot_index import HotVectorIndex
+from packages.nlp.retrieve import candidate_vectors, mmr_diversify, pairwise_similarity, tokenize
+
+
+def _article(idx, title, summary=""):
+    return SimpleNamespace(id=idx, title=title, summary=summary, published_at=None)
+
+
+def _reference_mmr(candidates, k, lambda_):
+    """Previous pure-Python implementation (token Jaccard)."""
+    def sim(a, b):
+        ta = set(tokenize(f"{a.title} {a.summary}"))
+        tb = set(tokenize(f"{b.title} {b.summary}"))
+        return len(ta & tb) / len(ta | tb) if ta and tb else 0.0
+
+    remaining = sorted(range(len(candidates)), key=lambda i: candidates[i][1], reverse=True)
+    selected = [remaining.pop(0)]
+    while remaining and len(selected) < k:
+        best_idx, best_score = None, -1e9
+        for i in remaining:
+            max_sim = max(sim(candidates[i][0], candidates[j][0]) for j in selected)
+            score = lambda_ * candidates[i][1] - (1 - lambda_) * max_sim
+            if score > best_score:
+                best_idx, best_score = i, score
+        selected.append(best_idx)
+        remaining.remove(best_idx)
+    return [candidates[i][0] for i in selected]
+
+
+class TestMMR(unittest.TestCase):
+
+    def test_jaccard_fallback_matches_previous_selection(self):
+        rng = random.Random(7)
+        words = ["dhaka", "flood", "cricket", "election", "ঢাকা", "বন্যা", "market", "rain", "river", "vote"]
+        candidates = [
+            (_article(i, " ".join(rng.sample(words, 3)), " ".join(rng.sample(words, 4))), rng.random())
+            for i in range(40)
+        ]
+        for k, lambda_ in [(8, 0.7), (12, 0.6), (50, 0.5)]:
+            expected = [a.id for a in _reference_mmr(candidates, k, lambda_)]
+            self.assertEqual([a.id for a in mmr_diversify(candidates, k=k, lambda_=lambda_)], expected)
+
+    def test_embedding_similarity_demotes_near_duplicates(self):
+        # Different wording, same story: only the embeddings can tell
+        candidates = [
+            (_article(1, "Flood in Sylhet"), 0.9),
+            (_article(2, "সিলেটে বন্যা"), 0.85),
+            (_article(3, "Cricket final"), 0.6),
+        ]
+        vectors = np.asarray([[1, 0], [0.99, 0.14], [0, 1]], dtype=np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        self.assertEqual([a.id for a in mmr_diversify(candidates, k=2, lambda_=0.6)], [1, 2])
+        self.assertEqual([a.id for a in mmr_diversify(candidates, k=2, lambda_=0.6, vectors=vectors)], [1, 3])
+
+    def test_partial_vectors_use_jaccard_for_every_pair(self):
+        # Article 2 is a cosine near-duplicate of 1; 3 has no vector. Mixing
+        # cosine with the lower Jaccard values would make 3 look more novel.
+        candidates = [
+            (_article(1, "Flood in Sylhet", "river rises"), 0.9),
+            (_article(2, "Sylhet flood update", "river rises again"), 0.8),
+            (_article(3, "Flood in Sylhet", "river rises today"), 0.8),
+        ]
+        vectors = np.asarray([[1, 0], [0.99, 0.14], [np.nan, np.nan]], dtype=np.float32)
+        vectors[:2] /= np.linalg.norm(vectors[:2], axis=1, keepdims=True)
+        articles = [a for a, _ in candidates]
+        np.testing.assert_allclose(pairwise_similarity(articles, vectors), pairwise_similarity(articles))
+        self.assertEqual(
+            [a.id for a in mmr_diversify(candidates, k=2, vectors=vectors)],
+            [a.id for a in mmr_diversify(candidates, k=2)],
+        )
+
+    def test_hot_index_vectors_for_marks_missing_rows(self):
+        index = HotVectorIndex()
+        index.add([(_article(1, "a"), [3.0, 4.0]), (_article(2, "b"), [0.0, 2.0])])
+        vectors = index.vectors_for([2, 9, 1])
+        np.testing.assert_allclose(vectors[0], [0.0, 1.0])
+        self.assertTrue(np.isnan(vectors[1]).all())
+        np.testing.assert_allclose(vectors[2], [0.6, 0.8])
+        self.assertIsNone(HotVectorIndex().vectors_for([1]))
+
+    def test_search_embeddings_fill_rows_the_hot_index_lacks(self):
+        index = HotVectorIndex()
+        index.add([(_article(1, "a"), [3.0, 4.0])])
+        from_db = _article(2, "b")
+        from_db.embedding = np.asarray([0.0, 1.0], dtype=np.float32)  # set by search_vectors
+        keyword_only = _article(3, "c")
+
+        with patch.object(retrieve, "hot_index", index):
+            vectors = candidate_vectors([from_db, _article(1, "a"), keyword_only])
+        np.testing.assert_allclose(vectors[:2], [[0.0, 1.0], [0.6, 0.8]])
+        self.assertTrue(np.isnan(vectors[2]).all())
+
+        # Beyond the hot window every candidate came from search_vectors
+        with patch.object(retrieve, "hot_index", HotVectorIndex()):
+            np.testing.assert_allclose(candidate_vectors([from_db]), [[0.0, 1.0]])
+            self.assertIsNone(candidate_vectors([keyword_only]))
+
+    def test_jaccard_matrix_matches_pairwise_sets(self):
+        articles = [_article(1, "flood in sylhet"), _article(2, "sylhet flood river"), _article(3, ""),
+                    _article(4, "cricket final")]
+        sim = pairwise_similarity(articles)
+        tokens = [set(tokenize(f"{a.title} {a.summary}")) for a in articles]
+        for i in range(len(articles)):
+            for j in range(len(articles)):
+                expected = 0.0 if i == j or not tokens[i] or not tokens[j] else \
+                    len(tokens[i] & tokens[j]) / len(tokens[i] | tokens[j])
+                self.assertAlmostEqual(sim[i, j], expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+"""
+Tests for query-embedding request coalescing
+"""
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Add packages to path
+sys.path.append(str(Path(__file__).parent.parent))
+from packages.nlp import embed
+
+
+class TestQueryEmbedBatcher(unittest.TestCase):
+
+    def _run(self, batcher, texts):
+        calls = []
+
+        async def fake_batch(batch_texts, model, timeout=15.0):
+            calls.append(list(batch_texts))
+            return [[float(len(t))] for t in batch_texts]
+
+        async def go():
+            return await asyncio.gather(*(batcher.embed(t) for t in texts))
+
+        with patch.object(embed, "_embed_batch", fake_batch):
+            return asyncio.run(go()), calls
+
+    def test_concurrent_queries_share_one_call(self):
+        batcher = embed.QueryEmbedBatcher(window_ms=5, max_batch=32)
+        vectors, calls = self._run(batcher, ["a", "bb", "ccc"])
+        self.assertEqual(vectors, [[1.0], [2.0], [3.0]])
+        self.assertEqual(len(calls), 1)
+
+    def test_identical_texts_are_deduplicated(self):
+        batcher = embed.QueryEmbedBatcher(window_ms=5, max_batch=32)
+        vectors, calls = self._run(batcher, ["same", "same", "other"])
+        self.assertEqual(vectors[0], vectors[1])
+        self.assertEqual(calls, [["same", "other"]])
+        self.assertEqual(batcher.stats["deduplicated"], 1)
+
+    def test_full_batch_flushes_early(self):
+        batcher = embed.QueryEmbedBatcher(window_ms=10_000, max_batch=2)
+        vectors, calls = self._run(batcher, ["a", "b", "c", "d"])
+        self.assertEqual(len(vectors), 4)
+        self.assertEqual([len(c) for c in calls], [2, 2])
+
+    def test_errors_reach_every_waiter(self):
+        async def failing_batch(texts, model, timeout=15.0):
+            raise ValueError("boom")
+
+        batcher = embed.QueryEmbedBatcher(window_ms=5, max_batch=32)
+
+        async def go():
+            return await asyncio.gather(batcher.embed("x"), batcher.embed("y"), return_exceptions=True)
+
+        with patch.object(embed, "_embed_batch", failing_batch):
+            results = asyncio.run(go())
+        self.assertTrue(all(isinstance(r, ValueError) for r in results))
+
+
+if __name__ == "__main__":
+    unittest.main()
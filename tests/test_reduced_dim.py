@@ -0,0 +1,49 @@
+"""
+Tests for the shortened-embedding (two-stage search) configuration
+"""
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+
+# Add packages to path
+sys.path.append(str(Path(__file__).parent.parent))
+from packages.config import embedding
+from packages.db.repo import shorten_embedding
+
+
+class TestReducedDimension(unittest.TestCase):
+
+    def _config(self, model: str, search_dim: str) -> embedding.EmbeddingConfig:
+        with patch.object(embedding, "EMBED_LEGACY_ENV", model), \
+             patch.object(embedding, "EMBED_STORE_ENV", None), \
+             patch.object(embedding, "EMBED_QUERY_ENV", None), \
+             patch.object(embedding, "EMBED_SEARCH_DIM_ENV", search_dim):
+            return embedding.EmbeddingConfig()
+
+    def test_disabled_by_default(self):
+        cfg = self._config("text-embedding-3-large", "0")
+        self.assertFalse(cfg.two_stage)
+        self.assertIsNone(cfg.search_dimension)
+
+    def test_search_dimension_must_be_shorter(self):
+        self.assertEqual(self._config("text-embedding-3-large", "256").search_dimension, 256)
+        with self.assertRaises(ValueError):
+            self._config("text-embedding-3-small", "1536")
+
+    def test_model_must_support_shortening(self):
+        with self.assertRaises(ValueError):
+            self._config("text-embedding-ada-002", "256")
+
+    def test_shorten_embedding_is_normalized_prefix(self):
+        vec = np.arange(1, 9, dtype=np.float32)
+        short = shorten_embedding(vec, 4)
+        self.assertEqual(short.shape, (4,))
+        self.assertAlmostEqual(float(np.linalg.norm(short)), 1.0, places=5)
+        self.assertTrue(np.allclose(short * np.linalg.norm(vec[:4]), vec[:4]))
+
+
+if __name__ == "__main__":
+    unittest.main()
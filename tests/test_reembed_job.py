@@ -0,0 +1,186 @@
+"""
+Tests for the resumable, partitioned re-embedding job
+"""
+import asyncio
+import sys
+import unittest
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+# Add packages to path
+sys.path.append(str(Path(__file__).parent.parent))
+from packages.config.embedding import config
+from packages.db.repo import article_embedding_text, embedding_content_hash
+from scripts import reembed_articles
+
+
+def _ids(n):
+    return [uuid.UUID(int=(i + 1) * 2 ** 120) for i in range(n)]
+
+
+class TestPartitionBounds(unittest.TestCase):
+
+    def test_partitions_tile_the_uuid_space(self):
+        bounds = [reembed_articles.partition_bounds(p, 4) for p in range(4)]
+        self.assertIsNone(bounds[0][0])
+        self.assertIsNone(bounds[-1][1])
+        for (_, end), (start, _) in zip(bounds, bounds[1:]):
+            self.assertEqual(end, start)
+        self.assertEqual(bounds[1][0], uuid.UUID(int=2 ** 126))
+
+    def test_single_partition_is_unbounded(self):
+        self.assertEqual(reembed_articles.partition_bounds(0, 1), (None, None))
+
+
+class FakeJobStore:
+    """Checkpoint rows and article pages for one partition, in memory"""
+
+    def __init__(self, article_ids, cursor=None, worker_id=reembed_articles.WORKER_ID):
+        self.articles = [(article_id, f"title {i}", "", None) for i, article_id in enumerate(article_ids)]
+        self.cursor = cursor
+        self.worker_id = worker_id
+        self.status = "pending"
+        self.page_reads = []
+        self.written = []
+        self.drop_from_write = set()
+
+    def claim_partition(self, job_id, partition, worker_id):
+        if self.status == "done":
+            return None
+        self.worker_id, self.status = worker_id, "running"
+        return {"last_article_id": self.cursor}
+
+    def fetch_article_page(self, start_id, end_id, after, limit):
+        self.page_reads.append(after)
+        rows = [row for row in self.articles if after is None or row[0] > after]
+        return rows[:limit]
+
+    def upsert_embeddings_bulk(self, pairs, content_hashes):
+        stored = [article_id for article_id, _ in pairs if article_id not in self.drop_from_write]
+        self.written.extend(stored)
+        return len(stored)
+
+    def save_checkpoint(self, job_id, partition, worker_id, last_article_id, processed=0, skipped=0, errors=0):
+        if worker_id != self.worker_id:
+            return False
+        self.cursor = last_article_id
+        return True
+
+    def finish_partition(self, job_id, partition, worker_id, status="done"):
+        if worker_id == self.worker_id:
+            self.status = status
+
+    def restart_finished_job(self, job_id):
+        if self.status != "done":
+            return False
+        self.status, self.cursor, self.worker_id = "pending", None, None
+        return True
+
+
+class TestReembedPartition(unittest.TestCase):
+
+    def patch_store(self, store):
+        async def fake_embed(texts):
+            return [[0.0] * config.dimension for _ in texts]
+
+        @contextmanager
+        def fake_scope():
+            yield SimpleNamespace(execute=lambda statement: SimpleNamespace(fetchall=lambda: []))
+
+        patches = [
+            patch.object(reembed_articles, "init_reembed_db", lambda: None),
+            patch.object(reembed_articles, "create_job", lambda job_id, partitions, model, dim: 1),
+            patch.object(reembed_articles, "restart_finished_job", store.restart_finished_job),
+            patch.object(reembed_articles, "claim_partition", store.claim_partition),
+            patch.object(reembed_articles, "fetch_article_page", store.fetch_article_page),
+            patch.object(reembed_articles, "upsert_embeddings_bulk", store.upsert_embeddings_bulk),
+            patch.object(reembed_articles, "save_checkpoint", store.save_checkpoint),
+            patch.object(reembed_articles, "finish_partition", store.finish_partition),
+            patch.object(reembed_articles, "embed_store", fake_embed),
+            patch.object(reembed_articles, "session_scope", fake_scope),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def run_partition(self, store, page_size=2):
+        self.patch_store(store)
+        return asyncio.run(reembed_articles.reembed_partition("job", 0, 1, page_size, force=False))
+
+    def test_resumes_after_checkpoint(self):
+        ids = _ids(5)
+        store = FakeJobStore(ids, cursor=ids[1])
+
+        self.assertTrue(self.run_partition(store))
+        self.assertEqual(store.page_reads[0], ids[1])
+        self.assertEqual(store.written, ids[2:])
+        self.assertEqual((store.cursor, store.status), (ids[-1], "done"))
+
+    def test_unchanged_articles_are_skipped(self):
+        ids = _ids(3)
+        store = FakeJobStore(ids)
+        article_id, title, summary, _ = store.articles[0]
+        store.articles[0] = (article_id, title, summary, embedding_content_hash(article_embedding_text(title, summary)))
+
+        self.run_partition(store)
+        self.assertEqual(store.written, ids[1:])
+
+    def test_partial_write_keeps_cursor_before_the_page(self):
+        ids = _ids(4)
+        store = FakeJobStore(ids)
+        store.drop_from_write = {ids[3]}
+
+        with self.assertRaises(RuntimeError):
+            self.run_partition(store)
+        self.assertEqual((store.cursor, store.status), (ids[1], "failed"))
+
+        # The rerun re-reads the failed page from the checkpoint
+        store.drop_from_write = set()
+        self.assertTrue(self.run_partition(store))
+        self.assertEqual(store.page_reads[-2], ids[1])
+        self.assertEqual(store.cursor, ids[-1])
+
+    def test_stops_when_partition_was_taken_over(self):
+        ids = _ids(4)
+        store = FakeJobStore(ids)
+        claim = store.claim_partition
+
+        def claim_then_lose(job_id, partition, worker_id):
+            row = claim(job_id, partition, worker_id)
+            store.worker_id = "other-host:1"  # stale claim taken over
+            return row
+
+        store.claim_partition = claim_then_lose
+        with self.assertRaises(RuntimeError):
+            self.run_partition(store)
+        # Neither the cursor nor the new holder's status was touched
+        self.assertIsNone(store.cursor)
+        self.assertEqual(store.status, "running")
+
+    def test_rerunning_a_finished_job_starts_a_new_pass(self):
+        ids = _ids(3)
+        store = FakeJobStore(ids)
+        self.assertTrue(self.run_partition(store))
+        self.assertEqual(store.status, "done")
+
+        # e.g. after reset_embedding_index: the stored hashes are gone
+        args = SimpleNamespace(job="job", partitions=1, partition=None, concurrency=None, page_size=2, force=False)
+        self.assertEqual(asyncio.run(reembed_articles.reembed_all_articles(args)), 0)
+        self.assertEqual(store.written, ids + ids)
+        self.assertEqual((store.cursor, store.status), (ids[-1], "done"))
+
+    def test_unfinished_job_resumes_instead_of_restarting(self):
+        ids = _ids(4)
+        store = FakeJobStore(ids, cursor=ids[1])
+        self.patch_store(store)
+
+        args = SimpleNamespace(job="job", partitions=1, partition=None, concurrency=None, page_size=2, force=False)
+        asyncio.run(reembed_articles.reembed_all_articles(args))
+        self.assertEqual(store.written, ids[2:])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+"""
+Tests for the shared cross-encoder registry: load once, batch, cache scores
+"""
+import asyncio
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Add packages to path
+sys.path.append(str(Path(__file__).parent.parent))
+from packages.nlp import reranker as reranker_module
+from packages.nlp.reranker import RerankerRegistry
+
+
+class FakeCrossEncoder:
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, pairs, batch_size=32, show_progress_bar=False):
+        self.calls.append(list(pairs))
+        return [float(len(text)) for _, text in pairs]
+
+
+class TestRerankerRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = RerankerRegistry(cache_size=100)
+        self.model = FakeCrossEncoder()
+        self.registry.models["base"] = self.model
+
+    def test_concurrent_requests_share_one_predict(self):
+        async def go():
+            return await asyncio.gather(
+                self.registry.rerank_scores("q1", [("a", "x"), ("b", "xx")]),
+                self.registry.rerank_scores("q2", [("c", "xxx")]),
+            )
+
+        first, second = asyncio.run(go())
+        self.assertEqual(first, [1.0, 2.0])
+        self.assertEqual(second, [3.0])
+        self.assertEqual(len(self.model.calls), 1)
+        self.assertEqual(len(self.model.calls[0]), 3)
+
+    def test_repeated_pairs_come_from_cache(self):
+        items = [("a", "x"), ("b", "xx")]
+        asyncio.run(self.registry.rerank_scores("Dhaka flood", items))
+        scores = asyncio.run(self.registry.rerank_scores("dhaka  flood", items + [("c", "xxx")]))
+        self.assertEqual(scores, [1.0, 2.0, 3.0])
+        self.assertEqual([len(c) for c in self.model.calls], [2, 1])
+        self.assertEqual(self.registry.stats["cache_hits"], 2)
+
+    def test_edited_article_text_is_rescored(self):
+        asyncio.run(self.registry.rerank_scores("q", [("a", "x")]))
+        scores = asyncio.run(self.registry.rerank_scores("q", [("a", "edited")]))
+        self.assertEqual(scores, [6.0])
+        self.assertEqual(len(self.model.calls), 2)
+
+    def test_unkeyed_items_are_always_scored(self):
+        asyncio.run(self.registry.rerank_scores("q", [(None, "x")]))
+        asyncio.run(self.registry.rerank_scores("q", [(None, "x")]))
+        self.assertEqual(len(self.model.calls), 2)
+
+
+class TestBackendSelection(unittest.TestCase):
+
+    def test_exported_onnx_model_is_preferred(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            (Path(tmp) / "base").mkdir()
+            (Path(tmp) / "base" / "model.int8.onnx").write_bytes(b"")
+            with patch.object(reranker_module, "RERANKER_ONNX_DIR", Path(tmp)), \
+                 patch.object(reranker_module, "ONNX_RUNTIME_AVAILABLE", True), \
+                 patch.object(reranker_module, "SENTENCE_TRANSFORMERS_AVAILABLE", True):
+                registry = RerankerRegistry()
+                self.assertEqual(registry.backend_for("base"), "onnx")
+                self.assertEqual(registry.backend_for("large"), "torch")
+
+    def test_backend_is_resolved_once(self):
+        with tempfile.TemporaryDirectory() as tmp, \
+             patch.object(reranker_module, "RERANKER_ONNX_DIR", Path(tmp)), \
+             patch.object(reranker_module, "ONNX_RUNTIME_AVAILABLE", True), \
+             patch.object(reranker_module, "SENTENCE_TRANSFORMERS_AVAILABLE", True), \
+             patch.object(reranker_module, "onnx_model_path", wraps=reranker_module.onnx_model_path) as lookup:
+            registry = RerankerRegistry()
+            for _ in range(3):
+                self.assertEqual(registry.backend_for("base"), "torch")
+            self.assertEqual(lookup.call_count, 1)
+
+    def test_no_backend_returns_none(self):
+        with tempfile.TemporaryDirectory() as tmp, \
+             patch.object(reranker_module, "RERANKER_ONNX_DIR", Path(tmp)), \
+             patch.object(reranker_module, "ONNX_RUNTIME_AVAILABLE", True), \
+             patch.object(reranker_module, "SENTENCE_TRANSFORMERS_AVAILABLE", False):
+            registry = RerankerRegistry()
+            self.assertIsNone(registry.backend_for("base"))
+            self.assertIsNone(asyncio.run(registry.rerank_scores("q", [("a", "x")])))
+
+    def test_failed_load_is_not_retried_until_backoff_ends(self):
+        loads = []
+
+        def failing_load(path, max_length=512):
+            loads.append(path)
+            if len(loads) == 1:
+                raise OSError("model file is corrupt")
+            model = FakeCrossEncoder()
+            model.model_path = path
+            return model
+
+        registry = RerankerRegistry()
+        registry._resolved_backends["base"] = "onnx"
+        now = [1000.0]
+        with patch.object(reranker_module, "OnnxCrossEncoder", failing_load), \
+             patch.object(reranker_module, "onnx_model_path", lambda key: Path("model.int8.onnx")), \
+             patch.object(reranker_module, "RERANKER_LOAD_RETRY_S", 60.0), \
+             patch.object(reranker_module.time, "time", lambda: now[0]):
+            with self.assertRaises(OSError):
+                registry.get("base")
+            with self.assertRaises(RuntimeError):
+                registry.get("base")
+            # Requests skip reranking instead of paying for another load
+            self.assertIsNone(asyncio.run(registry.rerank_scores("q", [("a", "x")])))
+            self.assertEqual(len(loads), 1)
+            self.assertEqual(registry.info()["load_backing_off"], ["base"])
+
+            now[0] += 61.0
+            self.assertIsInstance(registry.get("base"), FakeCrossEncoder)
+            self.assertEqual(len(loads), 2)
+            self.assertEqual(registry.info()["load_backing_off"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,156 @@
+"""
+Tests for the two-level (pre-retrieval / story) response cache
+"""
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Add packages to path
+sys.path.append(str(Path(__file__).parent.parent))
+from packages.util import cache as cache_module
+from packages.util.redis_cache import RedisCache
+
+
+class FakeRedisCache(RedisCache):
+    """RedisCache with an in-memory store instead of a Redis connection"""
+
+    def __init__(self):
+        super().__init__()
+        self.store = {}
+
+    async def get_by_key(self, cache_key):
+        data = self.store.get(cache_key)
+        return dict(data, cache_hit=True) if data is not None else None
+
+    async def set_by_key(self, cache_key, data, ttl):
+        self.store[cache_key] = dict(data)
+        return True
+
+
+WINDOW = {"window_hours": 24, "is_immediate": False, "needs_background": False, "story_detected": True}
+
+
+class ResponseCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.stats = {"pre_retrieval": {"hits": 0, "misses": 0}, "story": {"hits": 0, "misses": 0}}
+        patches = [
+            patch.object(cache_module, "_LEVEL_STATS", self.stats),
+            patch.object(cache_module, "_FALLBACK_CACHE", {}),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def store(self, query, story_id="story-1", window=WINDOW):
+        return asyncio.run(cache_module.set_two_level_async(
+            "news", query, {"answer": query}, window, story_id=story_id
+        ))
+
+    def lookup(self, query, story_id="story-1", window=WINDOW):
+        """The /ask lookup order, including the level-1 write-back on a story hit"""
+        async def run():
+            pre, _ = await cache_module.get_pre_retrieval_async("news", query, window)
+            if pre is not None:
+                return "pre", pre
+            story, _ = await cache_module.get_story_async(
+                "news", story_id, query, window_hours=window["window_hours"]
+            )
+            if story is None:
+                return None, None
+            await cache_module.set_pre_retrieval_async("news", query, story, window)
+            return "story", story
+        return asyncio.run(run())
+
+
+class TestStoryKey(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = RedisCache()
+
+    def key(self, query, story_id="story-1"):
+        return self.cache._create_story_key("news", story_id, query, 24, None, "bn")
+
+    def test_rewording_shares_a_key(self):
+        self.assertEqual(self.key("Dhaka flood update?"), self.key("update: flood, Dhaka"))
+
+    def test_different_question_or_story_gets_own_key(self):
+        self.assertNotEqual(self.key("Dhaka flood update"), self.key("Dhaka flood death toll"))
+        self.assertNotEqual(self.key("Dhaka flood update"), self.key("Dhaka flood update", "story-2"))
+
+
+class TestTwoLevelLookup(ResponseCacheTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.redis = FakeRedisCache()
+
+        async def fake_get_cache():
+            return self.redis
+
+        patcher = patch.object(cache_module, "get_cache", fake_get_cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_levels_and_stats(self):
+        self.assertTrue(self.store("Dhaka flood update?"))
+
+        level, value = self.lookup("Dhaka flood update?")
+        self.assertEqual((level, value["answer"]), ("pre", "Dhaka flood update?"))
+
+        level, value = self.lookup("update: Dhaka flood")
+        self.assertEqual(level, "story")
+
+        self.assertEqual(self.lookup("Dhaka flood death toll"), (None, None))
+
+        self.assertEqual(self.stats["pre_retrieval"], {"hits": 1, "misses": 2})
+        self.assertEqual(self.stats["story"], {"hits": 1, "misses": 1})
+        level_stats = cache_module.get_level_stats()
+        self.assertAlmostEqual(level_stats["pre_retrieval"]["hit_ratio"], 1 / 3)
+        self.assertAlmostEqual(level_stats["story"]["hit_ratio"], 0.5)
+
+    def test_story_hit_is_promoted_to_level_one(self):
+        self.store("Dhaka flood update?")
+        self.assertEqual(self.lookup("update: Dhaka flood")[0], "story")
+
+        # The repeat is answered before retrieval
+        level, value = self.lookup("update: Dhaka flood")
+        self.assertEqual((level, value["answer"]), ("pre", "Dhaka flood update?"))
+        self.assertEqual(len(self.redis.store), 3)
+
+    def test_no_story_id_skips_level_two(self):
+        self.store("Dhaka flood update", story_id=None)
+        self.assertEqual(len(self.redis.store), 1)
+        self.assertEqual(asyncio.run(cache_module.get_story_async("news", None, "x")), (None, False))
+        self.assertEqual(self.stats["story"], {"hits": 0, "misses": 0})
+
+
+class TestMemoryFallback(ResponseCacheTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        async def broken_get_cache():
+            raise ConnectionError("redis down")
+
+        patcher = patch.object(cache_module, "get_cache", broken_get_cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_fallback_key_ignores_window_analysis_order(self):
+        self.store("Dhaka flood update")
+        reordered = dict(reversed(list(WINDOW.items())))
+        level, value = self.lookup("Dhaka flood update", window=reordered)
+        self.assertEqual((level, value["answer"]), ("pre", "Dhaka flood update"))
+
+    def test_fallback_story_level_uses_intent(self):
+        self.store("Dhaka flood update")
+        self.assertEqual(self.lookup("flood update Dhaka")[0], "story")
+        self.assertEqual(self.lookup("flood update Dhaka")[0], "pre")
+        self.assertEqual(self.lookup("Dhaka flood death toll"), (None, None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+"""
+Tests for the request-scoped retrieval plan (embed once, one search per window)
+"""
+import asyncio
+import sys
+import unittest
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+# Add packages to path
+sys.path.append(str(Path(__file__).parent.parent))
+from packages.nlp import retrieval_plan
+from packages.nlp.retrieval_plan import RetrievalPlan
+
+
+class FakeRepo:
+    """Records vector searches and serves canned hits"""
+
+    def __init__(self, hits):
+        self.hits = hits
+        self.calls = []
+
+    def search_vectors(self, qvec, window_hours=72, limit=300):
+        self.calls.append((window_hours, limit))
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=window_hours)
+        in_window = [(a, cos) for a, cos in self.hits if a.published_at is None or a.published_at >= cutoff]
+        return in_window[:limit]
+
+
+def _article(idx: int, hours_old):
+    published = None
+    if hours_old is not None:
+        published = datetime.now(timezone.utc) - timedelta(hours=hours_old)
+    return SimpleNamespace(id=idx, title=f"t{idx}", summary="", published_at=published)
+
+
+class TestRetrievalPlan(unittest.TestCase):
+
+    def setUp(self):
+        self.hits = [
+            (_article(1, 2), 0.9),
+            (_article(2, 48), 0.8),
+            (_article(3, None), 0.7),
+            (_article(4, 500), 0.6),
+        ]
+        self.repo = FakeRepo(self.hits)
+        self.embed_calls = 0
+
+        async def fake_embed(text):
+            self.embed_calls += 1
+            return [0.1, 0.2]
+
+        patcher = patch.object(retrieval_plan, "embed_query", fake_embed)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_single_embed_and_exact_slices_of_a_complete_search(self):
+        plan = RetrievalPlan("query", self.repo)
+
+        async def run():
+            wide = await plan.vector_hits(720)
+            recent = await plan.vector_hits(24)
+            week = await plan.vector_hits(168)
+            return wide, recent, week
+
+        wide, recent, week = asyncio.run(run())
+
+        self.assertEqual(self.embed_calls, 1)
+        # The 720h search held every match, so narrower windows are slices of it
+        self.assertEqual(self.repo.calls, [(720, retrieval_plan.PLAN_SEARCH_LIMIT)])
+        self.assertEqual([a.id for a, _ in wide], [1, 2, 3, 4])
+        # Undated articles stay in every window, like the SQL filter
+        self.assertEqual([a.id for a, _ in recent], [1, 3])
+        self.assertEqual([a.id for a, _ in week], [1, 2, 3])
+
+    def test_truncated_wide_search_does_not_starve_narrow_window(self):
+        # The old background articles outrank the recent one
+        hits = [(_article(i, 500), 0.9 - i / 100) for i in range(10, 14)] + [(_article(1, 2), 0.5)]
+        repo = FakeRepo(hits)
+        plan = RetrievalPlan("query", repo, search_limit=4)
+
+        async def run():
+            background = await plan.vector_hits(720)
+            recent = await plan.vector_hits(24)
+            return background, recent
+
+        background, recent = asyncio.run(run())
+
+        self.assertEqual(self.embed_calls, 1)
+        self.assertEqual([window for window, _ in repo.calls], [720, 24])
+        self.assertNotIn(1, [a.id for a, _ in background])
+        self.assertIn(1, [a.id for a, _ in recent])
+
+    def test_each_window_is_searched_once(self):
+        plan = RetrievalPlan("query", self.repo, search_limit=2)
+
+        async def run():
+            await plan.vector_hits(24)
+            await plan.vector_hits(24, limit=1)
+            await plan.vector_hits(72)
+
+        asyncio.run(run())
+        self.assertEqual([window for window, _ in self.repo.calls], [24, 72])
+        self.assertEqual(plan.stats["vector_searches"], 2)
+
+    def test_limit_keeps_similarity_order(self):
+        plan = RetrievalPlan("query", self.repo)
+        hits = asyncio.run(plan.vector_hits(720, limit=2))
+        self.assertEqual([cos for _, cos in hits], [0.9, 0.8])
+
+
+if __name__ == "__main__":
+    unittest.main()
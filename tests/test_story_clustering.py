@@ -0,0 +1,96 @@
+"""
+Tests for MinHash/LSH story clustering
+"""
+import random
+import sys
+import time
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+
+# Add packages to path
+sys.path.append(str(Path(__file__).parent.parent))
+from packages.nlp.story_clustering import (
+    cluster_similar_stories, create_minhash_signature, lsh_params, minhash_signatures,
+    minhash_similarity, near_duplicate_groups,
+)
+from packages.nlp.tokenizer import tokenize
+
+
+def _shingles(text):
+    words = tokenize(text)
+    return {f"{words[i]} {words[i+1]}" for i in range(len(words) - 1)}
+
+
+class TestMinHash(unittest.TestCase):
+
+    def test_signature_is_fixed_length_and_deterministic(self):
+        sig = create_minhash_signature("Flood waters rise in Sylhet as rivers swell")
+        self.assertEqual(sig.shape, (64,))
+        np.testing.assert_array_equal(sig, create_minhash_signature("Flood waters rise in Sylhet as rivers swell"))
+        self.assertEqual(len(create_minhash_signature("Flood")), 0)
+
+    def test_signature_agreement_estimates_jaccard(self):
+        rng = random.Random(3)
+        vocab = [f"w{i}" for i in range(400)]
+        base = rng.sample(vocab, 120)
+        other = base[:80] + rng.sample(vocab, 40)
+        a, b = " ".join(base), " ".join(other)
+        true = len(_shingles(a) & _shingles(b)) / len(_shingles(a) | _shingles(b))
+        sigs, _ = minhash_signatures([a, b], num_perm=64)
+        self.assertAlmostEqual(minhash_similarity(sigs[0], sigs[1]), true, delta=0.15)
+
+    def test_batch_matches_single_signatures(self):
+        texts = ["ঢাকায় ভারী বৃষ্টিতে জলাবদ্ধতা দেখা দিয়েছে", "", "one", "Cricket: Bangladesh beat Sri Lanka"]
+        sigs, has = minhash_signatures(texts)
+        self.assertEqual(has.tolist(), [True, False, False, True])
+        np.testing.assert_array_equal(sigs[3], create_minhash_signature(texts[3]))
+
+    def test_lsh_params_rise_below_threshold(self):
+        bands, rows = lsh_params(0.4, 64)
+        self.assertLessEqual(bands * rows, 64)
+        self.assertLessEqual((1 / bands) ** (1 / rows), 0.4)
+
+
+class TestClustering(unittest.TestCase):
+
+    def test_near_duplicates_cluster_transitively(self):
+        story = "Heavy rain floods low lying areas of Dhaka city on Monday morning causing traffic"
+        texts = [
+            story,
+            "Cricket board names new captain ahead of series",
+            story + " chaos",
+            story.replace("Monday", "Tuesday") + " chaos",
+            "Stock market index closes higher on banking shares",
+        ]
+        self.assertEqual(near_duplicate_groups(texts, 0.4), [[0, 2, 3], [1], [4]])
+
+    def test_short_texts_are_never_merged(self):
+        self.assertEqual(near_duplicate_groups(["Flood", "Flood", ""], 0.4), [[0], [1], [2]])
+
+    def test_cluster_output_shape(self):
+        articles = [
+            SimpleNamespace(title="Dhaka flood update", summary="Rivers rise across the north of the country",
+                            source=src, url=f"https://{src}/a", published_at=None)
+            for src in ("a.com", "b.com")
+        ]
+        clusters = cluster_similar_stories(articles)
+        self.assertEqual(len(clusters), 1)
+        self.assertEqual(clusters[0]["size"], 2)
+        self.assertEqual(sorted(clusters[0]["outlets"]), ["a.com", "b.com"])
+
+    def test_scales_to_a_day_of_articles(self):
+        rng = random.Random(1)
+        vocab = [f"w{i}" for i in range(5000)]
+        stories = [" ".join(rng.sample(vocab, 40)) for _ in range(1000)]
+        texts = stories + [s + " update" for s in stories[:200]]
+        start = time.perf_counter()
+        groups = near_duplicate_groups(texts, 0.4)
+        self.assertLess(time.perf_counter() - start, 10.0)
+        self.assertEqual(len(groups), 1000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+"""
+Tests for the Bangla/English tokenizer and the BM25 inverted index
+"""
+import sys
+import unittest
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add packages to path
+sys.path.append(str(Path(__file__).parent.parent))
+from packages.nlp.text_index import BM25Index
+from packages.nlp.tokenizer import tokenize
+
+
+def _article(idx, title, summary="", hours_old=1, inserted_min=0):
+    published = None
+    if hours_old is not None:
+        published = datetime.now(timezone.utc) - timedelta(hours=hours_old)
+    updated = datetime.now(timezone.utc) - timedelta(minutes=inserted_min)
+    return SimpleNamespace(id=idx, title=title, summary=summary, published_at=published, updated_at=updated)
+
+
+class FakeRepo:
+    def __init__(self, articles):
+        self.articles = articles
+
+    def fetch_recent_articles_since(self, window_hours=72, updated_since=None, limit=20000, after=None):
+        articles = sorted(self.articles, key=lambda a: (a.updated_at, a.id))
+        articles = [a for a in articles if (updated_since is None or a.updated_at >= updated_since)
+                    and (after is None or (a.updated_at, a.id) > after)]
+        return articles[:limit]
+
+
+class TestTokenizer(unittest.TestCase):
+
+    def test_bangla_words_are_kept_whole(self):
+        self.assertEqual(tokenize("বন্যা পরিস্থিতি"), ["বন্যা", "পরিস্থিতি"])
+
+    def test_bangla_inflections_share_a_stem(self):
+        self.assertEqual(set(tokenize("ঢাকার ঢাকায় ঢাকাকে ঢাকা")), {"ঢাকা"})
+        self.assertEqual(tokenize("শহরের শহর"), ["শহর", "শহর"])
+
+    def test_base_and_inflected_forms_share_a_stem(self):
+        pairs = [
+            ("সরকার", "সরকারের"), ("বাজার", "বাজারে"), ("বাজার", "বাজারের"),
+            ("পরিবার", "পরিবারের"), ("ভারত", "ভারতে"), ("কমিটি", "কমিটির"),
+            ("নির্বাচন", "নির্বাচনে"), ("দেশ", "দেশে"), ("রাত", "রাতে"),
+            ("বাড়ি", "বাড়িতে"), ("বই", "বইটি"), ("পার্টি", "পার্টির"),
+        ]
+        for base, inflected in pairs:
+            with self.subTest(base=base, inflected=inflected):
+                self.assertEqual(tokenize(base), tokenize(inflected))
+
+    def test_root_letters_are_not_stripped(self):
+        self.assertEqual(tokenize("ভারত কমিটি নির্বাচন"), ["ভারত", "কমিটি", "নির্বাচন"])
+
+    def test_digits_and_english_are_normalized(self):
+        self.assertEqual(tokenize("২০২৪ Elections"), ["2024", "election"])
+
+
+class TestBM25Index(unittest.TestCase):
+
+    def setUp(self):
+        self.index = BM25Index(window_hours=72)
+        self.articles = [
+            _article(1, "ঢাকায় বন্যা পরিস্থিতি", "সিলেটে পানি বাড়ছে", inserted_min=40),
+            _article(2, "Cricket score update", "Bangladesh beat Sri Lanka in Dhaka", inserted_min=30),
+            _article(3, "Dhaka traffic", "Dhaka roads jammed in Dhaka again", inserted_min=20),
+            _article(4, "Stock market", "DSE index rises", hours_old=200, inserted_min=10),
+        ]
+        self.index.refresh(FakeRepo(self.articles))
+
+    def test_old_articles_are_not_indexed(self):
+        self.assertEqual(self.index.size, 3)
+
+    def test_bangla_query_finds_inflected_title(self):
+        hits = self.index.search("ঢাকার বন্যা")
+        self.assertEqual(hits[0][0].id, 1)
+
+    def test_rare_terms_outweigh_common_ones(self):
+        hits = self.index.search("dhaka cricket")
+        self.assertEqual([a.id for a, _ in hits][:2], [2, 3])
+
+    def test_incremental_refresh_and_replace(self):
+        repo = FakeRepo(self.articles + [_article(5, "বন্যা সতর্কতা", inserted_min=0)])
+        # Rows inside the overlap window are re-read; the new one must be among them.
+        self.assertGreaterEqual(self.index.refresh(repo), 1)
+        self.assertEqual({a.id for a, _ in self.index.search("বন্যা")}, {1, 5})
+
+        self.index.add([_article(1, "নির্বাচন", inserted_min=0)])
+        self.assertEqual({a.id for a, _ in self.index.search("বন্যা")}, {5})
+
+    def test_edited_article_is_reindexed(self):
+        edited = _article(2, "Election results", "Counting continues", inserted_min=0)
+        others = [a for a in self.articles if a.id != 2]
+        self.index.refresh(FakeRepo(others + [edited]))
+        self.assertEqual([a.id for a, _ in self.index.search("election")], [2])
+        self.assertNotIn(2, {a.id for a, _ in self.index.search("cricket") or []})
+
+    def test_lexical_scores_are_normalized_and_cover_unindexed(self):
+        outside = _article(9, "Dhaka cricket", hours_old=None)
+        scores = self.index.lexical_scores("cricket", [self.articles[0], self.articles[1], outside])
+        self.assertEqual(scores[0], 0.0)
+        self.assertAlmostEqual(max(scores), 1.0)
+        self.assertGreater(scores[2], 0.0)
+
+    def test_not_ready_returns_none(self):
+        self.assertIsNone(BM25Index().search("dhaka"))
+        self.assertIsNone(BM25Index().lexical_scores("dhaka", self.articles))
+
+
+if __name__ == "__main__":
+    unittest.main()
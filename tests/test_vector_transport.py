@@ -0,0 +1,128 @@
+"""
+Tests for pgvector parameter encoding (binary ndarray vs text literal) and decoding
+"""
+import sys
+import unittest
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+from pgvector import Vector
+from sqlalchemy.dialects import postgresql
+
+# Add packages to path
+sys.path.append(str(Path(__file__).parent.parent))
+from packages.db import repo
+from packages.db.repo import _vector_literal, _vector_param, parse_vector
+
+
+def _session(binary: bool):
+    """Stand-in for a Session whose pooled connection did or did not register the adapter"""
+    record = SimpleNamespace(info={"pgvector_binary": binary})
+    return SimpleNamespace(connection=lambda: SimpleNamespace(connection=record))
+
+
+class TestVectorTransport(unittest.TestCase):
+
+    def setUp(self):
+        self.vec = [0.25, -1.5, 3.0]
+
+    def test_binary_connection_gets_float32_array(self):
+        param = _vector_param(_session(True), self.vec)
+        self.assertIsInstance(param, np.ndarray)
+        self.assertEqual(param.dtype, np.float32)
+        # What register_vector sends: 4 bytes per dimension plus a 4-byte header
+        self.assertEqual(len(Vector(param).to_binary()), 4 + 4 * len(self.vec))
+
+    def test_connection_without_adapter_gets_text_literal(self):
+        self.assertEqual(_vector_param(_session(False), self.vec), _vector_literal(self.vec))
+        self.assertEqual(_vector_param(SimpleNamespace(connection=lambda: SimpleNamespace(
+            connection=SimpleNamespace(info={}))), self.vec), _vector_literal(self.vec))
+
+    def test_parse_vector_round_trips_every_format(self):
+        expected = np.asarray(self.vec, dtype=np.float32)
+        for value in (
+            _vector_literal(self.vec),
+            Vector.from_binary(Vector(self.vec).to_binary()),
+            expected,
+            self.vec,
+        ):
+            with self.subTest(kind=type(value).__name__):
+                decoded = parse_vector(value)
+                self.assertEqual(decoded.dtype, np.float32)
+                np.testing.assert_allclose(decoded, expected)
+
+    def test_parse_vector_empty_values(self):
+        self.assertEqual(parse_vector(None).size, 0)
+        self.assertEqual(parse_vector("[]").size, 0)
+
+
+class CompilingSession:
+    """Compiles each statement for psycopg the way Session.execute would"""
+
+    def __init__(self, binary: bool):
+        self.binary = binary
+        self.compiled = []
+
+    def connection(self):
+        return _session(self.binary).connection()
+
+    def execute(self, statement, params):
+        compiled = statement.compile(dialect=postgresql.psycopg.dialect())
+        self.compiled.append((compiled.string, compiled.construct_params(params)))
+        published = datetime(2026, 10, 5, tzinfo=timezone.utc)
+        embedding = np.asarray([0.0, 3.0, 4.0], dtype=np.float32)
+        return [(1, "http://x/1", "Dhaka flood", "s", "news", None, published, None, 0.9, embedding)]
+
+
+class TestSearchVectorsStatement(unittest.TestCase):
+
+    def search(self, binary: bool, **config):
+        session = CompilingSession(binary)
+
+        @contextmanager
+        def fake_scope():
+            yield session
+
+        settings = SimpleNamespace(**dict({"dimension": 3, "two_stage": False}, **config))
+        with patch.object(repo, "session_scope", fake_scope), patch.object(repo, "config", settings):
+            results = repo.search_vectors([0.25, -1.5, 3.0], window_hours=24, limit=5)
+        return session.compiled, results
+
+    def test_query_vector_is_a_bound_parameter(self):
+        for binary in (True, False):
+            with self.subTest(binary=binary):
+                (sql, params), = self.search(binary)[0]
+                self.assertIn("CAST(%(qvec)s AS vector)", sql)
+                self.assertIn("av.embedding\n", sql)
+                self.assertEqual(params["limit"], 5)
+                if binary:
+                    np.testing.assert_allclose(params["qvec"], [0.25, -1.5, 3.0])
+                else:
+                    self.assertEqual(params["qvec"], _vector_literal([0.25, -1.5, 3.0]))
+
+    def test_two_stage_binds_the_shortened_vector(self):
+        compiled, results = self.search(True, two_stage=True, search_dimension=2, search_overfetch=4)
+        (sql, params), = compiled
+        self.assertIn("embedding_short <=> CAST(%(qshort)s AS vector)", sql)
+        self.assertIn("CAST(%(qvec)s AS vector)", sql)
+        self.assertEqual(params["candidates"], 20)
+        # First two components, renormalized
+        np.testing.assert_allclose(np.linalg.norm(params["qshort"]), 1.0, rtol=1e-6)
+        np.testing.assert_allclose(params["qshort"], np.array([0.25, -1.5]) / np.hypot(0.25, 1.5), rtol=1e-6)
+        self.assertEqual(len(results), 1)
+
+    def test_rows_become_articles_with_similarity(self):
+        _, results = self.search(True)
+        (article, similarity), = results
+        self.assertEqual(article.title, "Dhaka flood")
+        self.assertEqual(similarity, 0.9)
+        # The embedding the search read rides along, normalized, for MMR
+        np.testing.assert_allclose(article.embedding, [0.0, 0.6, 0.8])
+
+
+if __name__ == "__main__":
+    unittest.main()